@@ -0,0 +1,35 @@
+"""inventory ingredients composite key
+
+Revision ID: 7b2e4c91a0d5
+Revises: 3f8a1c2d9b47
+Create Date: 2026-10-18 14:03:52.118734
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7b2e4c91a0d5"
+down_revision: Union[str, None] = "3f8a1c2d9b47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The primary key was only user_id, so a user could keep one ingredient.
+    # The new key still starts with user_id, which keeps the index the
+    # foreign key needs.
+    op.execute(
+        "ALTER TABLE inventory_ingredients DROP PRIMARY KEY, "
+        "ADD PRIMARY KEY (user_id, ingredient_id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "ALTER TABLE inventory_ingredients DROP PRIMARY KEY, "
+        "ADD PRIMARY KEY (user_id)"
+    )
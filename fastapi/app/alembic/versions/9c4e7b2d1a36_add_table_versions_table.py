@@ -0,0 +1,34 @@
+"""add table versions table
+
+Revision ID: 9c4e7b2d1a36
+Revises: b7f3a2e19c54
+Create Date: 2026-10-19 09:14:52.318604
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9c4e7b2d1a36"
+down_revision: Union[str, None] = "b7f3a2e19c54"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The version of every table, bumped by its writes, so every worker sees
+    # the changes of the others.
+    op.create_table(
+        "table_versions",
+        sa.Column("name", sa.String(length=30), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("table_versions")
@@ -0,0 +1,29 @@
+"""add menus user date index
+
+Revision ID: a4d1f6c3e852
+Revises: 7b2e4c91a0d5
+Create Date: 2026-10-18 15:21:07.402913
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a4d1f6c3e852"
+down_revision: Union[str, None] = "7b2e4c91a0d5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Supports the menus of a user in a date range, used by the shopping lists.
+    op.create_index(
+        "ix_menus_user_id_menu_date", "menus", ["user_id", "menu_date"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_menus_user_id_menu_date", table_name="menus")
@@ -0,0 +1,45 @@
+"""add expiry notifications table
+
+Revision ID: b7f3a2e19c54
+Revises: d81c5e3a9f26
+Create Date: 2026-10-18 22:48:03.664190
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7f3a2e19c54"
+down_revision: Union[str, None] = "d81c5e3a9f26"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The expiry alerts already sent, so a restart or a second process does
+    # not send them again.
+    op.create_table(
+        "expiry_notifications",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("ingredient_id", sa.Integer(), nullable=False),
+        sa.Column("expiration_date", sa.Date(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["ingredient_id"], ["ingredients.id"]),
+        sa.PrimaryKeyConstraint("user_id", "ingredient_id", "expiration_date"),
+    )
+    op.create_index(
+        "ix_expiry_notifications_expiration_date",
+        "expiry_notifications",
+        ["expiration_date"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_expiry_notifications_expiration_date", table_name="expiry_notifications"
+    )
+    op.drop_table("expiry_notifications")
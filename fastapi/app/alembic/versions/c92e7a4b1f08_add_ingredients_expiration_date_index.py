@@ -0,0 +1,33 @@
+"""add ingredients expiration date index
+
+Revision ID: c92e7a4b1f08
+Revises: a4d1f6c3e852
+Create Date: 2026-10-18 16:02:44.118305
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c92e7a4b1f08"
+down_revision: Union[str, None] = "a4d1f6c3e852"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Supports the range queries on the expiration dates, used by the expiry
+    # alerts.
+    op.create_index(
+        "ix_ingredients_expiration_date",
+        "ingredients",
+        ["expiration_date"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ingredients_expiration_date", table_name="ingredients")
@@ -0,0 +1,74 @@
+"""add calorie rollup tables
+
+Revision ID: d81c5e3a9f26
+Revises: e5b8d2f47c13
+Create Date: 2026-10-18 21:36:48.117305
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d81c5e3a9f26"
+down_revision: Union[str, None] = "e5b8d2f47c13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The calories of every recipe, menu and user day, kept up to date by the
+    # writes that change them.
+    op.create_table(
+        "recipe_calories",
+        sa.Column("recipe_id", sa.Integer(), nullable=False),
+        sa.Column("calories", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["recipe_id"], ["recipes.id"]),
+        sa.PrimaryKeyConstraint("recipe_id"),
+    )
+    op.create_table(
+        "menu_calories",
+        sa.Column("menu_id", sa.Integer(), nullable=False),
+        sa.Column("calories", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["menu_id"], ["menus.id"]),
+        sa.PrimaryKeyConstraint("menu_id"),
+    )
+    op.create_table(
+        "user_day_calories",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("calories", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("user_id", "day"),
+    )
+    op.execute(
+        "INSERT INTO recipe_calories (recipe_id, calories) "
+        "SELECT recipes.id, COALESCE(SUM(recipe_ingredients.quantity "
+        "* ingredients.calories), 0) FROM recipes "
+        "LEFT JOIN recipe_ingredients ON recipe_ingredients.recipe_id = recipes.id "
+        "LEFT JOIN ingredients ON ingredients.id = recipe_ingredients.ingredient_id "
+        "GROUP BY recipes.id"
+    )
+    op.execute(
+        "INSERT INTO menu_calories (menu_id, calories) "
+        "SELECT menus.id, COALESCE(SUM(recipe_calories.calories), 0) FROM menus "
+        "LEFT JOIN menu_recipes ON menu_recipes.menu_id = menus.id "
+        "LEFT JOIN recipe_calories "
+        "ON recipe_calories.recipe_id = menu_recipes.recipe_id "
+        "GROUP BY menus.id"
+    )
+    op.execute(
+        "INSERT INTO user_day_calories (user_id, day, calories) "
+        "SELECT menus.user_id, menus.menu_date, SUM(menu_calories.calories) "
+        "FROM menus JOIN menu_calories ON menu_calories.menu_id = menus.id "
+        "WHERE menus.is_active GROUP BY menus.user_id, menus.menu_date"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_day_calories")
+    op.drop_table("menu_calories")
+    op.drop_table("recipe_calories")
@@ -0,0 +1,32 @@
+"""add api keys user id
+
+Revision ID: e5b8d2f47c13
+Revises: c92e7a4b1f08
+Create Date: 2026-10-18 19:04:12.550921
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e5b8d2f47c13"
+down_revision: Union[str, None] = "c92e7a4b1f08"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The user an API key acts as, for the permission checks.
+    op.add_column("api_keys", sa.Column("user_id", sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        "fk_api_keys_user_id_users", "api_keys", "users", ["user_id"], ["id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("fk_api_keys_user_id_users", "api_keys", type_="foreignkey")
+    op.drop_column("api_keys", "user_id")
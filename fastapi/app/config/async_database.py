@@ -0,0 +1,617 @@
+"""
+This file contains the asynchronous database configuration.
+
+The services build their queries with peewee and run them through one of
+the backends below:
+
+- threadpool: the peewee database, called from the threadpool.
+- aiomysql: an aiomysql connection pool.
+- aiosqlite: a pool of aiosqlite connections, a stand-in for MySQL.
+
+With `DATABASE_REPLICAS`, a router sends the reads of the read-only service
+calls to the healthy replicas, round-robin, and everything else to the
+primary.
+"""
+
+import asyncio
+import itertools
+import logging
+from contextlib import asynccontextmanager, suppress
+
+from peewee import Insert, IntegrityError, MySQLDatabase, SqliteDatabase
+from playhouse.pool import PooledDatabase
+from starlette.concurrency import run_in_threadpool
+from config.database import create_database, database as primary_database
+from config.replicas import replica_route
+from config.settings import ASYNC_DATABASE, DATABASE, REPLICAS
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncDatabase:
+    """
+    This class represents a database that runs peewee queries asynchronously.
+    """
+
+    async def connect(self):
+        """
+        This method opens the connection pool.
+        """
+
+    async def close(self):
+        """
+        This method closes the connection pool.
+        """
+
+    async def fetch_all(self, query):
+        """
+        This method gets all the rows of a query.
+
+        Args:
+        - query (Select): The query to run.
+
+        Returns:
+        - List[dict]: The rows of the query.
+        """
+        raise NotImplementedError
+
+    async def fetch_one(self, query):
+        """
+        This method gets the first row of a query.
+
+        Args:
+        - query (Select): The query to run.
+
+        Returns:
+        - dict: The first row of the query, or None if there are no rows.
+        """
+        raise NotImplementedError
+
+    async def execute(self, query):
+        """
+        This method runs a write query.
+
+        Args:
+        - query (Insert | Update | Delete): The query to run.
+
+        Returns:
+        - int: The id of the inserted row, or the number of rows modified.
+
+        Raises:
+        - IntegrityError: If the query violates a constraint.
+        """
+        raise NotImplementedError
+
+    async def fetch_sql(self, sql: str):
+        """
+        This method gets the rows of a raw SQL statement on a connection of
+        its own, e.g. a health check.
+
+        Args:
+        - sql (str): The SQL to run.
+
+        Returns:
+        - List[dict]: The rows of the statement.
+        """
+        raise NotImplementedError
+
+
+class ThreadPoolDatabase(AsyncDatabase):
+    """
+    This class runs the queries on the peewee database in the threadpool.
+
+    A replica has its own peewee database; the queries are bound to it and
+    run on one of its connections.
+    """
+
+    def __init__(self, database=None):
+        self.database = database
+
+    async def close(self):
+        if isinstance(self.database, PooledDatabase):
+            self.database.close_all()
+
+    async def fetch_all(self, query):
+        query = self.bound(query)
+        return await run_in_threadpool(self.on_database, lambda: list(query.dicts()))
+
+    async def fetch_one(self, query):
+        query = self.bound(query)
+        return await run_in_threadpool(self.on_database, lambda: query.dicts().first())
+
+    async def execute(self, query):
+        return await run_in_threadpool(query.execute)
+
+    async def fetch_sql(self, sql):
+        database = primary_database if self.database is None else self.database
+
+        def fetch():
+            with database.connection_context():
+                cursor = database.execute_sql(sql)
+                names = [column[0] for column in cursor.description or ()]
+                return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+        return await run_in_threadpool(fetch)
+
+    def bound(self, query):
+        """
+        This method binds a copy of a query to the database of the backend.
+
+        Args:
+        - query (Select): The query.
+
+        Returns:
+        - Select: The query to run.
+        """
+        if self.database is None:
+            return query
+        return query.clone().bind(self.database)
+
+    def on_database(self, function):
+        """
+        This method runs a function on a connection of the database of the
+        backend, or on the connection of the request for the primary.
+
+        Args:
+        - function (Callable): The function.
+
+        Returns:
+        - Any: The result of the function.
+        """
+        if self.database is None:
+            return function()
+        with self.database.connection_context():
+            return function()
+
+
+class DriverDatabase(AsyncDatabase):
+    """
+    This class compiles the queries with peewee and runs them on an
+    asynchronous driver.
+    """
+
+    dialect = None
+    integrity_errors = ()
+
+    def sql(self, query):
+        """
+        This method compiles a query for the dialect of the driver.
+
+        Args:
+        - query (Query): The query to compile.
+
+        Returns:
+        - Tuple[str, list]: The SQL and its parameters.
+        """
+        return self.dialect.get_sql_context().sql(query).query()
+
+    async def run(self, sql: str, params: list, fetch: bool):
+        """
+        This method runs a SQL statement on a pooled connection.
+
+        Args:
+        - sql (str): The SQL to run.
+        - params (list): The parameters of the SQL.
+        - fetch (bool): Whether the rows should be fetched.
+
+        Returns:
+        - Tuple[list, int, int]: The rows, the row count and the last row id.
+        """
+        raise NotImplementedError
+
+    async def fetch_all(self, query):
+        rows, _, _ = await self.run(*self.sql(query), fetch=True)
+        return [convert_row(query, row) for row in rows]
+
+    async def fetch_one(self, query):
+        rows = await self.fetch_all(query)
+        return rows[0] if rows else None
+
+    async def fetch_sql(self, sql):
+        rows, _, _ = await self.run(sql, [], fetch=True)
+        return rows
+
+    async def execute(self, query):
+        try:
+            _, rowcount, lastrowid = await self.run(*self.sql(query), fetch=False)
+        except self.integrity_errors as exc:
+            raise IntegrityError(*exc.args) from exc
+        if isinstance(query, Insert):
+            return lastrowid
+        return rowcount
+
+
+class AioMySQLDatabase(DriverDatabase):
+    """
+    This class runs the queries on an aiomysql connection pool.
+    """
+
+    dialect = MySQLDatabase(None)
+
+    def __init__(self, config: dict, min_size: int, max_size: int):
+        self.config = config
+        self.min_size = min_size
+        self.max_size = max_size
+        self.pool = None
+
+    async def connect(self):
+        import aiomysql  # pylint: disable=import-outside-toplevel
+        from pymysql.err import (  # pylint: disable=import-outside-toplevel
+            IntegrityError as MySQLIntegrityError,
+        )
+
+        self.integrity_errors = (MySQLIntegrityError,)
+        self.pool = await aiomysql.create_pool(
+            host=self.config["host"],
+            port=self.config["port"],
+            user=self.config["user"],
+            password=self.config["password"],
+            db=self.config["name"],
+            minsize=self.min_size,
+            maxsize=self.max_size,
+            autocommit=True,
+            cursorclass=aiomysql.DictCursor,
+        )
+
+    async def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            await self.pool.wait_closed()
+            self.pool = None
+
+    async def run(self, sql, params, fetch):
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(sql, params)
+                rows = await cursor.fetchall() if fetch else []
+                return rows, cursor.rowcount, cursor.lastrowid
+
+
+class AioSqliteDatabase(DriverDatabase):
+    """
+    This class runs the queries on a pool of aiosqlite connections.
+    """
+
+    dialect = SqliteDatabase(None)
+
+    def __init__(self, path: str, max_size: int):
+        self.path = path
+        self.max_size = max_size
+        self.pool = None
+
+    async def connect(self):
+        import sqlite3  # pylint: disable=import-outside-toplevel
+        import aiosqlite  # pylint: disable=import-outside-toplevel
+
+        self.integrity_errors = (sqlite3.IntegrityError,)
+        self.pool = asyncio.Queue()
+        for _ in range(self.max_size):
+            conn = await aiosqlite.connect(self.path, isolation_level=None)
+            conn.row_factory = aiosqlite.Row
+            self.pool.put_nowait(conn)
+
+    async def close(self):
+        if self.pool is not None:
+            while not self.pool.empty():
+                await self.pool.get_nowait().close()
+            self.pool = None
+
+    @asynccontextmanager
+    async def acquire(self):
+        """
+        This method borrows a connection from the pool.
+        """
+        conn = await self.pool.get()
+        try:
+            yield conn
+        finally:
+            self.pool.put_nowait(conn)
+
+    async def run(self, sql, params, fetch):
+        async with self.acquire() as conn:
+            async with conn.execute(sql, params) as cursor:
+                rows = [dict(row) for row in await cursor.fetchall()] if fetch else []
+                return rows, cursor.rowcount, cursor.lastrowid
+
+
+def convert_row(query, row: dict):
+    """
+    This function converts the values of a row to their python types.
+
+    Args:
+    - query (Select): The query that produced the row.
+    - row (dict): The row as returned by the driver.
+
+    Returns:
+    - dict: The row with the values converted by the model fields.
+    """
+    columns = query.model._meta.columns  # pylint: disable=protected-access
+    return {
+        key: columns[key].python_value(value) if key in columns else value
+        for key, value in row.items()
+    }
+
+
+class Replica:
+    """
+    This class represents a read replica and its health.
+    """
+
+    def __init__(self, name: str, database: AsyncDatabase):
+        self.name = name
+        self.database = database
+        self.healthy = False
+        self.lag = None
+        self.error = None
+        self.reads = 0
+
+    def stats(self):
+        """
+        This method gets the health of the replica.
+
+        Returns:
+        - dict: The name, health, lag, last error and reads of the replica.
+        """
+        return {
+            "name": self.name,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag,
+            "error": self.error,
+            "reads": self.reads,
+        }
+
+
+class ReplicaRouter(AsyncDatabase):
+    """
+    This class routes the queries between the primary and the replicas.
+
+    The reads of the read-only service calls go round-robin to the healthy
+    replicas, unless the request is pinned to the primary. A read that fails
+    on a replica takes it out of rotation and runs on the primary. Writes
+    always run on the primary.
+
+    A background task checks every replica on an interval, and keeps in
+    rotation the ones that answer and lag at most `REPLICA_MAX_LAG_SECONDS`.
+    """
+
+    def __init__(self, primary: AsyncDatabase, replicas, config: dict):
+        self.primary = primary
+        self.replicas = replicas
+        self.config = config
+        self.turn = itertools.count()
+        self.task = None
+
+    def members(self):
+        """
+        This method gets the databases of the router.
+
+        Returns:
+        - List[AsyncDatabase]: The primary and the replicas.
+        """
+        return [self.primary] + [replica.database for replica in self.replicas]
+
+    async def connect(self):
+        await self.primary.connect()
+        for replica in self.replicas:
+            try:
+                await replica.database.connect()
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                replica.error = str(exc)
+        await self.check()
+        if self.task is None:
+            self.task = asyncio.create_task(self.monitor())
+
+    async def close(self):
+        if self.task is not None:
+            self.task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self.task
+            self.task = None
+        for replica in self.replicas:
+            await replica.database.close()
+        await self.primary.close()
+
+    async def fetch_all(self, query):
+        return await self.read("fetch_all", query)
+
+    async def fetch_one(self, query):
+        return await self.read("fetch_one", query)
+
+    async def execute(self, query):
+        return await self.primary.execute(query)
+
+    async def fetch_sql(self, sql):
+        return await self.primary.fetch_sql(sql)
+
+    async def read(self, method: str, query):
+        """
+        This method runs a read on a replica when the request allows it, and
+        on the primary otherwise.
+
+        Args:
+        - method (str): "fetch_all" or "fetch_one".
+        - query (Select): The query.
+
+        Returns:
+        - List[dict] | dict: The rows of the query.
+        """
+        route = replica_route()
+        replica = self.pick() if route is not None else None
+        if replica is not None:
+            try:
+                rows = await getattr(replica.database, method)(query)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                replica.healthy = False
+                replica.error = str(exc)
+                logger.warning(
+                    "Replica %s failed, out of rotation: %s", replica.name, exc
+                )
+            else:
+                replica.reads += 1
+                route["replica"] = True
+                return rows
+        return await getattr(self.primary, method)(query)
+
+    def pick(self):
+        """
+        This method picks the next healthy replica.
+
+        Returns:
+        - Replica: The replica, or None if none is healthy.
+        """
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self.turn) % len(healthy)]
+
+    async def check(self):
+        """
+        This method checks the health and the lag of every replica.
+        """
+        for replica in self.replicas:
+            try:
+                replica.lag = await asyncio.wait_for(
+                    replication_lag(replica.database, self.primary),
+                    self.config["health_timeout_seconds"],
+                )
+                replica.error = None
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                replica.lag = None
+                replica.error = str(exc) or type(exc).__name__
+            healthy = (
+                replica.lag is not None
+                and replica.lag <= self.config["max_lag_seconds"]
+            )
+            if healthy != replica.healthy:
+                logger.warning(
+                    "Replica %s %s rotation (lag %s, error %s)",
+                    replica.name,
+                    "into" if healthy else "out of",
+                    replica.lag,
+                    replica.error,
+                )
+            replica.healthy = healthy
+
+    async def monitor(self):
+        """
+        This method checks the replicas every `REPLICA_HEALTH_INTERVAL_SECONDS`.
+        """
+        while True:
+            await asyncio.sleep(self.config["health_interval_seconds"])
+            try:
+                await self.check()
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("Replica health check failed")
+
+    def stats(self):
+        """
+        This method gets the health of the replicas.
+
+        Returns:
+        - dict: The settings and the health, lag and reads of every replica.
+        """
+        return {
+            "sticky_seconds": self.config["sticky_seconds"],
+            "max_lag_seconds": self.config["max_lag_seconds"],
+            "replicas": [replica.stats() for replica in self.replicas],
+        }
+
+
+async def replication_lag(database: AsyncDatabase, primary: AsyncDatabase):
+    """
+    This function gets the replication lag of a replica. SQLite files have
+    no replication, so a copy with every table of the primary has no lag.
+
+    Args:
+    - database (AsyncDatabase): The replica.
+    - primary (AsyncDatabase): The primary.
+
+    Returns:
+    - float: The lag in seconds, or None if the replication is stopped or
+      the server is not a replica.
+
+    Raises:
+    - LookupError: If a SQLite replica misses tables of the primary.
+    """
+    if DATABASE["engine"].endswith("SqliteDatabase"):
+        tables = "SELECT name FROM sqlite_master WHERE type = 'table'"
+        missing = {row["name"] for row in await primary.fetch_sql(tables)} - {
+            row["name"] for row in await database.fetch_sql(tables)
+        }
+        if missing:
+            raise LookupError(f"Missing tables: {', '.join(sorted(missing))}")
+        return 0.0
+    try:
+        rows = await database.fetch_sql("SHOW REPLICA STATUS")
+    except Exception:  # pylint: disable=broad-exception-caught
+        rows = await database.fetch_sql("SHOW SLAVE STATUS")
+    if not rows:
+        return None
+    lag = rows[0].get("Seconds_Behind_Source", rows[0].get("Seconds_Behind_Master"))
+    return None if lag is None else float(lag)
+
+
+def replica_config(replica: str):
+    """
+    This function builds the database configuration of a replica: the path
+    of the file for SQLite, or "host[:port]" with the credentials of the
+    primary for MySQL.
+
+    Args:
+    - replica (str): The replica, as set in `DATABASE_REPLICAS`.
+
+    Returns:
+    - dict: The database configuration.
+    """
+    if DATABASE["engine"].endswith("SqliteDatabase"):
+        return {**DATABASE, "name": replica}
+    host, _, port = replica.partition(":")
+    return {**DATABASE, "host": host, "port": int(port or DATABASE["port"])}
+
+
+def create_backend(config: dict, database_config: dict, replica: bool = False):
+    """
+    This function creates the asynchronous backend of a database.
+
+    Args:
+    - config (dict): The asynchronous database configuration.
+    - database_config (dict): The database configuration.
+    - replica (bool): Whether the database is a replica, which the
+      threadpool backend opens with its own peewee database.
+
+    Returns:
+    - AsyncDatabase: The asynchronous backend.
+    """
+    if config["driver"] == "aiomysql":
+        return AioMySQLDatabase(database_config, config["min_size"], config["max_size"])
+    if config["driver"] == "aiosqlite":
+        return AioSqliteDatabase(database_config["name"], config["max_size"])
+    return ThreadPoolDatabase(create_database(database_config) if replica else None)
+
+
+def create_async_database(config: dict, replicas: dict = None):
+    """
+    This function creates the asynchronous database of the configuration.
+
+    Args:
+    - config (dict): The asynchronous database configuration.
+    - replicas (dict): The replica configuration.
+
+    Returns:
+    - AsyncDatabase: The asynchronous database, or the router of the primary
+      and the replicas.
+    """
+    primary = create_backend(config, DATABASE)
+    if not replicas or not replicas["databases"]:
+        return primary
+    return ReplicaRouter(
+        primary,
+        [
+            Replica(name, create_backend(config, replica_config(name), replica=True))
+            for name in replicas["databases"]
+        ],
+        replicas,
+    )
+
+
+async_database = create_async_database(ASYNC_DATABASE, REPLICAS)
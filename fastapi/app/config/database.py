@@ -2,23 +2,196 @@
 This file contains the database configuration.
 """
 
+from contextvars import ContextVar
+from datetime import date
+
 from peewee import (
     Model,
     AutoField,
     CharField,
     IntegerField,
     BooleanField,
+    CompositeKey,
+    DateField,
+    ForeignKeyField,
     MySQLDatabase,
+    SqliteDatabase,
+    _ConnectionState,
 )
-from config.settings import DATABASE
-
-database = MySQLDatabase(
-    DATABASE["name"],
-    user=DATABASE["user"],
-    password=DATABASE["password"],
-    host=DATABASE["host"],
-    port=DATABASE["port"],
-)
+from playhouse.pool import PooledDatabase, PooledMySQLDatabase, PooledSqliteDatabase
+from config.settings import DATABASE, DATABASE_POOL
+
+db_state_default = {"closed": None, "conn": None, "ctx": None, "transactions": None}
+db_state = ContextVar("db_state", default=None)
+
+
+class PeeweeConnectionState(_ConnectionState):
+    """
+    This class stores the peewee connection state in a context variable, so a
+    request keeps the same connection across the threadpool threads it uses.
+
+    A context that was not reset gets its own state on first use, so no two
+    contexts ever share a connection.
+    """
+
+    def __init__(self, **kwargs):
+        super().__setattr__("_state", db_state)
+        super().__init__(**kwargs)
+
+    def __setattr__(self, name, value):
+        self.current()[name] = value
+
+    def __getattr__(self, name):
+        return self.current()[name]
+
+    def current(self):
+        """
+        This method gets the connection state of the current context.
+
+        Returns:
+        - dict: The connection state.
+        """
+        state = self._state.get()
+        if state is None:
+            state = db_state_default.copy()
+            self._state.set(state)
+        return state
+
+
+def create_database(config: dict):
+    """
+    This function creates the peewee database of a configuration.
+
+    The engine "peewee.SqliteDatabase" uses the database name as file path
+    and serves as a local stand-in for MySQL.
+
+    Args:
+    - config (dict): The database configuration.
+
+    Returns:
+    - Database: The pooled or plain database.
+    """
+    if config["engine"].endswith("SqliteDatabase"):
+        if DATABASE_POOL["enabled"]:
+            return PooledSqliteDatabase(
+                config["name"],
+                max_connections=DATABASE_POOL["max_connections"],
+                stale_timeout=DATABASE_POOL["stale_timeout"],
+                timeout=DATABASE_POOL["timeout"],
+                check_same_thread=False,
+            )
+        return SqliteDatabase(config["name"], check_same_thread=False)
+    if DATABASE_POOL["enabled"]:
+        return PooledMySQLDatabase(
+            config["name"],
+            user=config["user"],
+            password=config["password"],
+            host=config["host"],
+            port=config["port"],
+            max_connections=DATABASE_POOL["max_connections"],
+            stale_timeout=DATABASE_POOL["stale_timeout"],
+            timeout=DATABASE_POOL["timeout"],
+        )
+    return MySQLDatabase(
+        config["name"],
+        user=config["user"],
+        password=config["password"],
+        host=config["host"],
+        port=config["port"],
+    )
+
+
+database = create_database(DATABASE)
+database._state = PeeweeConnectionState()  # pylint: disable=protected-access
+
+
+def write_transaction():
+    """
+    This function opens a transaction that reads and then writes.
+
+    On SQLite the write lock is taken when the transaction begins, so a
+    concurrent writer waits for it instead of failing with "database is
+    locked" when the read lock is upgraded.
+
+    Returns:
+    - _atomic: The transaction context manager.
+    """
+    if isinstance(database, SqliteDatabase):
+        return database.atomic("IMMEDIATE")
+    return database.atomic()
+
+
+def locking(query):
+    """
+    This function makes a read of a write transaction a locking read.
+
+    A plain read of a MySQL REPEATABLE READ transaction sees the snapshot
+    taken by its first read, so a total recomputed from it would drop the
+    writes committed since. A locking read sees the latest committed rows
+    and waits for the writes in progress. SQLite needs none, since
+    `write_transaction` already serializes the writers.
+
+    Args:
+    - query (Select): The read.
+
+    Returns:
+    - Select: The read, with FOR UPDATE on MySQL.
+    """
+    if isinstance(database, SqliteDatabase):
+        return query
+    return query.for_update()
+
+
+def reset_db_state():
+    """
+    This function gives the current context a fresh connection state.
+    """
+    db_state.set(db_state_default.copy())
+    database._state.reset()  # pylint: disable=protected-access
+
+
+async def get_db():
+    """
+    This dependency scopes a database connection to a single request.
+
+    The connection is opened lazily by the first query of the request and
+    returned to the pool (or closed) once the response has been produced.
+    """
+    reset_db_state()
+    try:
+        yield
+    finally:
+        if not database.is_closed():
+            database.close()
+
+
+def close_database():
+    """
+    This function closes every connection held by the database.
+    """
+    if isinstance(database, PooledDatabase):
+        database.close_all()
+    elif not database.is_closed():
+        database.close()
+
+
+def get_pool_stats():
+    """
+    This function gets the connection pool statistics.
+
+    Returns:
+    - dict: The pool size limits and the idle and in-use connection counts.
+    """
+    if not isinstance(database, PooledDatabase):
+        return {"pooled": False}
+    # pylint: disable=protected-access
+    return {
+        "pooled": True,
+        "max_connections": database._max_connections,
+        "stale_timeout": database._stale_timeout,
+        "idle": len(database._connections),
+        "in_use": len(database._in_use),
+    }
 
 
 class UserRoleModel(Model):
@@ -61,8 +234,12 @@ class RolePermissionModel(Model):
     This class represents the role permission model.
     """
 
-    role_id = IntegerField(null=False)
-    permission_id = CharField(max_length=30, unique=True, null=False)
+    role_id = ForeignKeyField(
+        UserRoleModel, column_name="role_id", lazy_load=False, backref="permissions"
+    )
+    permission_id = ForeignKeyField(
+        PermissionModel, column_name="permission_id", lazy_load=False, backref="roles"
+    )
 
     class Meta:
         """
@@ -71,6 +248,7 @@ class RolePermissionModel(Model):
 
         database = database
         table_name = "role_permissions"
+        primary_key = CompositeKey("role_id", "permission_id")
 
 
 class UserModel(Model):
@@ -84,7 +262,9 @@ class UserModel(Model):
     password = CharField(max_length=255, null=False)
     account_type = CharField(max_length=30, null=False)
     profile_picture = CharField(max_length=255)
-    role_id = IntegerField(null=False)
+    role_id = ForeignKeyField(
+        UserRoleModel, column_name="role_id", lazy_load=False, backref="users"
+    )
     is_active = BooleanField(default=True)
 
     class Meta:
@@ -94,3 +274,464 @@ class UserModel(Model):
 
         database = database
         table_name = "users"
+
+
+class ApiKeyModel(Model):
+    """
+    This class represents the API key model.
+    """
+
+    id = AutoField()
+    name = CharField(max_length=30, unique=True, null=False)
+    key_hash = CharField(max_length=64, unique=True, null=False)
+    scopes = CharField(max_length=255, null=False, default="")
+    is_active = BooleanField(default=True)
+    user_id = ForeignKeyField(
+        UserModel,
+        column_name="user_id",
+        null=True,
+        lazy_load=False,
+        backref="api_keys",
+    )
+
+    class Meta:
+        """
+        This class represents the metadata of the model
+        """
+
+        database = database
+        table_name = "api_keys"
+
+
+class FamilyModel(Model):
+    """
+    This class represents the family model.
+    """
+
+    id = AutoField()
+    name = CharField(max_length=30, unique=True, null=False)
+
+    class Meta:
+        """
+        This class represents the metadata of the model
+        """
+
+        database = database
+        table_name = "families"
+
+
+class UserFamilyModel(Model):
+    """
+    This class represents a member of a family.
+    """
+
+    user_id = ForeignKeyField(
+        UserModel, column_name="user_id", lazy_load=False, backref="families"
+    )
+    family_id = ForeignKeyField(
+        FamilyModel, column_name="family_id", lazy_load=False, backref="users"
+    )
+
+    class Meta:
+        """
+        This class represents the metadata of the model
+        """
+
+        database = database
+        table_name = "user_families"
+        primary_key = CompositeKey("user_id", "family_id")
+
+
+class UnitModel(Model):
+    """
+    This class represents the unit model.
+    """
+
+    id = AutoField()
+    name = CharField(max_length=30, unique=True, null=False)
+    is_active = BooleanField(default=True)
+
+    class Meta:
+        """
+        This class represents the metadata of the model
+        """
+
+        database = database
+        table_name = "units"
+
+
+class IngredientCategoryModel(Model):
+    """
+    This class represents the ingredient category model.
+    """
+
+    id = AutoField()
+    name = CharField(max_length=30, unique=True, null=False)
+    is_active = BooleanField(default=True)
+
+    class Meta:
+        """
+        This class represents the metadata of the model
+        """
+
+        database = database
+        table_name = "ingredient_categories"
+
+
+class IngredientModel(Model):
+    """
+    This class represents the ingredient model.
+    """
+
+    id = AutoField()
+    name = CharField(max_length=30, unique=True, null=False)
+    calories = IntegerField(null=False)
+    expiration_date = DateField(null=False)
+    is_active = BooleanField(default=True)
+    category_id = ForeignKeyField(
+        IngredientCategoryModel,
+        column_name="category_id",
+        lazy_load=False,
+        backref="ingredients",
+    )
+    unit_id = ForeignKeyField(
+        UnitModel, column_name="unit_id", lazy_load=False, backref="ingredients"
+    )
+
+    class Meta:
+        """
+        This class represents the metadata of the model
+        """
+
+        database = database
+        table_name = "ingredients"
+
+
+class InventoryIngredientModel(Model):
+    """
+    This class represents an ingredient of the inventory of a user.
+    """
+
+    user_id = ForeignKeyField(
+        UserModel, column_name="user_id", lazy_load=False, backref="inventory"
+    )
+    ingredient_id = ForeignKeyField(
+        IngredientModel,
+        column_name="ingredient_id",
+        lazy_load=False,
+        backref="inventories",
+    )
+    quantity = IntegerField(null=False)
+
+    class Meta:
+        """
+        This class represents the metadata of the model
+        """
+
+        database = database
+        table_name = "inventory_ingredients"
+        primary_key = CompositeKey("user_id", "ingredient_id")
+
+
+class ExpiryNotificationModel(Model):
+    """
+    This class represents an expiry alert sent for an ingredient of an
+    inventory.
+    """
+
+    user_id = ForeignKeyField(
+        UserModel,
+        column_name="user_id",
+        lazy_load=False,
+        backref="expiry_notifications",
+    )
+    ingredient_id = ForeignKeyField(
+        IngredientModel,
+        column_name="ingredient_id",
+        lazy_load=False,
+        backref="expiry_notifications",
+    )
+    expiration_date = DateField(null=False, index=True)
+
+    class Meta:
+        """
+        This class represents the metadata of the model
+        """
+
+        database = database
+        table_name = "expiry_notifications"
+        primary_key = CompositeKey("user_id", "ingredient_id", "expiration_date")
+
+
+class CategoryModel(Model):
+    """
+    This class represents the recipe category model.
+    """
+
+    id = AutoField()
+    name = CharField(max_length=30, unique=True, null=False)
+    is_active = BooleanField(default=True)
+
+    class Meta:
+        """
+        This class represents the metadata of the model
+        """
+
+        database = database
+        table_name = "recipe_categories"
+
+
+class RecipeModel(Model):
+    """
+    This class represents the recipe model.
+    """
+
+    id = AutoField()
+    name = CharField(max_length=30, unique=True, null=False)
+    description = CharField(max_length=100, null=False)
+    instructions = CharField(max_length=255, null=False)
+    preparation_time = IntegerField(null=False)
+    difficulty = IntegerField(null=False)
+    is_public = BooleanField(default=True)
+    is_active = BooleanField(default=True)
+    user_id = ForeignKeyField(
+        UserModel, column_name="user_id", lazy_load=False, backref="recipes"
+    )
+
+    class Meta:
+        """
+        This class represents the metadata of the model
+        """
+
+        database = database
+        table_name = "recipes"
+
+
+class RecipeCategoryModel(Model):
+    """
+    This class represents the category of a recipe.
+    """
+
+    recipe_id = ForeignKeyField(
+        RecipeModel, column_name="recipe_id", lazy_load=False, backref="categories"
+    )
+    category_id = ForeignKeyField(
+        CategoryModel, column_name="category_id", lazy_load=False, backref="recipes"
+    )
+
+    class Meta:
+        """
+        This class represents the metadata of the model
+        """
+
+        database = database
+        table_name = "recipe_category"
+        primary_key = CompositeKey("recipe_id", "category_id")
+
+
+class RecipeIngredientModel(Model):
+    """
+    This class represents an ingredient of a recipe.
+    """
+
+    recipe_id = ForeignKeyField(
+        RecipeModel, column_name="recipe_id", lazy_load=False, backref="ingredients"
+    )
+    ingredient_id = ForeignKeyField(
+        IngredientModel, column_name="ingredient_id", lazy_load=False, backref="recipes"
+    )
+    quantity = IntegerField(null=False)
+
+    class Meta:
+        """
+        This class represents the metadata of the model
+        """
+
+        database = database
+        table_name = "recipe_ingredients"
+        primary_key = CompositeKey("recipe_id", "ingredient_id")
+
+
+class MenuModel(Model):
+    """
+    This class represents the menu model.
+    """
+
+    id = AutoField()
+    name = CharField(max_length=30, unique=True, null=False)
+    menu_date = DateField(null=False)
+    meal_type = CharField(
+        max_length=9,
+        null=False,
+        choices=[("Breakfast", "Breakfast"), ("Lunch", "Lunch"), ("Dinner", "Dinner")],
+    )
+    is_active = BooleanField(default=True)
+    created_at = DateField(null=False, default=date.today)
+    user_id = ForeignKeyField(
+        UserModel, column_name="user_id", lazy_load=False, backref="menus"
+    )
+
+    class Meta:
+        """
+        This class represents the metadata of the model
+        """
+
+        database = database
+        table_name = "menus"
+
+
+class MenuRecipeModel(Model):
+    """
+    This class represents a recipe of a menu.
+    """
+
+    menu_id = ForeignKeyField(
+        MenuModel, column_name="menu_id", lazy_load=False, backref="recipes"
+    )
+    recipe_id = ForeignKeyField(
+        RecipeModel, column_name="recipe_id", lazy_load=False, backref="menus"
+    )
+
+    class Meta:
+        """
+        This class represents the metadata of the model
+        """
+
+        database = database
+        table_name = "menu_recipes"
+        primary_key = CompositeKey("menu_id", "recipe_id")
+
+
+class RecipeCaloriesModel(Model):
+    """
+    This class represents the calories of a recipe.
+    """
+
+    recipe_id = ForeignKeyField(
+        RecipeModel,
+        column_name="recipe_id",
+        primary_key=True,
+        lazy_load=False,
+        backref="calories",
+    )
+    calories = IntegerField(null=False, default=0)
+
+    class Meta:
+        """
+        This class represents the metadata of the model
+        """
+
+        database = database
+        table_name = "recipe_calories"
+
+
+class MenuCaloriesModel(Model):
+    """
+    This class represents the calories of a menu.
+    """
+
+    menu_id = ForeignKeyField(
+        MenuModel,
+        column_name="menu_id",
+        primary_key=True,
+        lazy_load=False,
+        backref="calories",
+    )
+    calories = IntegerField(null=False, default=0)
+
+    class Meta:
+        """
+        This class represents the metadata of the model
+        """
+
+        database = database
+        table_name = "menu_calories"
+
+
+class UserDayCaloriesModel(Model):
+    """
+    This class represents the calories of the active menus of a user on a day.
+    """
+
+    user_id = ForeignKeyField(
+        UserModel, column_name="user_id", lazy_load=False, backref="day_calories"
+    )
+    day = DateField(null=False)
+    calories = IntegerField(null=False, default=0)
+
+    class Meta:
+        """
+        This class represents the metadata of the model
+        """
+
+        database = database
+        table_name = "user_day_calories"
+        primary_key = CompositeKey("user_id", "day")
+
+
+class ShoppingListModel(Model):
+    """
+    This class represents the shopping list model.
+    """
+
+    id = AutoField()
+    user_id = ForeignKeyField(
+        UserModel, column_name="user_id", lazy_load=False, backref="shopping_lists"
+    )
+    created_at = DateField(null=False, default=date.today)
+
+    class Meta:
+        """
+        This class represents the metadata of the model
+        """
+
+        database = database
+        table_name = "shopping_lists"
+
+
+class ShoppingListIngredientModel(Model):
+    """
+    This class represents an ingredient of a shopping list.
+    """
+
+    shopping_list_id = ForeignKeyField(
+        ShoppingListModel,
+        column_name="shopping_list_id",
+        lazy_load=False,
+        backref="ingredients",
+    )
+    ingredient_id = ForeignKeyField(
+        IngredientModel,
+        column_name="ingredient_id",
+        lazy_load=False,
+        backref="shopping_lists",
+    )
+    quantity = IntegerField(null=False)
+    bought = BooleanField(default=False)
+
+    class Meta:
+        """
+        This class represents the metadata of the model
+        """
+
+        database = database
+        table_name = "shopping_list_ingredients"
+        primary_key = CompositeKey("shopping_list_id", "ingredient_id")
+
+
+class TableVersionModel(Model):
+    """
+    This class represents the version of a table, bumped by every write to
+    it, so every process sees the changes of the others.
+    """
+
+    name = CharField(max_length=30, primary_key=True)
+    version = IntegerField(null=False, default=0)
+
+    class Meta:
+        """
+        This class represents the metadata of the model
+        """
+
+        database = database
+        table_name = "table_versions"
@@ -0,0 +1,161 @@
+"""
+This file contains the request routing of the read replicas.
+
+The services run their reads on a replica only inside a `replica_read`
+call, and only when the request is not pinned to the primary. A request is
+pinned when it writes, when its client wrote in the last
+`REPLICA_STICKY_SECONDS` (read-your-writes), or when a route asks for it.
+"""
+
+import functools
+import threading
+import time
+from contextvars import ContextVar
+
+from config.settings import REPLICAS
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+request_route = ContextVar("request_route", default=None)
+replica_reads = ContextVar("replica_reads", default=False)
+
+
+class Stickiness:
+    """
+    This class remembers the clients that wrote recently, so their reads go
+    to the primary until the replicas have caught up.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.clients = {}
+        self.next_prune = 0.0
+        self.lock = threading.Lock()
+
+    def touch(self, client: str):
+        """
+        This method starts or extends the window of a client.
+
+        Args:
+        - client (str): The client.
+        """
+        now = time.monotonic()
+        with self.lock:
+            self.clients[client] = now + self.seconds
+            if now >= self.next_prune:
+                self.clients = {
+                    key: until for key, until in self.clients.items() if until > now
+                }
+                self.next_prune = now + self.seconds
+
+    def sticky(self, client: str) -> bool:
+        """
+        This method checks whether a client wrote recently.
+
+        Args:
+        - client (str): The client.
+
+        Returns:
+        - bool: Whether the reads of the client go to the primary.
+        """
+        return self.clients.get(client, 0.0) > time.monotonic()
+
+
+def begin_request(method: str, client: str):
+    """
+    This function routes the reads of a request, and starts the window of a
+    client that writes.
+
+    Args:
+    - method (str): The HTTP method of the request.
+    - client (str): The key of the client, e.g. the hash of its API key.
+
+    Returns:
+    - dict: The route of the request, or None without replicas.
+    """
+    if not REPLICAS["databases"]:
+        return None
+    write = method not in SAFE_METHODS
+    if write:
+        stickiness.touch(client)
+    route = {
+        "client": client,
+        "write": write,
+        "primary": write or stickiness.sticky(client),
+        "replica": False,
+    }
+    request_route.set(route)
+    return route
+
+
+def end_request(route):
+    """
+    This function extends the window of a client that wrote, so it starts
+    when the write is done.
+
+    Args:
+    - route (dict): The route of the request.
+    """
+    if route is not None and route["write"]:
+        stickiness.touch(route["client"])
+
+
+def replica_read(function):
+    """
+    This decorator lets the reads of a read-only service call run on a
+    replica.
+
+    Args:
+    - function (Callable): The asynchronous service function.
+
+    Returns:
+    - Callable: The wrapped function.
+    """
+
+    @functools.wraps(function)
+    async def wrapper(*args, **kwargs):
+        token = replica_reads.set(True)
+        try:
+            return await function(*args, **kwargs)
+        finally:
+            replica_reads.reset(token)
+
+    return wrapper
+
+
+def pin_primary():
+    """
+    This function sends the rest of the reads of the request to the primary.
+    """
+    route = request_route.get()
+    if route is not None:
+        route["primary"] = True
+
+
+def replica_route():
+    """
+    This function gets the route of a read that may run on a replica.
+
+    Returns:
+    - dict: The route of the request, or None if the read goes to the
+      primary.
+    """
+    route = request_route.get()
+    if route is None or route["primary"] or not replica_reads.get():
+        return None
+    return route
+
+
+def replica_served() -> bool:
+    """
+    This function checks whether a replica served a read of the request, so
+    its rows, which may lag, are not cached.
+
+    Returns:
+    - bool: Whether a replica served a read.
+    """
+    route = request_route.get()
+    return route is not None and route["replica"]
+
+
+stickiness = Stickiness(REPLICAS["sticky_seconds"])
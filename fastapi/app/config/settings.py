@@ -12,18 +12,158 @@ ENV = os.getenv("ENV", "dev")
 if ENV == "production":
     DATABASE = {
         "name": os.getenv("MYSQL_DATABASE"),
-        "engine": "peewee.MySQLDatabase",
+        "engine": os.getenv("DATABASE_ENGINE", "peewee.MySQLDatabase"),
         "user": os.getenv("MYSQL_USER"),
         "password": os.getenv("MYSQL_PASSWORD"),
         "host": os.getenv("MYSQL_HOST"),
-        "port": int(os.getenv("MYSQL_PORT")),
+        "port": int(os.getenv("MYSQL_PORT", "3306")),
     }
 else:
     DATABASE = {
         "name": os.getenv("MYSQL_DATABASE"),
-        "engine": "peewee.MySQLDatabase",
+        "engine": os.getenv("DATABASE_ENGINE", "peewee.MySQLDatabase"),
         "user": os.getenv("MYSQL_USER"),
         "password": os.getenv("MYSQL_PASSWORD"),
         "host": os.getenv("MYSQL_HOST"),
-        "port": int(os.getenv("MYSQL_PORT")),
+        "port": int(os.getenv("MYSQL_PORT", "3306")),
     }
+
+DATABASE_POOL = {
+    "enabled": os.getenv("MYSQL_POOL_ENABLED", "true").lower() == "true",
+    "max_connections": int(os.getenv("MYSQL_POOL_MAX_CONNECTIONS", "20")),
+    "stale_timeout": int(os.getenv("MYSQL_POOL_STALE_TIMEOUT", "300")),
+    "timeout": int(os.getenv("MYSQL_POOL_TIMEOUT", "10")),
+}
+
+PAGINATION = {
+    "default_limit": int(os.getenv("PAGINATION_DEFAULT_LIMIT", "50")),
+    "max_limit": int(os.getenv("PAGINATION_MAX_LIMIT", "500")),
+}
+
+ASYNC_DATABASE = {
+    "driver": os.getenv("ASYNC_DATABASE_DRIVER", "threadpool"),
+    "min_size": int(os.getenv("ASYNC_DATABASE_POOL_MIN_SIZE", "1")),
+    "max_size": int(os.getenv("ASYNC_DATABASE_POOL_MAX_SIZE", "20")),
+}
+
+CACHE = {
+    "backend": os.getenv("CACHE_BACKEND", "memory"),
+    "ttl": int(os.getenv("CACHE_TTL", "300")),
+    "max_entries": int(os.getenv("CACHE_MAX_ENTRIES", "10000")),
+    "max_bytes": int(os.getenv("CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
+}
+
+BULK = {
+    "chunk_size": int(os.getenv("BULK_CHUNK_SIZE", "500")),
+    "max_items": int(os.getenv("BULK_MAX_ITEMS", "10000")),
+}
+
+EXPORT = {
+    "batch_size": int(os.getenv("EXPORT_BATCH_SIZE", "1000")),
+}
+
+API_KEYS = {
+    "refresh_seconds": int(os.getenv("API_KEYS_REFRESH_SECONDS", "60")),
+}
+
+TABLE_VERSIONS = {
+    "refresh_seconds": float(os.getenv("TABLE_VERSIONS_REFRESH_SECONDS", "1")),
+}
+
+RATE_LIMIT = {
+    "rate": float(os.getenv("RATE_LIMIT_RATE", "10")),
+    "burst": float(os.getenv("RATE_LIMIT_BURST", "20")),
+    "idle_seconds": int(os.getenv("RATE_LIMIT_IDLE_SECONDS", "600")),
+    "max_in_flight": int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "64")),
+}
+
+PASSWORD_HASHING = {
+    "n": int(os.getenv("PASSWORD_SCRYPT_N", str(2**14))),
+    "r": int(os.getenv("PASSWORD_SCRYPT_R", "8")),
+    "p": int(os.getenv("PASSWORD_SCRYPT_P", "1")),
+    "workers": int(os.getenv("PASSWORD_HASHING_WORKERS", str(os.cpu_count() or 1))),
+    "max_pending": int(os.getenv("PASSWORD_HASHING_MAX_PENDING", "64")),
+}
+
+SEARCH = {
+    "k1": float(os.getenv("SEARCH_BM25_K1", "1.2")),
+    "b": float(os.getenv("SEARCH_BM25_B", "0.75")),
+    "default_limit": int(os.getenv("SEARCH_DEFAULT_LIMIT", "20")),
+    "max_limit": int(os.getenv("SEARCH_MAX_LIMIT", "100")),
+}
+
+MATCHER = {
+    "default_limit": int(os.getenv("MATCHER_DEFAULT_LIMIT", "20")),
+    "max_limit": int(os.getenv("MATCHER_MAX_LIMIT", "100")),
+    "rebuild_changes": int(os.getenv("MATCHER_REBUILD_CHANGES", "1000")),
+}
+
+NUTRITION = {
+    "max_days": int(os.getenv("NUTRITION_MAX_DAYS", "366")),
+}
+
+EXPIRY = {
+    "lead_days": int(os.getenv("EXPIRY_LEAD_DAYS", "3")),
+    "interval_seconds": float(os.getenv("EXPIRY_INTERVAL_SECONDS", "60")),
+    "sink": os.getenv("EXPIRY_SINK", "file"),
+    "path": os.getenv("EXPIRY_PATH", "expiring_ingredients.ndjson"),
+    "queue_size": int(os.getenv("EXPIRY_QUEUE_SIZE", "10000")),
+}
+
+METRICS = {
+    "enabled": os.getenv("METRICS_ENABLED", "true").lower() == "true",
+    "buckets": tuple(
+        float(bound)
+        for bound in os.getenv(
+            "METRICS_BUCKETS", "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10"
+        ).split(",")
+    ),
+    "query_buckets": tuple(
+        float(bound)
+        for bound in os.getenv(
+            "METRICS_QUERY_BUCKETS", "0.0005,0.001,0.0025,0.005,0.01,0.025,0.1,0.5,1"
+        ).split(",")
+    ),
+}
+
+SLOW_QUERIES = {
+    "enabled": os.getenv("SLOW_QUERIES_ENABLED", "true").lower() == "true",
+    "threshold_ms": float(os.getenv("SLOW_QUERIES_THRESHOLD_MS", "100")),
+    "size": int(os.getenv("SLOW_QUERIES_SIZE", "200")),
+    "explain": os.getenv("SLOW_QUERIES_EXPLAIN", "true").lower() == "true",
+    "max_shapes": int(os.getenv("SLOW_QUERIES_MAX_SHAPES", "500")),
+}
+
+COMPRESSION = {
+    "enabled": os.getenv("COMPRESSION_ENABLED", "true").lower() == "true",
+    "min_size": int(os.getenv("COMPRESSION_MIN_SIZE", "1024")),
+    "preference": tuple(os.getenv("COMPRESSION_PREFERENCE", "br,zstd,gzip").split(",")),
+    "gzip_level": int(os.getenv("COMPRESSION_GZIP_LEVEL", "6")),
+    "brotli_quality": int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5")),
+    "zstd_level": int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3")),
+    "threadpool_bytes": int(os.getenv("COMPRESSION_THREADPOOL_BYTES", "262144")),
+    "cache_max_bytes": int(os.getenv("COMPRESSION_CACHE_MAX_BYTES", str(32 * 2**20))),
+}
+
+SERVER = {
+    "host": os.getenv("SERVER_HOST", "0.0.0.0"),
+    "port": int(os.getenv("SERVER_PORT", "8000")),
+    "workers": int(os.getenv("SERVER_WORKERS", "0")),
+    "db_connections": int(os.getenv("SERVER_DB_CONNECTIONS", "0")),
+    "db_reserved": int(os.getenv("SERVER_DB_RESERVED", "10")),
+    "warmup": os.getenv("SERVER_WARMUP", "false").lower() == "true",
+    "ready_timeout": float(os.getenv("SERVER_READY_TIMEOUT", "60")),
+    "graceful_timeout": int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30")),
+}
+
+REPLICAS = {
+    "databases": tuple(
+        replica.strip()
+        for replica in os.getenv("DATABASE_REPLICAS", "").split(",")
+        if replica.strip()
+    ),
+    "sticky_seconds": float(os.getenv("REPLICA_STICKY_SECONDS", "5")),
+    "health_interval_seconds": float(os.getenv("REPLICA_HEALTH_INTERVAL_SECONDS", "5")),
+    "health_timeout_seconds": float(os.getenv("REPLICA_HEALTH_TIMEOUT_SECONDS", "2")),
+    "max_lag_seconds": float(os.getenv("REPLICA_MAX_LAG_SECONDS", "10")),
+}
@@ -2,41 +2,270 @@
 API key Authentication
 """
 
+import hashlib
 import os
+import secrets
+import threading
+import time
 
 from dotenv import load_dotenv
-from fastapi import HTTPException, Security, status
+from config.database import ApiKeyModel
+from config.replicas import begin_request, end_request
+from config.settings import API_KEYS
+from fastapi import Depends, HTTPException, Request, Security, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security.api_key import APIKeyHeader
 
 load_dotenv()
 
 API_KEY = os.getenv("API_KEY")
 API_KEY_NAME = "x-api-key"
+ADMIN_SCOPE = "admin"
 
 api_key_header = APIKeyHeader(name=API_KEY_NAME, auto_error=False)
 
 
+def hash_api_key(api_key: str):
+    """
+    Hashes an API key.
+
+    Args:
+        api_key (str): The API key.
+
+    Returns:
+        str: The hexadecimal SHA-256 digest of the API key.
+    """
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+def generate_api_key():
+    """
+    Generates a new random API key.
+
+    Returns:
+        str: The API key.
+    """
+    return secrets.token_urlsafe(32)
+
+
+class ApiKeyStore:
+    """
+    In-memory store of the active API keys, keyed by their digest.
+
+    Only the digests of the keys are stored. The `API_KEY` environment
+    variable, when set, is kept as a bootstrap key with the admin scope.
+
+    Every add and remove bumps a version. A reload that overlaps one is
+    discarded, since its read may predate the change, and the next request
+    reloads again.
+    """
+
+    def __init__(self, refresh_seconds: int):
+        self.keys = {}
+        self.refresh_seconds = refresh_seconds
+        self.loaded_at = None
+        self.version = 0
+        self.lock = threading.Lock()
+
+    def load(self):
+        """
+        Reloads the active API keys from the database.
+
+        Returns:
+            bool: Whether the keys were replaced, False if an add or a remove
+            happened during the read.
+        """
+        with self.lock:
+            version = self.version
+        keys = {}
+        if API_KEY:
+            key_hash = hash_api_key(API_KEY)
+            keys[key_hash] = {
+                "id": None,
+                "name": "default",
+                "key_hash": key_hash,
+                "scopes": frozenset({ADMIN_SCOPE}),
+                "user_id": None,
+            }
+        for row in ApiKeyModel.select().where(ApiKeyModel.is_active).dicts():
+            keys[row["key_hash"]] = api_key_record(row)
+        with self.lock:
+            if self.version != version:
+                self.loaded_at = None
+                return False
+            self.keys = keys
+            self.loaded_at = time.monotonic()
+            return True
+
+    def refresh_due(self):
+        """
+        Checks whether the keys should be reloaded, so changes made by other
+        workers are picked up. Only one caller gets True for each refresh.
+
+        Returns:
+            bool: Whether the caller should reload the keys.
+        """
+        with self.lock:
+            now = time.monotonic()
+            if self.loaded_at is not None and (
+                now - self.loaded_at < self.refresh_seconds
+            ):
+                return False
+            self.loaded_at = now
+            return True
+
+    def add(self, row: dict):
+        """
+        Adds an API key to the store.
+
+        Args:
+            row (dict): The API key row.
+        """
+        with self.lock:
+            self.keys = {**self.keys, row["key_hash"]: api_key_record(row)}
+            self.version += 1
+
+    def remove(self, key_hash: str):
+        """
+        Removes an API key from the store.
+
+        Args:
+            key_hash (str): The digest of the API key.
+        """
+        with self.lock:
+            self.keys = {
+                digest: record
+                for digest, record in self.keys.items()
+                if digest != key_hash
+            }
+            self.version += 1
+
+    def lookup(self, api_key: str):
+        """
+        Finds the record of an API key.
+
+        Args:
+            api_key (str): The API key.
+
+        Returns:
+            dict: The record of the API key, or None if it is not active.
+        """
+        if not api_key:
+            return None
+        return self.keys.get(hash_api_key(api_key))
+
+
+def api_key_record(row: dict):
+    """
+    Builds the in-memory record of an API key row.
+
+    Args:
+        row (dict): The API key row.
+
+    Returns:
+        dict: The id, name, digest, scopes and user of the API key.
+    """
+    return {
+        "id": row["id"],
+        "name": row["name"],
+        "key_hash": row["key_hash"],
+        "scopes": frozenset(scope for scope in row["scopes"].split(",") if scope),
+        "user_id": row["user_id"],
+    }
+
+
+api_key_store = ApiKeyStore(API_KEYS["refresh_seconds"])
+
+
 async def get_api_key(api_key: str = Security(api_key_header)):
     """
     Validates the provided API key from the request header.
 
     Args:
-        api_key_header (str): The API key obtained from the `x-api-key` header.
+        api_key (str): The API key obtained from the `x-api-key` header.
 
     Returns:
-        str: The API key if it is valid.
+        dict: The record of the API key if it is valid.
 
     Raises:
         HTTPException: If the API key is invalid or missing, an HTTP exception
         with status 403 (Forbidden) and an "Unauthorized" message is raised.
     """
-    if api_key == API_KEY:
-        return api_key_header
-    raise HTTPException(
+    if api_key_store.refresh_due():
+        await run_in_threadpool(api_key_store.load)
+    record = api_key_store.lookup(api_key)
+    if record is not None:
+        return record
+    raise forbidden("Unauthorized")
+
+
+def client_key(request: Request):
+    """
+    Identifies the client of a request.
+
+    Args:
+        request (Request): The request.
+
+    Returns:
+        str: The hash of the API key, so the raw keys are not kept, or the
+        address of the client without a key.
+    """
+    api_key = request.headers.get("x-api-key")
+    if api_key:
+        return hash_api_key(api_key)
+    return request.client.host if request.client else ""
+
+
+async def route_reads(request: Request):
+    """
+    Routes the reads of a request across the read replicas, and keeps the
+    reads of a client that wrote recently on the primary.
+
+    Args:
+        request (Request): The request.
+    """
+    route = begin_request(request.method, client_key(request))
+    try:
+        yield
+    finally:
+        end_request(route)
+
+
+def require_scope(scope: str):
+    """
+    Builds a dependency that checks a scope of the API key.
+
+    Args:
+        scope (str): The required scope. Keys with the admin scope have every
+        scope.
+
+    Returns:
+        Callable: The FastAPI dependency, which returns the API key record.
+    """
+
+    async def check_scope(record: dict = Depends(get_api_key)):
+        if scope in record["scopes"] or ADMIN_SCOPE in record["scopes"]:
+            return record
+        raise forbidden(f"Missing scope: {scope}")
+
+    return check_scope
+
+
+def forbidden(message: str):
+    """
+    Builds the HTTP exception returned when a request is not allowed.
+
+    Args:
+        message (str): The reason why the request is not allowed.
+
+    Returns:
+        HTTPException: An HTTP exception with status 403 (Forbidden).
+    """
+    return HTTPException(
         status_code=status.HTTP_403_FORBIDDEN,
         detail={
             "status": False,
             "status_code": status.HTTP_403_FORBIDDEN,
-            "message": "Unauthorized",
+            "message": message,
         },
     )
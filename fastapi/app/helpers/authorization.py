@@ -0,0 +1,190 @@
+"""
+Role-based authorization
+"""
+
+import threading
+
+from config.database import PermissionModel, RolePermissionModel, UserModel
+from helpers.api_key_auth import forbidden, get_api_key
+from fastapi import Depends
+
+
+class PermissionIndex:
+    """
+    This class represents an in-memory index of the permissions of every role.
+
+    Every permission gets a bit position and every role a bitset (a python
+    int) of its permissions, so a check is a dictionary lookup and a bit test.
+    The role of every active user is indexed too, so a check never queries
+    the database.
+    """
+
+    def __init__(self):
+        self.bits = {}
+        self.names = {}
+        self.permission_names = {}
+        self.roles = {}
+        self.users = {}
+        self.lock = threading.Lock()
+
+    def load(self):
+        """
+        This method rebuilds the index from the database.
+        """
+        permissions = list(PermissionModel.select().tuples())
+        grants = list(RolePermissionModel.select().tuples())
+        users = dict(
+            UserModel.select(UserModel.id, UserModel.role_id)
+            .where(UserModel.is_active)
+            .tuples()
+        )
+        with self.lock:
+            self.bits = {}
+            self.names = {}
+            self.permission_names = {}
+            self.roles = {}
+            self.users = users
+            for permission_id, name, _ in permissions:
+                self._set_permission(permission_id, name)
+            for role_id, permission_id in grants:
+                self._grant(role_id, permission_id)
+
+    def set_user(self, user_id: int, role_id: int, is_active: bool):
+        """
+        This method adds a user to the index, or updates or removes it.
+
+        Args:
+        - user_id (int): The id of the user.
+        - role_id (int): The id of the role of the user.
+        - is_active (bool): Whether the user is active. Inactive users are
+          removed.
+        """
+        with self.lock:
+            if is_active:
+                self.users = {**self.users, user_id: role_id}
+            else:
+                self.users = {
+                    key: value for key, value in self.users.items() if key != user_id
+                }
+
+    def user_role(self, user_id: int):
+        """
+        This method gets the role of an active user.
+
+        Args:
+        - user_id (int): The id of the user.
+
+        Returns:
+        - int: The id of the role, or None if the user is unknown or inactive.
+        """
+        return self.users.get(user_id)
+
+    def set_permission(self, permission_id: int, name: str):
+        """
+        This method adds a permission to the index or renames it.
+
+        Args:
+        - permission_id (int): The id of the permission.
+        - name (str): The name of the permission.
+        """
+        with self.lock:
+            self._set_permission(permission_id, name)
+
+    def grant(self, role_id: int, permission_id: int):
+        """
+        This method grants a permission to a role.
+
+        Args:
+        - role_id (int): The id of the role.
+        - permission_id (int): The id of the permission.
+        """
+        with self.lock:
+            self._grant(role_id, permission_id)
+
+    def revoke(self, role_id: int, permission_id: int):
+        """
+        This method revokes a permission from a role.
+
+        Args:
+        - role_id (int): The id of the role.
+        - permission_id (int): The id of the permission.
+        """
+        with self.lock:
+            bit = self.bits.get(permission_id)
+            if bit is not None and role_id in self.roles:
+                self.roles[role_id] &= ~(1 << bit)
+
+    def has_permission(self, role_id: int, name: str):
+        """
+        This method checks whether a role has a permission.
+
+        Args:
+        - role_id (int): The id of the role.
+        - name (str): The name of the permission.
+
+        Returns:
+        - bool: Whether the role has the permission.
+        """
+        bit = self.names.get(name)
+        return bit is not None and bool(self.roles.get(role_id, 0) >> bit & 1)
+
+    def role_permissions(self, role_id: int):
+        """
+        This method gets the ids of the permissions of a role.
+
+        Args:
+        - role_id (int): The id of the role.
+
+        Returns:
+        - List[int]: The ids of the permissions of the role.
+        """
+        mask = self.roles.get(role_id, 0)
+        return sorted(
+            permission_id for permission_id, bit in self.bits.items() if mask >> bit & 1
+        )
+
+    def _set_permission(self, permission_id, name):
+        if permission_id not in self.bits:
+            self.bits[permission_id] = len(self.bits)
+        previous_name = self.permission_names.get(permission_id)
+        if previous_name is not None:
+            del self.names[previous_name]
+        self.permission_names[permission_id] = name
+        self.names[name] = self.bits[permission_id]
+
+    def _grant(self, role_id, permission_id):
+        bit = self.bits.get(permission_id)
+        if bit is not None:
+            self.roles[role_id] = self.roles.get(role_id, 0) | 1 << bit
+
+
+permission_index = PermissionIndex()
+
+
+def require_permission(name: str):
+    """
+    This function builds a dependency that checks a permission of the user.
+
+    The user is the one the API key of the request was issued for. Its role
+    and the permission are checked against the in-memory index, so the
+    check does not query the database.
+
+    Args:
+    - name (str): The name of the permission, e.g. "Create Recipe".
+
+    Returns:
+    - Callable: The FastAPI dependency, which returns the id and the role of
+      the user.
+    """
+
+    async def check_permission(record: dict = Depends(get_api_key)):
+        if record["user_id"] is None:
+            raise forbidden("The API key does not belong to a user")
+        role_id = permission_index.user_role(record["user_id"])
+        if role_id is None:
+            raise forbidden("Unknown or inactive user")
+        if not permission_index.has_permission(role_id, name):
+            raise forbidden(f"Missing permission: {name}")
+        return {"id": record["user_id"], "role_id": role_id}
+
+    return check_permission
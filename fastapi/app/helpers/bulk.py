@@ -0,0 +1,161 @@
+"""
+Bulk inserts
+"""
+
+import operator
+from functools import reduce
+
+from peewee import IntegrityError
+
+from config.settings import BULK
+
+
+def bulk_insert(model, rows, unique_fields, chunk_size=None):
+    """
+    This function inserts rows in chunks of multi-row INSERTs.
+
+    Rows that repeat a unique value of an earlier row of the payload, or of an
+    existing row, are reported as conflicts and skipped. Every chunk is
+    inserted in one transaction; if a concurrent write makes it fail, the
+    chunk is retried row by row so only the conflicting rows are skipped.
+
+    Args:
+    - model (Model): The model of the table.
+    - rows (List[dict]): The validated rows to insert.
+    - unique_fields (List[Field]): The unique fields of the table. The first
+      one is used to read back the ids of the inserted rows.
+    - chunk_size (int): The number of rows of each INSERT.
+
+    Returns:
+    - List[dict]: The result of every row, in the order of the payload.
+    """
+    chunk_size = chunk_size or BULK["chunk_size"]
+    results = [None] * len(rows)
+    seen = {field.name: set() for field in unique_fields}
+    for index, row in enumerate(rows):
+        for field in unique_fields:
+            if row[field.name] in seen[field.name]:
+                results[index] = conflict(index, f"Duplicated {field.name} in payload")
+                break
+        else:
+            for field in unique_fields:
+                seen[field.name].add(row[field.name])
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = [
+            index
+            for index in range(start, min(start + chunk_size, len(rows)))
+            if results[index] is None
+        ]
+        if chunk:
+            insert_chunk(model, rows, chunk, unique_fields, results)
+    return results
+
+
+def insert_chunk(model, rows, chunk, unique_fields, results):
+    """
+    This function inserts one chunk of rows and stores their results.
+
+    Args:
+    - model (Model): The model of the table.
+    - rows (List[dict]): All the rows of the payload.
+    - chunk (List[int]): The indexes of the rows of the chunk.
+    - unique_fields (List[Field]): The unique fields of the table.
+    - results (List[dict]): The results of the payload, updated in place.
+    """
+    existing = find_existing(model, [rows[index] for index in chunk], unique_fields)
+    pending = []
+    for index in chunk:
+        field = next(
+            (f for f in unique_fields if rows[index][f.name] in existing[f.name]),
+            None,
+        )
+        if field is None:
+            pending.append(index)
+        else:
+            results[index] = conflict(index, f"The {field.name} already exists")
+    if not pending:
+        return
+
+    database = model._meta.database  # pylint: disable=protected-access
+    try:
+        with database.atomic():
+            model.insert_many([rows[index] for index in pending]).execute()
+        inserted = pending
+    except IntegrityError:
+        inserted = []
+        for index in pending:
+            try:
+                with database.atomic():
+                    model.insert(rows[index]).execute()
+                inserted.append(index)
+            except IntegrityError:
+                results[index] = conflict(index, "The row already exists")
+
+    key = unique_fields[0]
+    ids = dict(
+        model.select(key, model.id)
+        .where(key.in_([rows[index][key.name] for index in inserted]))
+        .tuples()
+    )
+    for index in inserted:
+        results[index] = {
+            "index": index,
+            "status": "created",
+            "id": ids.get(rows[index][key.name]),
+        }
+
+
+def find_existing(model, rows, unique_fields):
+    """
+    This function finds the unique values of the rows that already exist.
+
+    Args:
+    - model (Model): The model of the table.
+    - rows (List[dict]): The rows to check.
+    - unique_fields (List[Field]): The unique fields of the table.
+
+    Returns:
+    - dict: The existing values of every unique field.
+    """
+    condition = reduce(
+        operator.or_,
+        [field.in_([row[field.name] for row in rows]) for field in unique_fields],
+    )
+    existing = {field.name: set() for field in unique_fields}
+    for row in model.select(*unique_fields).where(condition).dicts():
+        for field in unique_fields:
+            existing[field.name].add(row[field.name])
+    return existing
+
+
+def conflict(index: int, detail: str):
+    """
+    This function builds the result of a conflicting row.
+
+    Args:
+    - index (int): The position of the row in the payload.
+    - detail (str): The reason of the conflict.
+
+    Returns:
+    - dict: The result of the row.
+    """
+    return {"index": index, "status": "conflict", "detail": detail}
+
+
+def bulk_summary(results):
+    """
+    This function summarizes the results of a bulk insert.
+
+    Args:
+    - results (List[dict]): The result of every row.
+
+    Returns:
+    - dict: The number of created and conflicting rows and the results.
+    """
+    created = sum(1 for result in results if result["status"] == "created")
+    return {
+        "created": created,
+        "conflicts": len(results) - created,
+        "results": results,
+    }
@@ -0,0 +1,260 @@
+"""
+Entity cache
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from config.settings import CACHE
+
+
+class CacheBackend:
+    """
+    This class represents the interface of a cache backend.
+
+    A shared backend only has to implement these methods to replace the
+    in-process one.
+    """
+
+    def get(self, key: str):
+        """
+        This method gets a value from the cache.
+
+        Args:
+        - key (str): The key of the value.
+
+        Returns:
+        - Any: The value, or None if it is missing or expired.
+        """
+        raise NotImplementedError
+
+    def token(self):
+        """
+        This method gets a token to take before a read of the database whose
+        result will be cached.
+
+        Returns:
+        - int: The token.
+        """
+        raise NotImplementedError
+
+    def set(self, key: str, value, token: int = None):
+        """
+        This method stores a value in the cache. With a token, the value is
+        not stored if the key was invalidated since the token was taken, as
+        the value may predate the write that invalidated it.
+
+        Args:
+        - key (str): The key of the value.
+        - value (Any): A JSON serializable value.
+        - token (int): The token taken before the value was read.
+        """
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        """
+        This method removes a value from the cache.
+
+        Args:
+        - key (str): The key of the value.
+        """
+        raise NotImplementedError
+
+    def delete_prefix(self, prefix: str):
+        """
+        This method removes the values whose key starts with a prefix, e.g.
+        the entities of a table.
+
+        Args:
+        - prefix (str): The prefix of the keys.
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        """
+        This method removes every value from the cache.
+        """
+        raise NotImplementedError
+
+    def stats(self):
+        """
+        This method gets the cache statistics.
+
+        Returns:
+        - dict: The hit, miss and eviction counters and the cache size.
+        """
+        raise NotImplementedError
+
+
+class Invalidations:
+    """
+    This class numbers the invalidations of a cache, so a value read before
+    one is not stored after it.
+
+    The last invalidation of the most recent keys, up to `max_keys`, is kept.
+    An older one raises a floor instead, under which every token is stale,
+    as do the invalidations of many keys at once.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self.sequence = 0
+        self.floor = 0
+        self.keys = OrderedDict()
+
+    def invalidate(self, key: str):
+        """
+        This method records the invalidation of a key.
+
+        Args:
+        - key (str): The key.
+        """
+        self.sequence += 1
+        self.keys[key] = self.sequence
+        self.keys.move_to_end(key)
+        if len(self.keys) > self.max_keys:
+            _, sequence = self.keys.popitem(last=False)
+            self.floor = max(self.floor, sequence)
+
+    def invalidate_all(self):
+        """
+        This method records the invalidation of every key.
+        """
+        self.sequence += 1
+        self.floor = self.sequence
+        self.keys.clear()
+
+    def stale(self, key: str, token: int) -> bool:
+        """
+        This method checks whether a key was invalidated since a token was
+        taken.
+
+        Args:
+        - key (str): The key.
+        - token (int): The sequence when the token was taken.
+
+        Returns:
+        - bool: Whether a value read after the token may be stale.
+        """
+        return token < self.floor or self.keys.get(key, 0) > token
+
+
+class MemoryCache(CacheBackend):
+    """
+    This class represents an in-process cache with a TTL, LRU eviction and a
+    bounded memory budget.
+    """
+
+    def __init__(self, config: dict):
+        self.config = config
+        self.entries = OrderedDict()
+        self.size = 0
+        self.invalidations = Invalidations(config["max_entries"])
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            expires_at, size, value = entry
+            if expires_at < time.monotonic():
+                self._remove(key, size)
+                self.counters["misses"] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.counters["hits"] += 1
+            return value
+
+    def token(self):
+        with self.lock:
+            return self.invalidations.sequence
+
+    def set(self, key, value, token=None):
+        size = len(key) + len(json.dumps(value, default=str))
+        if size > self.config["max_bytes"]:
+            return
+        with self.lock:
+            if token is not None and self.invalidations.stale(key, token):
+                return
+            if key in self.entries:
+                self._remove(key, self.entries[key][1])
+            self.entries[key] = (time.monotonic() + self.config["ttl"], size, value)
+            self.size += size
+            while (
+                len(self.entries) > self.config["max_entries"]
+                or self.size > self.config["max_bytes"]
+            ):
+                _, (_, evicted_size, _) = self.entries.popitem(last=False)
+                self.size -= evicted_size
+                self.counters["evictions"] += 1
+
+    def delete(self, key):
+        with self.lock:
+            self.invalidations.invalidate(key)
+            entry = self.entries.get(key)
+            if entry is not None:
+                self._remove(key, entry[1])
+
+    def delete_prefix(self, prefix):
+        with self.lock:
+            self.invalidations.invalidate_all()
+            for key in [key for key in self.entries if key.startswith(prefix)]:
+                self._remove(key, self.entries[key][1])
+
+    def clear(self):
+        with self.lock:
+            self.invalidations.invalidate_all()
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                "backend": "memory",
+                **self.counters,
+                "entries": len(self.entries),
+                "bytes": self.size,
+                "max_entries": self.config["max_entries"],
+                "max_bytes": self.config["max_bytes"],
+            }
+
+    def _remove(self, key, size):
+        del self.entries[key]
+        self.size -= size
+
+
+def create_cache(config: dict):
+    """
+    This function creates the cache backend of a configuration.
+
+    Args:
+    - config (dict): The cache configuration.
+
+    Returns:
+    - CacheBackend: The cache backend.
+    """
+    if config["backend"] != "memory":
+        raise ValueError(f"Unknown cache backend: {config['backend']}")
+    return MemoryCache(config)
+
+
+entity_cache = create_cache(CACHE)
+
+
+def entity_key(table: str, entity_id: int):
+    """
+    This function builds the cache key of an entity.
+
+    Args:
+    - table (str): The table of the entity.
+    - entity_id (int): The id of the entity.
+
+    Returns:
+    - str: The cache key.
+    """
+    return f"{table}:{entity_id}"
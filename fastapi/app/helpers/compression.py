@@ -0,0 +1,420 @@
+"""
+Response compression
+"""
+
+import gzip
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from config.settings import COMPRESSION
+from fastapi.concurrency import run_in_threadpool
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE = ("application/json", "application/x-ndjson", "text/")
+
+
+def build_codecs(config: dict):
+    """
+    This function builds the compressors of the available encodings: gzip,
+    and brotli and zstd when their packages are installed.
+
+    Args:
+    - config (dict): The compression settings.
+
+    Returns:
+    - dict: The compress function of every encoding, in order of preference.
+    """
+    codecs = {"gzip": lambda data: gzip.compress(data, config["gzip_level"], mtime=0)}
+    if brotli is not None:
+        codecs["br"] = lambda data: brotli.compress(
+            data, quality=config["brotli_quality"]
+        )
+    if zstandard is not None:
+        codecs["zstd"] = lambda data: zstandard.ZstdCompressor(
+            level=config["zstd_level"]
+        ).compress(data)
+    return {
+        encoding: codecs[encoding]
+        for encoding in config["preference"]
+        if encoding in codecs
+    }
+
+
+def parse_accept_encoding(header: str):
+    """
+    This function parses an Accept-Encoding header.
+
+    Args:
+    - header (str): The value of the header.
+
+    Returns:
+    - dict: The quality of every encoding.
+    """
+    weights = {}
+    for part in header.split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name.strip():
+            weights[name.strip().lower()] = quality
+    return weights
+
+
+def vary_headers(headers):
+    """
+    This function adds Accept-Encoding to the Vary header of a response of a
+    compressible content type, so a shared cache keeps its compressed and
+    uncompressed versions apart.
+
+    Args:
+    - headers (Sequence[tuple]): The headers of the response.
+
+    Returns:
+    - List[tuple]: The headers.
+    """
+    headers = list(headers)
+    found = {name.lower(): value for name, value in headers}
+    content_type = found.get(b"content-type", b"").decode("latin-1")
+    if b"content-encoding" in found or not content_type.startswith(COMPRESSIBLE):
+        return headers
+    vary = found.get(b"vary")
+    if vary is None:
+        return headers + [(b"vary", b"Accept-Encoding")]
+    if vary.strip() == b"*" or b"accept-encoding" in vary.lower():
+        return headers
+    return [
+        (name, vary + b", Accept-Encoding" if name.lower() == b"vary" else value)
+        for name, value in headers
+    ]
+
+
+def varying(send):
+    """
+    This function wraps the send callable of a response that is not
+    compressed, so its start gets the Vary header.
+
+    Args:
+    - send (Callable): The ASGI send callable.
+
+    Returns:
+    - Callable: The wrapped send callable.
+    """
+
+    async def send_varying(message):
+        if message["type"] == "http.response.start":
+            message = {**message, "headers": vary_headers(message.get("headers", ()))}
+        await send(message)
+
+    return send_varying
+
+
+@lru_cache(maxsize=256)
+def negotiate(header: str, encodings):
+    """
+    This function picks the encoding of a response: the one with the highest
+    quality in Accept-Encoding, ties broken by the server preference.
+
+    Args:
+    - header (str): The value of the Accept-Encoding header.
+    - encodings (Tuple[str, ...]): The available encodings, in order of
+      preference.
+
+    Returns:
+    - str: The encoding, or None if the response is sent as is.
+    """
+    weights = parse_accept_encoding(header)
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class Compressor:
+    """
+    This class compresses the responses and caches the compressed bodies of
+    the responses with an ETag.
+
+    A body is cached by method, path, query string, ETag and encoding, so a
+    hot list is compressed once per version of its table. The cache is an
+    LRU bounded in bytes.
+    """
+
+    def __init__(self, config: dict):
+        self.config = config
+        self.codecs = build_codecs(config)
+        self.cache = OrderedDict()
+        self.cache_size = 0
+        self.counters = {
+            "skipped": 0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "cache_evictions": 0,
+        }
+        self.encodings = {
+            encoding: {
+                "responses": 0,
+                "bytes_in": 0,
+                "bytes_out": 0,
+                "cpu_seconds": 0.0,
+            }
+            for encoding in self.codecs
+        }
+        self.lock = threading.Lock()
+
+    def cached(self, key):
+        """
+        This method gets a compressed body from the cache.
+
+        Args:
+        - key (Tuple): The method, path, query string, ETag and encoding.
+
+        Returns:
+        - bytes: The compressed body, or None if it is not cached.
+        """
+        with self.lock:
+            body = self.cache.get(key)
+            if body is None:
+                self.counters["cache_misses"] += 1
+                return None
+            self.cache.move_to_end(key)
+            self.counters["cache_hits"] += 1
+            return body
+
+    def store(self, key, body: bytes):
+        """
+        This method caches a compressed body.
+
+        Args:
+        - key (Tuple): The method, path, query string, ETag and encoding.
+        - body (bytes): The compressed body.
+        """
+        if len(body) > self.config["cache_max_bytes"]:
+            return
+        with self.lock:
+            previous = self.cache.pop(key, None)
+            if previous is not None:
+                self.cache_size -= len(previous)
+            self.cache[key] = body
+            self.cache_size += len(body)
+            while self.cache_size > self.config["cache_max_bytes"]:
+                _, evicted = self.cache.popitem(last=False)
+                self.cache_size -= len(evicted)
+                self.counters["cache_evictions"] += 1
+
+    async def compress(self, encoding: str, body: bytes):
+        """
+        This method compresses a body. Large bodies are compressed in the
+        threadpool, so the event loop keeps serving.
+
+        Args:
+        - encoding (str): The encoding.
+        - body (bytes): The body.
+
+        Returns:
+        - bytes: The compressed body.
+        """
+        if len(body) >= self.config["threadpool_bytes"]:
+            compressed, seconds = await run_in_threadpool(
+                self._compress, encoding, body
+            )
+        else:
+            compressed, seconds = self._compress(encoding, body)
+        with self.lock:
+            stats = self.encodings[encoding]
+            stats["responses"] += 1
+            stats["bytes_in"] += len(body)
+            stats["bytes_out"] += len(compressed)
+            stats["cpu_seconds"] += seconds
+        return compressed
+
+    def skip(self):
+        """
+        This method counts a response that was sent as is.
+        """
+        with self.lock:
+            self.counters["skipped"] += 1
+
+    def stats(self):
+        """
+        This method gets the compression statistics.
+
+        Returns:
+        - dict: The bytes in and out, the bytes saved, the CPU time and the
+          bytes saved per CPU millisecond of every encoding, and the cache
+          counters and size.
+        """
+        with self.lock:
+            encodings = {
+                encoding: {
+                    **stats,
+                    "bytes_saved": stats["bytes_in"] - stats["bytes_out"],
+                    "ratio": (
+                        stats["bytes_out"] / stats["bytes_in"]
+                        if stats["bytes_in"]
+                        else None
+                    ),
+                    "bytes_saved_per_cpu_ms": (
+                        (stats["bytes_in"] - stats["bytes_out"])
+                        / (stats["cpu_seconds"] * 1000)
+                        if stats["cpu_seconds"]
+                        else None
+                    ),
+                }
+                for encoding, stats in self.encodings.items()
+            }
+            return {
+                "encodings": encodings,
+                **self.counters,
+                "cache_entries": len(self.cache),
+                "cache_bytes": self.cache_size,
+            }
+
+    def _compress(self, encoding, body):
+        start = time.thread_time()
+        compressed = self.codecs[encoding](body)
+        return compressed, time.thread_time() - start
+
+
+class CompressionMiddleware:
+    """
+    This class is a pure ASGI middleware that compresses the responses
+    negotiated from Accept-Encoding.
+
+    The body is buffered and compressed when it is complete, over the size
+    threshold and of a text content type. Streamed responses, e.g. the
+    exports, and responses that already have a Content-Encoding are sent as
+    is. Every response of a compressible content type varies on
+    Accept-Encoding, whether it is compressed or not.
+    """
+
+    def __init__(self, app, compressor: Compressor = None):
+        self.app = app
+        self.compressor = compressor or response_compressor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        encoding = negotiate(
+            headers.get(b"accept-encoding", b"").decode("latin-1"),
+            tuple(self.compressor.codecs),
+        )
+        if encoding is None:
+            await self.app(scope, receive, varying(send))
+            return
+        await self.app(
+            scope, receive, PendingResponse(self.compressor, scope, encoding, send).send
+        )
+
+
+class PendingResponse:
+    """
+    This class holds the start of a response until its body shows whether
+    it should be compressed.
+    """
+
+    def __init__(self, compressor: Compressor, scope, encoding: str, send):
+        self.compressor = compressor
+        self.scope = scope
+        self.encoding = encoding
+        self.send_next = send
+        self.start = None
+        self.passthrough = False
+
+    async def send(self, message):
+        """
+        This method is the send callable of the wrapped application.
+
+        Args:
+        - message (dict): The ASGI message.
+        """
+        if self.passthrough:
+            await self.send_next(message)
+        elif message["type"] == "http.response.start":
+            self.start = message
+        elif message.get("more_body", False) or not self.compressible(message):
+            self.compressor.skip()
+            self.passthrough = True
+            await self.send_next(
+                {**self.start, "headers": vary_headers(self.start.get("headers", ()))}
+            )
+            await self.send_next(message)
+        else:
+            await self.send_compressed(message.get("body", b""))
+
+    def compressible(self, message) -> bool:
+        """
+        This method checks whether the response should be compressed.
+
+        Args:
+        - message (dict): The first body message.
+
+        Returns:
+        - bool: Whether the response is compressed.
+        """
+        headers = {name.lower(): value for name, value in self.start.get("headers", ())}
+        content_type = headers.get(b"content-type", b"").decode("latin-1")
+        return (
+            len(message.get("body", b"")) >= self.compressor.config["min_size"]
+            and b"content-encoding" not in headers
+            and content_type.startswith(COMPRESSIBLE)
+        )
+
+    async def send_compressed(self, body: bytes):
+        """
+        This method sends the response compressed, from the cache when its
+        ETag was compressed before.
+
+        Args:
+        - body (bytes): The body of the response.
+        """
+        headers = vary_headers(
+            (name, value)
+            for name, value in self.start.get("headers", ())
+            if name.lower() != b"content-length"
+        )
+        etag = dict(headers).get(b"etag")
+        key = None
+        compressed = None
+        if etag is not None and self.start["status"] == 200:
+            key = (
+                self.scope["method"],
+                self.scope["path"],
+                self.scope["query_string"],
+                etag,
+                self.encoding,
+            )
+            compressed = self.compressor.cached(key)
+        if compressed is None:
+            compressed = await self.compressor.compress(self.encoding, body)
+            if key is not None:
+                self.compressor.store(key, compressed)
+        headers += [
+            (b"content-encoding", self.encoding.encode("latin-1")),
+            (b"content-length", str(len(compressed)).encode("latin-1")),
+        ]
+        await self.send_next({**self.start, "headers": headers})
+        await self.send_next({"type": "http.response.body", "body": compressed})
+
+
+response_compressor = Compressor(COMPRESSION)
@@ -0,0 +1,255 @@
+"""
+ETags and conditional GETs
+"""
+
+import hashlib
+import threading
+import time
+
+from peewee import IntegrityError
+from config.database import TableVersionModel, database
+from config.replicas import pin_primary
+from config.settings import TABLE_VERSIONS
+from fastapi import HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+
+
+class TableVersions:
+    """
+    This class keeps a version counter for every table in the table_versions
+    table. The writes bump the version of their table, so the ETag of a read
+    changes with the data without hashing the body, and is the same in every
+    worker.
+
+    Every worker keeps a copy of the versions and reloads it every
+    `TABLE_VERSIONS_REFRESH_SECONDS`. A version bumped by another worker runs
+    the listeners of its table, which reload the state the worker built from
+    it, such as an index or cached rows. The own bumps of a worker do not,
+    since its writes already updated that state.
+    """
+
+    def __init__(self, config: dict):
+        self.config = config
+        self.versions = {}
+        self.listeners = {}
+        self.loaded_at = None
+        self.lock = threading.Lock()
+
+    def listen(self, tables, listener):
+        """
+        This method runs a function when another worker writes to some
+        tables.
+
+        Args:
+        - tables (Iterable[str]): The names of the tables.
+        - listener (Callable): The function, called without arguments.
+        """
+        for table in tables:
+            self.listeners.setdefault(table, []).append(listener)
+
+    def bump(self, table: str):
+        """
+        This method bumps the version of a table. It runs on the connection
+        of the write, in its transaction if there is one, so the version
+        changes when the write commits.
+
+        Args:
+        - table (str): The name of the table.
+        """
+        # pylint: disable=no-value-for-parameter
+        with database.atomic():
+            bumped = (
+                TableVersionModel.update(version=TableVersionModel.version + 1)
+                .where(TableVersionModel.name == table)
+                .execute()
+            )
+            if not bumped:
+                try:
+                    with database.atomic():
+                        TableVersionModel.insert(name=table, version=1).execute()
+                except IntegrityError:
+                    TableVersionModel.update(
+                        version=TableVersionModel.version + 1
+                    ).where(TableVersionModel.name == table).execute()
+            version = (
+                TableVersionModel.select(TableVersionModel.version)
+                .where(TableVersionModel.name == table)
+                .scalar()
+            )
+        with self.lock:
+            if self.versions.get(table, 0) == version - 1:
+                self.versions[table] = version
+            else:
+                self.loaded_at = None
+
+    async def bump_async(self, table: str):
+        """
+        This method bumps the version of a table in the threadpool, after a
+        write of the asynchronous database.
+
+        Args:
+        - table (str): The name of the table.
+        """
+        await run_in_threadpool(self.bump, table)
+
+    def load(self, notify: bool = True):
+        """
+        This method reloads the versions from the database, and runs the
+        listeners of the tables whose version changed. If a listener fails,
+        the versions are kept, so the next request runs it again.
+
+        Args:
+        - notify (bool): Whether to run the listeners, False on startup,
+          when the state is loaded anyway.
+
+        Returns:
+        - List[str]: The names of the tables whose version changed.
+        """
+        versions = dict(
+            TableVersionModel.select(
+                TableVersionModel.name, TableVersionModel.version
+            ).tuples()
+        )
+        with self.lock:
+            changed = sorted(
+                table
+                for table in versions.keys() | self.versions.keys()
+                if versions.get(table, 0) != self.versions.get(table, 0)
+            )
+        if notify:
+            listeners = {}
+            for table in changed:
+                for listener in self.listeners.get(table, ()):
+                    listeners[id(listener)] = listener
+            try:
+                for listener in listeners.values():
+                    listener()
+            except Exception:
+                with self.lock:
+                    self.loaded_at = None
+                raise
+        with self.lock:
+            self.versions = versions
+            self.loaded_at = time.monotonic()
+        return changed
+
+    def refresh_due(self):
+        """
+        This method checks whether the versions should be reloaded, so the
+        writes of other workers are picked up. Only one caller gets True for
+        each refresh.
+
+        Returns:
+        - bool: Whether the caller should reload the versions.
+        """
+        with self.lock:
+            now = time.monotonic()
+            if self.loaded_at is not None and (
+                now - self.loaded_at < self.config["refresh_seconds"]
+            ):
+                return False
+            self.loaded_at = now
+            return True
+
+    def etag(self, table: str, *parts) -> str:
+        """
+        This method builds the ETag of a read of a table.
+
+        Args:
+        - table (str): The name of the table.
+        - parts (Tuple): The values that tell the reads of the table apart,
+          e.g. the id of an entity.
+
+        Returns:
+        - str: The weak ETag.
+        """
+        tag = "-".join(
+            str(part) for part in (table, self.versions.get(table, 0), *parts)
+        )
+        return f'W/"{tag}"'
+
+
+async def sync_table_versions():
+    """
+    This dependency reloads the table versions when they are due, so the
+    request sees the writes of the other workers.
+    """
+    if table_versions.refresh_due():
+        await run_in_threadpool(table_versions.load)
+
+
+def matches(if_none_match: str, etag: str) -> bool:
+    """
+    This function checks an If-None-Match header with the weak comparison.
+
+    Args:
+    - if_none_match (str): The value of the header.
+    - etag (str): The current ETag.
+
+    Returns:
+    - bool: Whether the client has the current version.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def conditional_get(table: str, key: str = None):
+    """
+    This function builds a dependency that answers a conditional GET of a
+    table.
+
+    The ETag is taken before the route runs, so a write that lands during
+    the read makes the next request miss instead of serving stale data. The
+    reads of a tagged response run on the primary, since a lagging replica
+    would send old rows under the current ETag. The ETag also carries a
+    digest of the query string, since the page, the limit and the fields
+    change the body.
+
+    Args:
+    - table (str): The name of the table.
+    - key (str): The name of the path or query parameter with the id of the
+      entity, or None for a list.
+
+    Returns:
+    - Callable: The FastAPI dependency, which returns the ETag, or answers
+      304 Not Modified before any query runs.
+    """
+
+    async def check(request: Request):
+        parts = ()
+        if key is not None:
+            parts = (request.path_params.get(key) or request.query_params.get(key),)
+        if request.url.query:
+            query = hashlib.blake2b(request.url.query.encode(), digest_size=8)
+            parts = (*parts, query.hexdigest())
+        etag = table_versions.etag(table, *parts)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and matches(if_none_match, etag):
+            raise HTTPException(status_code=304, headers={"ETag": etag})
+        pin_primary()
+        return etag
+
+    return check
+
+
+def tagged(response, etag: str):
+    """
+    This function sets the ETag of a response.
+
+    Args:
+    - response (Response): The response.
+    - etag (str): The ETag.
+
+    Returns:
+    - Response: The response.
+    """
+    response.headers["ETag"] = etag
+    return response
+
+
+table_versions = TableVersions(TABLE_VERSIONS)
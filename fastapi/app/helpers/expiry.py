@@ -0,0 +1,402 @@
+"""
+Expiring ingredient alerts
+"""
+
+import asyncio
+import heapq
+import json
+import logging
+import queue
+import threading
+from datetime import date, timedelta
+
+from peewee import JOIN, IntegrityError
+from config.database import (
+    database,
+    reset_db_state,
+    ExpiryNotificationModel,
+    IngredientModel,
+    InventoryIngredientModel,
+)
+from config.settings import EXPIRY
+
+logger = logging.getLogger(__name__)
+
+ONE_DAY = timedelta(days=1)
+
+
+class FileSink:
+    """
+    This class appends the notifications to a file, one JSON object per line.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def emit(self, notifications):
+        """
+        This method writes notifications.
+
+        Args:
+        - notifications (List[dict]): The notifications.
+        """
+        lines = "".join(
+            json.dumps(notification, default=str) + "\n"
+            for notification in notifications
+        )
+        with self.lock, open(self.path, "a", encoding="utf-8") as file:
+            file.write(lines)
+
+
+class QueueSink:
+    """
+    This class puts the notifications on a bounded in-process queue for a
+    consumer to take. Notifications are dropped, and counted, when the queue
+    is full.
+    """
+
+    def __init__(self, maxsize: int):
+        self.queue = queue.Queue(maxsize)
+        self.dropped = 0
+
+    def emit(self, notifications):
+        """
+        This method puts notifications on the queue.
+
+        Args:
+        - notifications (List[dict]): The notifications.
+        """
+        for notification in notifications:
+            try:
+                self.queue.put_nowait(notification)
+            except queue.Full:
+                self.dropped += 1
+
+
+def build_sink(config: dict):
+    """
+    This function builds the sink of the settings.
+
+    Args:
+    - config (dict): The expiry settings.
+
+    Returns:
+    - FileSink | QueueSink: The sink.
+    """
+    if config["sink"] == "queue":
+        return QueueSink(config["queue_size"])
+    if config["sink"] == "file":
+        return FileSink(config["path"])
+    raise ValueError(f"Unknown expiry sink: {config['sink']}")
+
+
+class ExpiryScheduler:
+    """
+    This class schedules an alert for every ingredient of an inventory some
+    days before it expires.
+
+    The expiration date of every (user, ingredient) is kept by user, and a
+    min-heap orders them by the day something is due: the alert, `lead_days`
+    before the expiration date, and then the removal of the entry, the day
+    after it. Every tick only pops what is due. Changes push a new entry and
+    leave the old one in the heap; popped entries that no longer match the
+    current date are skipped.
+
+    Every alert is claimed in the expiry_notifications table before it is
+    sent, so a restart or another process never sends it again. An alert
+    whose sink fails after the claim is not retried.
+    """
+
+    def __init__(self, config: dict, sink=None):
+        self.config = config
+        self.sink = sink
+        self.users = {}
+        self.holders = {}
+        self.heap = []
+        self.lock = threading.Lock()
+        self.task = None
+
+    def load(self):
+        """
+        This method rebuilds the schedule from the database. Only the
+        ingredients that have not expired are scheduled, and the alerts
+        already sent are not scheduled again.
+        """
+        rows = (
+            InventoryIngredientModel.select(
+                InventoryIngredientModel.user_id,
+                InventoryIngredientModel.ingredient_id,
+                IngredientModel.expiration_date,
+                ExpiryNotificationModel.expiration_date.alias("notified"),
+            )
+            .join(
+                IngredientModel,
+                on=IngredientModel.id == InventoryIngredientModel.ingredient_id,
+            )
+            .join(
+                ExpiryNotificationModel,
+                JOIN.LEFT_OUTER,
+                on=(
+                    (
+                        ExpiryNotificationModel.user_id
+                        == InventoryIngredientModel.user_id
+                    )
+                    & (
+                        ExpiryNotificationModel.ingredient_id
+                        == InventoryIngredientModel.ingredient_id
+                    )
+                    & (
+                        ExpiryNotificationModel.expiration_date
+                        == IngredientModel.expiration_date
+                    )
+                ),
+            )
+            .where(IngredientModel.expiration_date >= date.today())
+            .tuples()
+        )
+        users = {}
+        holders = {}
+        heap = []
+        for user_id, ingredient_id, expiration_date, notified in rows:
+            users.setdefault(user_id, {})[ingredient_id] = expiration_date
+            holders.setdefault(ingredient_id, set()).add(user_id)
+            if notified is None:
+                due = self._due(expiration_date)
+            else:
+                due = expiration_date + ONE_DAY
+            heap.append((due, expiration_date, user_id, ingredient_id))
+        heapq.heapify(heap)
+        with self.lock:
+            self.users = users
+            self.holders = holders
+            self.heap = heap
+
+    def set(self, user_id: int, ingredient_id: int, expiration_date: date):
+        """
+        This method schedules an ingredient of an inventory, or moves it if
+        its expiration date changed.
+
+        Args:
+        - user_id (int): The id of the user.
+        - ingredient_id (int): The id of the ingredient.
+        - expiration_date (date): The expiration date of the ingredient.
+        """
+        with self.lock:
+            self._set(user_id, ingredient_id, expiration_date)
+
+    def set_ingredient(self, ingredient_id: int, expiration_date: date):
+        """
+        This method moves an ingredient in every inventory that has it.
+
+        Args:
+        - ingredient_id (int): The id of the ingredient.
+        - expiration_date (date): The new expiration date of the ingredient.
+        """
+        with self.lock:
+            for user_id in tuple(self.holders.get(ingredient_id, ())):
+                self._set(user_id, ingredient_id, expiration_date)
+
+    def remove(self, user_id: int, ingredient_id: int):
+        """
+        This method unschedules an ingredient of an inventory.
+
+        Args:
+        - user_id (int): The id of the user.
+        - ingredient_id (int): The id of the ingredient.
+        """
+        with self.lock:
+            self._remove(user_id, ingredient_id)
+
+    def upcoming(self, user_id: int, days: int):
+        """
+        This method gets the ingredients of an inventory that expire in the
+        next days.
+
+        Args:
+        - user_id (int): The id of the user.
+        - days (int): The number of days.
+
+        Returns:
+        - List[dict]: The id and the expiration date of the ingredients,
+          soonest first.
+        """
+        until = date.today() + timedelta(days=days)
+        with self.lock:
+            ingredients = list(self.users.get(user_id, {}).items())
+        return [
+            {"ingredient_id": ingredient_id, "expiration_date": expiration_date}
+            for ingredient_id, expiration_date in sorted(
+                ingredients, key=lambda item: (item[1], item[0])
+            )
+            if expiration_date <= until
+        ]
+
+    def tick(self, today: date = None):
+        """
+        This method sends a notification for every ingredient that expires
+        within the lead days, once per expiration date, and unschedules the
+        ingredients that have expired. An ingredient that expired before its
+        alert was due is not notified.
+
+        Args:
+        - today (date): The current day.
+
+        Returns:
+        - int: The number of notifications sent.
+        """
+        today = today or date.today()
+        due = []
+        with self.lock:
+            while self.heap and self.heap[0][0] <= today:
+                entry = heapq.heappop(self.heap)
+                _, expiration_date, user_id, ingredient_id = entry
+                if self.users.get(user_id, {}).get(ingredient_id) != expiration_date:
+                    continue
+                if expiration_date < today:
+                    self._remove(user_id, ingredient_id)
+                    continue
+                due.append(entry[1:])
+                heapq.heappush(self.heap, (expiration_date + ONE_DAY, *entry[1:]))
+            self._compact()
+        notifications = [
+            {
+                "user_id": user_id,
+                "ingredient_id": ingredient_id,
+                "expiration_date": expiration_date.isoformat(),
+                "days_left": (expiration_date - today).days,
+            }
+            for expiration_date, user_id, ingredient_id in self.claim(due, today)
+        ]
+        if notifications:
+            self.sink.emit(notifications)
+        return len(notifications)
+
+    def claim(self, due, today: date):
+        """
+        This method records the due alerts in the database and keeps the ones
+        that no earlier run or other process has sent. The records of the
+        expired ingredients are deleted.
+
+        Args:
+        - due (List[tuple]): The expiration date, user id and ingredient id of
+          the due alerts.
+        - today (date): The current day.
+
+        Returns:
+        - List[tuple]: The alerts to send.
+        """
+        # pylint: disable=no-value-for-parameter
+        claimed = []
+        with database.connection_context():
+            for expiration_date, user_id, ingredient_id in due:
+                try:
+                    with database.atomic():
+                        ExpiryNotificationModel.insert(
+                            user_id=user_id,
+                            ingredient_id=ingredient_id,
+                            expiration_date=expiration_date,
+                        ).execute()
+                except IntegrityError:
+                    continue
+                claimed.append((expiration_date, user_id, ingredient_id))
+            ExpiryNotificationModel.delete().where(
+                ExpiryNotificationModel.expiration_date < today
+            ).execute()
+        return claimed
+
+    def stats(self):
+        """
+        This method gets the size of the schedule.
+
+        Returns:
+        - dict: The number of users, scheduled ingredients and heap entries.
+        """
+        with self.lock:
+            return {
+                "users": len(self.users),
+                "ingredients": sum(len(items) for items in self.users.values()),
+                "heap": len(self.heap),
+            }
+
+    def start(self):
+        """
+        This method starts the background task that ticks every
+        `interval_seconds`.
+        """
+        if self.sink is None:
+            self.sink = build_sink(self.config)
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """
+        This method stops the background task.
+        """
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def run(self):
+        """
+        This method ticks until it is cancelled. A failing tick is logged and
+        retried on the next one.
+
+        The task gets its own connection state, so a tick never shares the
+        connection of the startup and shutdown code. A cancelled task waits
+        for its running tick, so the shutdown closes no connection in use.
+        """
+        reset_db_state()
+        while True:
+            tick = asyncio.ensure_future(asyncio.to_thread(self.tick))
+            try:
+                await asyncio.shield(tick)
+            except asyncio.CancelledError:
+                await asyncio.wait([tick])
+                raise
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("Expiry tick failed")
+            await asyncio.sleep(self.config["interval_seconds"])
+
+    def _due(self, expiration_date):
+        return expiration_date - timedelta(days=self.config["lead_days"])
+
+    def _set(self, user_id, ingredient_id, expiration_date):
+        ingredients = self.users.setdefault(user_id, {})
+        if ingredients.get(ingredient_id) == expiration_date:
+            return
+        ingredients[ingredient_id] = expiration_date
+        self.holders.setdefault(ingredient_id, set()).add(user_id)
+        heapq.heappush(
+            self.heap,
+            (self._due(expiration_date), expiration_date, user_id, ingredient_id),
+        )
+
+    def _remove(self, user_id, ingredient_id):
+        ingredients = self.users.get(user_id, {})
+        if ingredients.pop(ingredient_id, None) is None:
+            return
+        if not ingredients:
+            del self.users[user_id]
+        holders = self.holders[ingredient_id]
+        holders.discard(user_id)
+        if not holders:
+            del self.holders[ingredient_id]
+
+    def _compact(self):
+        # Drop the stale entries once they outnumber the live ones.
+        live = sum(len(items) for items in self.users.values())
+        if len(self.heap) > 2 * live + 1024:
+            self.heap = [
+                entry
+                for entry in self.heap
+                if self.users.get(entry[2], {}).get(entry[3]) == entry[1]
+            ]
+            heapq.heapify(self.heap)
+
+
+expiry_scheduler = ExpiryScheduler(EXPIRY)
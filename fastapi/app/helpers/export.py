@@ -0,0 +1,135 @@
+"""
+Streaming exports
+"""
+
+import csv
+import io
+import json
+from typing import Optional
+
+import peewee
+from config.async_database import convert_row
+from config.settings import EXPORT
+from helpers.rate_limit import admission
+from fastapi import Query
+from fastapi.responses import StreamingResponse
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+class Export:
+    """
+    This class represents the parameters of an export request.
+    """
+
+    def __init__(
+        self,
+        export_format: str = Query(
+            "ndjson",
+            alias="format",
+            pattern="^(ndjson|csv)$",
+            description="The format of the export.",
+        ),
+        since_id: Optional[int] = Query(
+            None,
+            description="The id of the last exported item, to resume an export.",
+        ),
+    ):
+        self.export_format = export_format
+        self.since_id = since_id
+
+
+def stream_rows(query, batch_size: int):
+    """
+    This function streams the rows of a query in batches.
+
+    On MySQL the rows are read through an unbuffered server-side cursor, so
+    only one batch is held in memory at a time. The stream is counted by the
+    admission control until it ends.
+
+    Args:
+    - query (Select): The query to stream.
+    - batch_size (int): The number of rows fetched at a time.
+
+    Yields:
+    - Tuple[List[str], List[dict]]: The column names and a batch of rows.
+    """
+    database = query.model._meta.database  # pylint: disable=protected-access
+    sql, params = query.sql()
+    admission.hold()
+    try:
+        database.connect(reuse_if_open=True)
+        if isinstance(database, peewee.MySQLDatabase):
+            cursor = database.connection().cursor(peewee.mysql.cursors.SSCursor)
+        else:
+            cursor = database.connection().cursor()
+        try:
+            cursor.execute(sql, params)
+            columns = [column[0] for column in cursor.description]
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield columns, [
+                    convert_row(query, dict(zip(columns, row))) for row in rows
+                ]
+        finally:
+            cursor.close()
+            database.close()
+    finally:
+        admission.release()
+
+
+def ndjson_lines(batches):
+    """
+    This function encodes batches of rows as NDJSON.
+    """
+    for _, rows in batches:
+        yield "".join(json.dumps(row, default=str) + "\n" for row in rows)
+
+
+def csv_lines(batches):
+    """
+    This function encodes batches of rows as CSV, starting with a header.
+    """
+    header = False
+    for columns, rows in batches:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if not header:
+            writer.writerow(columns)
+            header = True
+        writer.writerows([row[column] for column in columns] for row in rows)
+        yield buffer.getvalue()
+
+
+def export_response(
+    query, key, export_format: str, since_id: Optional[int], filename: str
+):
+    """
+    This function builds a streaming export of a query.
+
+    The rows are ordered by the key, and the key of the last exported row can
+    be passed as since_id to resume an interrupted export.
+
+    Args:
+    - query (Select): The query to export.
+    - key (Field): The unique, ordered field used to resume the export.
+    - export_format (str): The format of the export, "ndjson" or "csv".
+    - since_id (int): The key after which the export starts.
+    - filename (str): The name of the exported file, without extension.
+
+    Returns:
+    - StreamingResponse: The streamed rows.
+    """
+    if since_id is not None:
+        query = query.where(key > since_id)
+    batches = stream_rows(query.order_by(key), EXPORT["batch_size"])
+    encode = csv_lines if export_format == "csv" else ndjson_lines
+    return StreamingResponse(
+        encode(batches),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{export_format}"'
+        },
+    )
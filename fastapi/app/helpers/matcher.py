@@ -0,0 +1,367 @@
+"""
+Recipe matching against an inventory
+"""
+
+import threading
+from collections import namedtuple
+
+from config.database import RecipeIngredientModel, RecipeModel
+from config.settings import MATCHER
+
+Snapshot = namedtuple(
+    "Snapshot", ["matrix", "recipe_ids", "ingredient_ids", "columns", "counts"]
+)
+View = namedtuple("View", ["base", "delta", "changed"])
+Scored = namedtuple(
+    "Scored", ["snapshot", "available", "rows", "recipe_ids", "coverage", "missing"]
+)
+
+
+def build_snapshot(recipes: dict):
+    """
+    This function builds the sparse recipe x ingredient matrix of the
+    required quantities.
+
+    Args:
+    - recipes (dict): The required quantity of every ingredient, by recipe id.
+
+    Returns:
+    - Snapshot: The matrix, the recipe id of every row, the ingredient id of
+      every column, the column of every ingredient id and the number of
+      ingredients of every row.
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    from scipy.sparse import csr_matrix  # pylint: disable=import-outside-toplevel
+
+    ingredient_ids = np.array(
+        sorted({ingredient_id for row in recipes.values() for ingredient_id in row}),
+        dtype=np.int64,
+    )
+    columns = {int(ingredient_id): j for j, ingredient_id in enumerate(ingredient_ids)}
+    counts = np.fromiter(
+        (len(row) for row in recipes.values()), dtype=np.int64, count=len(recipes)
+    )
+    nnz = int(counts.sum())
+    indptr = np.zeros(len(recipes) + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    indices = np.fromiter(
+        (columns[ingredient_id] for row in recipes.values() for ingredient_id in row),
+        dtype=np.int64,
+        count=nnz,
+    )
+    data = np.fromiter(
+        (quantity for row in recipes.values() for quantity in row.values()),
+        dtype=np.float64,
+        count=nnz,
+    )
+    return Snapshot(
+        csr_matrix((data, indices, indptr), shape=(len(recipes), len(ingredient_ids))),
+        np.fromiter(recipes, dtype=np.int64, count=len(recipes)),
+        ingredient_ids,
+        columns,
+        counts,
+    )
+
+
+class RecipeMatrix:
+    """
+    This class represents the ingredients of the active, public recipes as a
+    sparse recipe x ingredient matrix.
+
+    Writes update a dictionary of the recipes and record the recipe as
+    changed. The matrix of the last build is kept as the base: a match
+    scores it without the rows of the changed recipes, and scores the
+    changed recipes from a small delta matrix, so a write never waits for a
+    full build. Once more than `MATCHER_REBUILD_CHANGES` recipes changed, a
+    background thread builds a new base from memory and swaps it in.
+    numpy and scipy are imported by the first match, so they stay out of the
+    application startup.
+    Matches score every recipe at once with vectorized operations over the
+    non-zero entries of the matrices.
+    """
+
+    def __init__(self):
+        self.recipes = {}
+        self.base = None
+        self.delta = None
+        self.changes = {}
+        self.sequence = 0
+        self.rebuilding = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        """
+        This method reloads the recipes from the database. The matrix is
+        built by the next match.
+        """
+        recipe_ids = set(
+            RecipeModel.select(RecipeModel.id)
+            .where(RecipeModel.is_active & RecipeModel.is_public)
+            .scalars()
+        )
+        recipes = {}
+        for recipe_id, ingredient_id, quantity in RecipeIngredientModel.select(
+            RecipeIngredientModel.recipe_id,
+            RecipeIngredientModel.ingredient_id,
+            RecipeIngredientModel.quantity,
+        ).tuples():
+            if recipe_id in recipe_ids and quantity > 0:
+                recipes.setdefault(recipe_id, {})[ingredient_id] = quantity
+        with self.lock:
+            self.recipes = recipes
+            self.base = None
+            self.delta = None
+            self.changes = {}
+
+    def set_recipe(self, recipe: dict, quantities: dict):
+        """
+        This method adds a recipe to the matrix or replaces it. Inactive or
+        private recipes, and recipes without ingredients, are removed instead.
+
+        Args:
+        - recipe (dict): The recipe row.
+        - quantities (dict): The required quantity of every ingredient id.
+        """
+        with self.lock:
+            self.recipes.pop(recipe["id"], None)
+            if recipe["is_active"] and recipe["is_public"] and quantities:
+                self.recipes[recipe["id"]] = dict(quantities)
+            self.sequence += 1
+            self.changes[recipe["id"]] = self.sequence
+            self.delta = None
+
+    def current(self):
+        """
+        This method gets the matrices to score. The base is built if there
+        is none, and the delta if there were writes since the last match. A
+        background rebuild of the base starts when the delta is too large.
+
+        Returns:
+        - View: The base matrix, the delta matrix of the changed recipes and
+          the ids of the changed recipes, whose rows of the base are stale.
+        """
+        with self.lock:
+            if self.base is None:
+                self.base = build_snapshot(self.recipes)
+                self.delta = None
+                self.changes = {}
+            if self.delta is None:
+                self.delta = build_snapshot(
+                    {
+                        recipe_id: self.recipes[recipe_id]
+                        for recipe_id in self.changes
+                        if recipe_id in self.recipes
+                    }
+                )
+            if (
+                len(self.changes) > MATCHER["rebuild_changes"]
+                and self.rebuilding is None
+            ):
+                self.rebuilding = threading.Thread(
+                    target=self.rebuild,
+                    args=(self.base, self.sequence, dict(self.recipes)),
+                    daemon=True,
+                )
+                self.rebuilding.start()
+            return View(self.base, self.delta, tuple(self.changes))
+
+    def rebuild(self, base: Snapshot, sequence: int, recipes: dict):
+        """
+        This method builds a new base from a copy of the recipes and swaps it
+        in, unless the recipes were reloaded meanwhile. The recipes written
+        after the copy stay in the delta.
+
+        Args:
+        - base (Snapshot): The base when the copy was taken.
+        - sequence (int): The number of the last write of the copy.
+        - recipes (dict): The copy of the recipes.
+        """
+        snapshot = None
+        try:
+            snapshot = build_snapshot(recipes)
+        finally:
+            with self.lock:
+                self.rebuilding = None
+                if snapshot is not None and self.base is base:
+                    self.base = snapshot
+                    self.delta = None
+                    self.changes = {
+                        recipe_id: written
+                        for recipe_id, written in self.changes.items()
+                        if written > sequence
+                    }
+
+    def match(self, inventory: dict, limit: int, min_coverage: float = 0.0):
+        """
+        This method ranks the recipes by how much of them an inventory covers.
+
+        The coverage of a recipe is the mean, over its ingredients, of the
+        available quantity divided by the required quantity, capped at 1.
+        Recipes with the same coverage rank by fewest missing ingredients,
+        then by id.
+
+        Args:
+        - inventory (dict): The available quantity of every ingredient id.
+        - limit (int): The maximum number of recipes.
+        - min_coverage (float): The minimum coverage of the recipes, from 0
+          to 1.
+
+        Returns:
+        - Tuple[List[dict], int]: The best recipes, best first, with their
+          coverage and missing ingredients, and the number of recipes with
+          at least the minimum coverage.
+        """
+        import numpy as np  # pylint: disable=import-outside-toplevel
+
+        view = self.current()
+        parts = [
+            score_rows(snapshot, inventory, stale)
+            for snapshot, stale in ((view.base, view.changed), (view.delta, ()))
+            if snapshot.matrix.shape[0]
+        ]
+        if not parts:
+            return [], 0
+        offsets = np.cumsum([0] + [len(part.rows) for part in parts])
+        recipe_ids = np.concatenate([part.recipe_ids for part in parts])
+        coverage = np.concatenate([part.coverage for part in parts])
+        missing = np.concatenate([part.missing for part in parts])
+        candidates = np.flatnonzero(coverage >= min_coverage)
+        total = len(candidates)
+        if total > limit:
+            # Keep the recipes tied with the last one, so ties are broken by
+            # the missing ingredients and not by the partition.
+            kth = np.partition(coverage[candidates], total - limit)[total - limit]
+            candidates = candidates[coverage[candidates] >= kth]
+        ranked = candidates[
+            np.lexsort(
+                (
+                    recipe_ids[candidates],
+                    missing[candidates],
+                    -coverage[candidates],
+                )
+            )
+        ]
+        results = []
+        for index in ranked[:limit]:
+            position = np.searchsorted(offsets, index, side="right") - 1
+            part = parts[position]
+            row = part.rows[index - offsets[position]]
+            results.append(
+                {
+                    "recipe_id": int(recipe_ids[index]),
+                    "coverage": float(coverage[index]),
+                    "missing": missing_ingredients(part.snapshot, row, part.available),
+                }
+            )
+        return results, total
+
+
+def available_quantities(snapshot: Snapshot, inventory: dict):
+    """
+    This function gets the available quantity of every non-zero entry of the
+    matrix.
+
+    Args:
+    - snapshot (Snapshot): The matrix of the recipes.
+    - inventory (dict): The available quantity of every ingredient id.
+
+    Returns:
+    - ndarray: The available quantity, aligned with the matrix data.
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    quantities = np.zeros(snapshot.matrix.shape[1])
+    for ingredient_id, quantity in inventory.items():
+        column = snapshot.columns.get(ingredient_id)
+        if column is not None:
+            quantities[column] = quantity
+    return quantities[snapshot.matrix.indices]
+
+
+def score(matrix, available, counts):
+    """
+    This function scores every recipe at once.
+
+    Args:
+    - matrix (csr_matrix): The required quantities.
+    - available (ndarray): The available quantities, aligned with the matrix
+      data.
+    - counts (ndarray): The number of ingredients of every recipe.
+
+    Returns:
+    - Tuple[ndarray, ndarray]: The coverage and the number of missing
+      ingredients of every recipe.
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    starts = matrix.indptr[:-1]
+    coverage = (
+        np.add.reduceat(np.minimum(available / matrix.data, 1.0), starts) / counts
+    )
+    missing = np.add.reduceat(available < matrix.data, starts, dtype=np.int64)
+    return coverage, missing
+
+
+def score_rows(snapshot: Snapshot, inventory: dict, stale=()):
+    """
+    This function scores the recipes of a matrix against an inventory.
+
+    Args:
+    - snapshot (Snapshot): The matrix of the recipes.
+    - inventory (dict): The available quantity of every ingredient id.
+    - stale (Tuple[int, ...]): The ids of the recipes to leave out, whose
+      rows are outdated.
+
+    Returns:
+    - Scored: The available quantities, aligned with the matrix data, and
+      the row, recipe id, coverage and number of missing ingredients of
+      every recipe kept.
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    available = available_quantities(snapshot, inventory)
+    coverage, missing = score(snapshot.matrix, available, snapshot.counts)
+    rows = np.arange(snapshot.matrix.shape[0])
+    if stale:
+        rows = rows[~np.isin(snapshot.recipe_ids, stale)]
+    return Scored(
+        snapshot,
+        available,
+        rows,
+        snapshot.recipe_ids[rows],
+        coverage[rows],
+        missing[rows],
+    )
+
+
+def missing_ingredients(snapshot: Snapshot, row: int, available):
+    """
+    This function gets the ingredients of a recipe the inventory does not
+    cover.
+
+    Args:
+    - snapshot (Snapshot): The matrix of the recipes.
+    - row (int): The row of the recipe.
+    - available (ndarray): The available quantities, aligned with the matrix
+      data.
+
+    Returns:
+    - List[dict]: The id, required and available quantity of the ingredients.
+    """
+    start, end = snapshot.matrix.indptr[row], snapshot.matrix.indptr[row + 1]
+    return [
+        {
+            "ingredient_id": int(snapshot.ingredient_ids[column]),
+            "required": int(required),
+            "available": int(have),
+        }
+        for column, required, have in zip(
+            snapshot.matrix.indices[start:end],
+            snapshot.matrix.data[start:end],
+            available[start:end],
+        )
+        if have < required
+    ]
+
+
+recipe_matrix = RecipeMatrix()
@@ -0,0 +1,320 @@
+"""
+Prometheus metrics
+"""
+
+import re
+import threading
+import time
+from bisect import bisect_left
+from functools import lru_cache
+
+from config.database import get_pool_stats
+from config.settings import METRICS
+
+OPERATION = re.compile(r"\s*(\w+)")
+TABLE = {
+    "SELECT": re.compile(r"\bFROM\s+[`\"]?(\w+)", re.IGNORECASE),
+    "DELETE": re.compile(r"\bFROM\s+[`\"]?(\w+)", re.IGNORECASE),
+    "INSERT": re.compile(r"\bINTO\s+[`\"]?(\w+)", re.IGNORECASE),
+    "REPLACE": re.compile(r"\bINTO\s+[`\"]?(\w+)", re.IGNORECASE),
+    "UPDATE": re.compile(r"^\s*UPDATE\s+[`\"]?(\w+)", re.IGNORECASE),
+}
+POOL_GAUGES = {
+    "max_connections": "The maximum connections of the pool.",
+    "idle": "The idle connections of the pool.",
+    "in_use": "The connections of the pool in use.",
+}
+
+
+@lru_cache(maxsize=4096)
+def classify(sql: str):
+    """
+    This function gets the operation and the main table of a SQL statement.
+    peewee reuses the same SQL for the same query shape, so the result is
+    cached.
+
+    Args:
+    - sql (str): The SQL statement.
+
+    Returns:
+    - Tuple[str, str]: The table, or "" for statements without one, and the
+      operation, e.g. "select".
+    """
+    match = OPERATION.match(sql)
+    operation = match.group(1).upper() if match else ""
+    pattern = TABLE.get(operation)
+    table = pattern.search(sql) if pattern else None
+    return table.group(1) if table else "", operation.lower()
+
+
+def escape(value) -> str:
+    """
+    This function escapes a label value of the text format.
+
+    Args:
+    - value (Any): The label value.
+
+    Returns:
+    - str: The escaped value.
+    """
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def labels(names, values, extra: str = ""):
+    """
+    This function formats the labels of a sample.
+
+    Args:
+    - names (Tuple[str, ...]): The names of the labels.
+    - values (Tuple): The values of the labels.
+    - extra (str): An extra formatted label, e.g. 'le="0.1"'.
+
+    Returns:
+    - str: The labels between braces, or "" when there are none.
+    """
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    """
+    This class represents a histogram with labels.
+
+    Every label set keeps the count of every bucket, the sum and the count
+    of the observations; the buckets are made cumulative when rendered.
+    """
+
+    def __init__(self, name: str, description: str, label_names, buckets):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self.series = {}
+
+    def observe(self, values, value: float):
+        """
+        This method records an observation. The caller holds the lock of the
+        registry.
+
+        Args:
+        - values (Tuple): The values of the labels.
+        - value (float): The observed value.
+        """
+        series = self.series.get(values)
+        if series is None:
+            series = self.series[values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self):
+        """
+        This method renders the histogram in the text format.
+
+        Returns:
+        - List[str]: The lines of the histogram.
+        """
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for values, (counts, total, count) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, bucket in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_labels = labels(self.label_names, values, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{labels(self.label_names, values)} {total}")
+            lines.append(f"{self.name}_count{labels(self.label_names, values)} {count}")
+        return lines
+
+
+class Metrics:
+    """
+    This class represents the metrics of the application: the latency of
+    the requests by route template and status, the requests in flight, and
+    the duration and errors of the database queries by table and operation.
+    """
+
+    def __init__(self, config: dict):
+        self.requests = Histogram(
+            "http_request_duration_seconds",
+            "The latency of the requests.",
+            ("method", "route", "status"),
+            config["buckets"],
+        )
+        self.queries = Histogram(
+            "db_query_duration_seconds",
+            "The duration of the database queries.",
+            ("table", "operation"),
+            config["query_buckets"],
+        )
+        self.query_errors = {}
+        self.in_flight = 0
+        self.lock = threading.Lock()
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float):
+        """
+        This method records a request.
+
+        Args:
+        - method (str): The HTTP method.
+        - route (str): The route template, e.g. "/api/users/{id}".
+        - status (int): The status code of the response.
+        - seconds (float): The latency of the request.
+        """
+        with self.lock:
+            self.requests.observe((method, route, str(status)), seconds)
+
+    def observe_query(self, sql: str, seconds: float, failed: bool = False):
+        """
+        This method records a database query.
+
+        Args:
+        - sql (str): The SQL of the query.
+        - seconds (float): The duration of the query.
+        - failed (bool): Whether the query raised an error.
+        """
+        key = classify(sql)
+        with self.lock:
+            self.queries.observe(key, seconds)
+            if failed:
+                self.query_errors[key] = self.query_errors.get(key, 0) + 1
+
+    def render(self):
+        """
+        This method renders the metrics in the Prometheus text format.
+
+        Returns:
+        - str: The metrics.
+        """
+        with self.lock:
+            lines = self.requests.render() + self.queries.render()
+            lines += [
+                "# HELP db_query_errors_total The database queries that failed.",
+                "# TYPE db_query_errors_total counter",
+            ]
+            lines += [
+                f"db_query_errors_total{labels(('table', 'operation'), key)} {count}"
+                for key, count in sorted(self.query_errors.items())
+            ]
+            lines += [
+                "# HELP http_requests_in_flight The requests being served.",
+                "# TYPE http_requests_in_flight gauge",
+                f"http_requests_in_flight {self.in_flight}",
+            ]
+        pool = get_pool_stats()
+        for name, description in POOL_GAUGES.items():
+            if name in pool:
+                lines += [
+                    f"# HELP db_pool_{name} {description}",
+                    f"# TYPE db_pool_{name} gauge",
+                    f"db_pool_{name} {pool[name]}",
+                ]
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    This class is a pure ASGI middleware that measures every HTTP request.
+
+    The route template is read from the scope after the router matched it,
+    so paths with ids share one series; requests that match no route are
+    labelled "unmatched".
+    """
+
+    def __init__(self, app, registry: Metrics = None):
+        self.app = app
+        self.registry = registry or metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.registry.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            self.registry.in_flight -= 1
+            route = scope.get("route")
+            self.registry.observe_request(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status,
+                time.perf_counter() - start,
+            )
+
+
+def instrument_database(database, registry: Metrics = None):
+    """
+    This function times every statement the peewee database runs.
+
+    Args:
+    - database (Database): The peewee database.
+    - registry (Metrics): The metrics to record the queries in.
+    """
+    registry = registry or metrics
+    execute_sql = database.execute_sql
+
+    def timed_execute_sql(sql, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            cursor = execute_sql(sql, *args, **kwargs)
+        except Exception:
+            registry.observe_query(sql, time.perf_counter() - start, failed=True)
+            raise
+        registry.observe_query(sql, time.perf_counter() - start)
+        return cursor
+
+    database.execute_sql = timed_execute_sql
+
+
+def instrument_async_database(async_database, registry: Metrics = None):
+    """
+    This function times every statement an asynchronous driver runs. The
+    threadpool backend goes through the peewee database, and only the
+    databases of its replicas need to be instrumented.
+
+    Args:
+    - async_database (AsyncDatabase): The asynchronous database, or the
+      router of the primary and the replicas.
+    - registry (Metrics): The metrics to record the queries in.
+    """
+    if hasattr(async_database, "members"):
+        for member in async_database.members():
+            instrument_async_database(member, registry)
+        return
+    if getattr(async_database, "database", None) is not None:
+        instrument_database(async_database.database, registry)
+        return
+    if not hasattr(async_database, "run"):
+        return
+    registry = registry or metrics
+    run = async_database.run
+
+    async def timed_run(sql, params, fetch):
+        start = time.perf_counter()
+        try:
+            result = await run(sql, params, fetch)
+        except Exception:
+            registry.observe_query(sql, time.perf_counter() - start, failed=True)
+            raise
+        registry.observe_query(sql, time.perf_counter() - start)
+        return result
+
+    async_database.run = timed_run
+
+
+metrics = Metrics(METRICS)
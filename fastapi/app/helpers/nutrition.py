@@ -0,0 +1,292 @@
+"""
+Calorie rollups
+"""
+
+from peewee import JOIN, fn
+from config.database import (
+    locking,
+    IngredientModel,
+    MenuCaloriesModel,
+    MenuModel,
+    MenuRecipeModel,
+    RecipeCaloriesModel,
+    RecipeIngredientModel,
+    RecipeModel,
+    UserDayCaloriesModel,
+)
+
+
+class CalorieRollups:
+    """
+    This class keeps the calories of every recipe, menu and user day in the
+    recipe_calories, menu_calories and user_day_calories tables.
+
+    The calories of a recipe are the sum of the quantity of every ingredient
+    times its calories. A menu adds up its recipes, and a user day adds up the
+    active menus of the user on that date.
+
+    Every write recomputes the totals it touches upwards (ingredient ->
+    recipes -> menus -> days) in its own transaction, so the rollups are
+    shared by every worker, survive restarts and are read by primary key.
+    The totals are summed with locking reads, so two concurrent writes that
+    touch the same total never recompute it from a stale snapshot.
+    """
+
+    def set_ingredient(self, ingredient_id: int):
+        """
+        This method refreshes the rollups of the recipes that use an
+        ingredient. It runs in the transaction of the write.
+
+        Args:
+        - ingredient_id (int): The id of the ingredient.
+        """
+        self.set_recipes(
+            RecipeIngredientModel.select(RecipeIngredientModel.recipe_id)
+            .where(RecipeIngredientModel.ingredient_id == ingredient_id)
+            .scalars()
+        )
+
+    def set_recipes(self, recipe_ids):
+        """
+        This method refreshes the rollups of some recipes and of the menus
+        that include them. It runs in the transaction of the write.
+
+        Args:
+        - recipe_ids (Iterable[int]): The ids of the recipes.
+        """
+        recipe_ids = sorted(set(recipe_ids))
+        if not recipe_ids:
+            return
+        self._write_recipes(recipe_ids)
+        self.set_menus(
+            MenuRecipeModel.select(MenuRecipeModel.menu_id)
+            .where(MenuRecipeModel.recipe_id.in_(recipe_ids))
+            .distinct()
+            .scalars()
+        )
+
+    def set_menus(self, menu_ids, days=()):
+        """
+        This method refreshes the rollups of some menus and of their user
+        days. It runs in the transaction of the write.
+
+        Args:
+        - menu_ids (Iterable[int]): The ids of the menus.
+        - days (Iterable[tuple]): Other user days to refresh, as (user id,
+          date), such as the day a menu was moved from.
+        """
+        # pylint: disable=no-value-for-parameter
+        menu_ids = sorted(set(menu_ids))
+        days = set(days)
+        if menu_ids:
+            totals = dict.fromkeys(menu_ids, 0)
+            totals.update(
+                locking(
+                    MenuRecipeModel.select(
+                        MenuRecipeModel.menu_id, fn.SUM(RecipeCaloriesModel.calories)
+                    )
+                    .join(
+                        RecipeCaloriesModel,
+                        on=RecipeCaloriesModel.recipe_id == MenuRecipeModel.recipe_id,
+                    )
+                    .where(MenuRecipeModel.menu_id.in_(menu_ids))
+                    .group_by(MenuRecipeModel.menu_id)
+                ).tuples()
+            )
+            replace_totals(MenuCaloriesModel.menu_id, totals)
+            days.update(
+                MenuModel.select(MenuModel.user_id, MenuModel.menu_date)
+                .where(MenuModel.id.in_(menu_ids))
+                .tuples()
+            )
+        self._write_days(days)
+
+    def rebuild(self):
+        """
+        This method recomputes every rollup, for the rows written without the
+        services, such as the benchmark seed.
+        """
+        # pylint: disable=no-value-for-parameter
+        UserDayCaloriesModel.delete().execute()
+        MenuCaloriesModel.delete().execute()
+        RecipeCaloriesModel.delete().execute()
+        self._write_recipes(RecipeModel.select(RecipeModel.id).scalars())
+        self.set_menus(MenuModel.select(MenuModel.id).scalars())
+
+    def check(self):
+        """
+        This method compares the rollups with a full recompute in the database.
+
+        Returns:
+        - dict: The number of recipes, menus and days checked, and the
+          differences found, as (id, expected, actual).
+        """
+        # pylint: disable=no-value-for-parameter
+        recipe_total = fn.SUM(RecipeIngredientModel.quantity * IngredientModel.calories)
+        recipes = dict.fromkeys(RecipeModel.select(RecipeModel.id).scalars(), 0)
+        recipes.update(
+            RecipeIngredientModel.select(RecipeIngredientModel.recipe_id, recipe_total)
+            .join(
+                IngredientModel,
+                on=IngredientModel.id == RecipeIngredientModel.ingredient_id,
+            )
+            .group_by(RecipeIngredientModel.recipe_id)
+            .tuples()
+        )
+        menus = {}
+        days = {}
+        for menu_id, user_id, day, is_active, total in (
+            MenuModel.select(
+                MenuModel.id,
+                MenuModel.user_id,
+                MenuModel.menu_date,
+                MenuModel.is_active,
+                recipe_total,
+            )
+            .join(
+                MenuRecipeModel,
+                JOIN.LEFT_OUTER,
+                on=MenuRecipeModel.menu_id == MenuModel.id,
+            )
+            .join(
+                RecipeIngredientModel,
+                JOIN.LEFT_OUTER,
+                on=RecipeIngredientModel.recipe_id == MenuRecipeModel.recipe_id,
+            )
+            .join(
+                IngredientModel,
+                JOIN.LEFT_OUTER,
+                on=IngredientModel.id == RecipeIngredientModel.ingredient_id,
+            )
+            .group_by(MenuModel.id)
+            .tuples()
+        ):
+            menus[menu_id] = int(total or 0)
+            if is_active:
+                days[(user_id, day)] = days.get((user_id, day), 0) + int(total or 0)
+        actual = {
+            "recipes": dict(
+                RecipeCaloriesModel.select(
+                    RecipeCaloriesModel.recipe_id, RecipeCaloriesModel.calories
+                ).tuples()
+            ),
+            "menus": dict(
+                MenuCaloriesModel.select(
+                    MenuCaloriesModel.menu_id, MenuCaloriesModel.calories
+                ).tuples()
+            ),
+            "days": {
+                (user_id, day): calories
+                for user_id, day, calories in UserDayCaloriesModel.select(
+                    UserDayCaloriesModel.user_id,
+                    UserDayCaloriesModel.day,
+                    UserDayCaloriesModel.calories,
+                ).tuples()
+                if calories
+            },
+        }
+        expected = {
+            "recipes": {key: int(value or 0) for key, value in recipes.items()},
+            "menus": menus,
+            "days": {key: value for key, value in days.items() if value},
+        }
+        return {
+            name: {
+                "checked": len(totals.keys() | actual[name].keys()),
+                "differences": differences(totals, actual[name]),
+            }
+            for name, totals in expected.items()
+        }
+
+    def _write_recipes(self, recipe_ids):
+        recipe_ids = list(recipe_ids)
+        totals = dict.fromkeys(recipe_ids, 0)
+        totals.update(
+            locking(
+                RecipeIngredientModel.select(
+                    RecipeIngredientModel.recipe_id,
+                    fn.SUM(RecipeIngredientModel.quantity * IngredientModel.calories),
+                )
+                .join(
+                    IngredientModel,
+                    on=IngredientModel.id == RecipeIngredientModel.ingredient_id,
+                )
+                .where(RecipeIngredientModel.recipe_id.in_(recipe_ids))
+                .group_by(RecipeIngredientModel.recipe_id)
+            ).tuples()
+        )
+        replace_totals(RecipeCaloriesModel.recipe_id, totals)
+
+    def _write_days(self, days):
+        # pylint: disable=no-value-for-parameter,singleton-comparison
+        user_days = {}
+        for user_id, day in days:
+            user_days.setdefault(user_id, set()).add(day)
+        for user_id, dates in user_days.items():
+            dates = sorted(dates)
+            UserDayCaloriesModel.delete().where(
+                UserDayCaloriesModel.user_id == user_id,
+                UserDayCaloriesModel.day.in_(dates),
+            ).execute()
+            rows = [
+                {"user_id": user_id, "day": day, "calories": int(total)}
+                for day, total in locking(
+                    MenuModel.select(
+                        MenuModel.menu_date, fn.SUM(MenuCaloriesModel.calories)
+                    )
+                    .join(
+                        MenuCaloriesModel,
+                        on=MenuCaloriesModel.menu_id == MenuModel.id,
+                    )
+                    .where(
+                        MenuModel.user_id == user_id,
+                        MenuModel.is_active == True,
+                        MenuModel.menu_date.in_(dates),
+                    )
+                    .group_by(MenuModel.menu_date)
+                ).tuples()
+            ]
+            if rows:
+                UserDayCaloriesModel.insert_many(rows).execute()
+
+
+def replace_totals(key, totals: dict):
+    """
+    This function replaces the rows of a rollup table.
+
+    Args:
+    - key (Field): The primary key of the table.
+    - totals (dict): The calories of every key.
+    """
+    # pylint: disable=no-value-for-parameter
+    model = key.model
+    model.delete().where(key.in_(list(totals))).execute()
+    if totals:
+        model.insert_many(
+            [
+                {key.name: value, "calories": int(calories or 0)}
+                for value, calories in totals.items()
+            ]
+        ).execute()
+
+
+def differences(expected: dict, actual: dict):
+    """
+    This function compares two sets of totals.
+
+    Args:
+    - expected (dict): The recomputed totals.
+    - actual (dict): The maintained totals.
+
+    Returns:
+    - List[tuple]: The key, the expected and the actual value of every
+      difference.
+    """
+    return [
+        (key, expected.get(key, 0), actual.get(key, 0))
+        for key in sorted(expected.keys() | actual.keys(), key=str)
+        if expected.get(key, 0) != actual.get(key, 0)
+    ]
+
+
+calorie_rollups = CalorieRollups()
@@ -0,0 +1,74 @@
+"""
+Keyset pagination
+"""
+
+from typing import Optional
+
+from config.settings import PAGINATION
+from fastapi import Query
+
+
+class Page:
+    """
+    This class represents the pagination parameters of a list request.
+    """
+
+    def __init__(
+        self,
+        cursor: Optional[int] = Query(
+            None,
+            description="The id of the last item of the previous page.",
+        ),
+        limit: int = Query(
+            PAGINATION["default_limit"],
+            ge=1,
+            le=PAGINATION["max_limit"],
+            description="The maximum number of items of the page.",
+        ),
+    ):
+        self.cursor = cursor
+        self.limit = limit
+
+
+def page_query(query, key, cursor: Optional[int] = None, limit: Optional[int] = None):
+    """
+    This function narrows a query to a page using keyset pagination.
+
+    Only the rows after the cursor are read, so every page costs one indexed
+    range scan no matter how deep it is. One extra row is fetched to know
+    whether there is a next page.
+
+    Args:
+    - query (Select): The query to paginate.
+    - key (Field): The unique, ordered field used as cursor.
+    - cursor (int): The key of the last item of the previous page.
+    - limit (int): The maximum number of items of the page.
+
+    Returns:
+    - Tuple[Select, int]: The query of the page and the effective limit.
+    """
+    if limit is None:
+        limit = PAGINATION["default_limit"]
+    limit = min(limit, PAGINATION["max_limit"])
+    if cursor is not None:
+        query = query.where(key > cursor)
+    return query.order_by(key).limit(limit + 1), limit
+
+
+def page_response(rows, key_name: str, limit: int):
+    """
+    This function builds a page from rows fetched with one extra row.
+
+    Args:
+    - rows (list): The rows of the page plus, if any, the first row of the
+      next page.
+    - key_name (str): The name of the cursor column.
+    - limit (int): The maximum number of items of the page.
+
+    Returns:
+    - dict: The items of the page and the cursor of the next page.
+    """
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return {"items": rows, "next_cursor": rows[-1][key_name]}
+    return {"items": rows, "next_cursor": None}
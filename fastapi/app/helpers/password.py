@@ -0,0 +1,217 @@
+"""
+Password hashing
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from config.settings import PASSWORD_HASHING
+
+ALGORITHM = "scrypt"
+DUMMY_HASH = "$".join(
+    [
+        ALGORITHM,
+        str(PASSWORD_HASHING["n"]),
+        str(PASSWORD_HASHING["r"]),
+        str(PASSWORD_HASHING["p"]),
+        base64.b64encode(bytes(16)).decode(),
+        base64.b64encode(bytes(64)).decode(),
+    ]
+)
+
+
+def hash_password(password: str, n: int, r: int, p: int):
+    """
+    This function hashes a password with scrypt and a random salt.
+
+    Args:
+    - password (str): The password.
+    - n (int): The CPU/memory cost of scrypt.
+    - r (int): The block size of scrypt.
+    - p (int): The parallelization of scrypt.
+
+    Returns:
+    - str: The encoded hash, "scrypt$n$r$p$salt$hash".
+    """
+    salt = os.urandom(16)
+    digest = hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r * p
+    )
+    return "$".join(
+        [
+            ALGORITHM,
+            str(n),
+            str(r),
+            str(p),
+            base64.b64encode(salt).decode(),
+            base64.b64encode(digest).decode(),
+        ]
+    )
+
+
+def verify_password(password: str, encoded: str):
+    """
+    This function checks a password against an encoded hash.
+
+    Passwords stored before hashing was introduced are compared as plain
+    text, so they keep working until they are rehashed.
+
+    Args:
+    - password (str): The password.
+    - encoded (str): The encoded hash.
+
+    Returns:
+    - bool: Whether the password matches.
+    """
+    parts = encoded.split("$")
+    if len(parts) != 6 or parts[0] != ALGORITHM:
+        return hmac.compare_digest(password.encode(), encoded.encode())
+    n, r, p = (int(part) for part in parts[1:4])
+    digest = hashlib.scrypt(
+        password.encode(),
+        salt=base64.b64decode(parts[4]),
+        n=n,
+        r=r,
+        p=p,
+        maxmem=256 * n * r * p,
+    )
+    return hmac.compare_digest(digest, base64.b64decode(parts[5]))
+
+
+def needs_rehash(encoded: str):
+    """
+    This function checks whether a hash uses other parameters than the
+    configured ones.
+
+    Args:
+    - encoded (str): The encoded hash.
+
+    Returns:
+    - bool: Whether the password should be hashed again.
+    """
+    parts = encoded.split("$")
+    return parts[:4] != [
+        ALGORITHM,
+        str(PASSWORD_HASHING["n"]),
+        str(PASSWORD_HASHING["r"]),
+        str(PASSWORD_HASHING["p"]),
+    ]
+
+
+class PasswordHasher:
+    """
+    This class runs the password hashing on a bounded process pool, so the
+    CPU cost never runs on the event loop or holds the GIL of the worker.
+    """
+
+    def __init__(self, config: dict):
+        self.config = config
+        self.pool = None
+        self.pending = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        """
+        This method starts the process pool.
+        """
+        with self.lock:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(
+                    max_workers=self.config["workers"],
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+
+    def shutdown(self):
+        """
+        This method stops the process pool.
+        """
+        with self.lock:
+            if self.pool is not None:
+                self.pool.shutdown()
+                self.pool = None
+
+    def hash(self, password: str):
+        """
+        This method hashes a password on the process pool and waits for it.
+
+        Args:
+        - password (str): The password.
+
+        Returns:
+        - str: The encoded hash.
+        """
+        return self.hash_many([password])[0]
+
+    def hash_many(self, passwords):
+        """
+        This method hashes many passwords in parallel on the process pool.
+
+        Args:
+        - passwords (List[str]): The passwords.
+
+        Returns:
+        - List[str]: The encoded hashes, in the same order.
+        """
+        self.start()
+        count = len(passwords)
+        return list(
+            self.pool.map(
+                hash_password,
+                passwords,
+                [self.config["n"]] * count,
+                [self.config["r"]] * count,
+                [self.config["p"]] * count,
+            )
+        )
+
+    async def hash_async(self, password: str):
+        """
+        This method hashes a password without blocking the event loop.
+
+        Args:
+        - password (str): The password.
+
+        Returns:
+        - str: The encoded hash.
+        """
+        return await self.run(
+            hash_password,
+            password,
+            self.config["n"],
+            self.config["r"],
+            self.config["p"],
+        )
+
+    async def verify_async(self, password: str, encoded: str):
+        """
+        This method checks a password without blocking the event loop.
+
+        Args:
+        - password (str): The password.
+        - encoded (str): The encoded hash.
+
+        Returns:
+        - bool: Whether the password matches.
+        """
+        return await self.run(verify_password, password, encoded)
+
+    async def run(self, function, *args):
+        """
+        This method runs a function on the process pool. At most
+        `max_pending` calls wait for the pool at once.
+        """
+        self.start()
+        if self.pending is None:
+            self.pending = asyncio.Semaphore(self.config["max_pending"])
+        async with self.pending:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.pool, function, *args)
+
+
+password_hasher = PasswordHasher(PASSWORD_HASHING)
@@ -0,0 +1,197 @@
+"""
+Rate limiting and admission control
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from config.settings import RATE_LIMIT
+from helpers.api_key_auth import get_api_key
+from fastapi import Depends, HTTPException, Request, status
+
+
+class RateLimiter:
+    """
+    This class represents a set of token buckets, one per key.
+
+    Buckets are kept in least recently used order, so buckets idle for longer
+    than `idle_seconds` are evicted from the front in amortized O(1).
+    """
+
+    def __init__(self, rate: float, burst: float, idle_seconds: int):
+        self.rate = rate
+        self.burst = burst
+        self.idle_seconds = idle_seconds
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def acquire(self, key: str, weight: float = 1):
+        """
+        This method takes tokens from the bucket of a key.
+
+        Args:
+        - key (str): The key of the bucket.
+        - weight (float): The number of tokens to take. A weight over the
+          burst is capped to the burst, so it can still be taken.
+
+        Returns:
+        - float: 0 if the tokens were taken, otherwise the seconds to wait
+          until there are enough tokens.
+        """
+        weight = min(weight, self.burst)
+        now = time.monotonic()
+        with self.lock:
+            bucket = self.buckets.pop(key, None)
+            if bucket is None:
+                tokens = self.burst
+            else:
+                tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            if tokens >= weight:
+                tokens -= weight
+                retry_after = 0
+            else:
+                retry_after = (weight - tokens) / self.rate
+            self.buckets[key] = (tokens, now)
+            while self.buckets:
+                _, (_, updated) = next(iter(self.buckets.items()))
+                if now - updated <= self.idle_seconds:
+                    break
+                self.buckets.popitem(last=False)
+        return retry_after
+
+    def stats(self):
+        """
+        This method gets the rate limiter statistics.
+
+        Returns:
+        - dict: The configuration and the number of tracked keys.
+        """
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "keys": len(self.buckets),
+        }
+
+
+class AdmissionControl:
+    """
+    This class counts the requests doing database work and sheds the load
+    above a threshold.
+
+    A streamed export is counted until its last row is sent, since its
+    body is read after the request dependencies have exited.
+    """
+
+    def __init__(self, max_in_flight: int):
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def admit(self):
+        """
+        This method counts a request, unless the threshold is reached.
+
+        Returns:
+        - bool: Whether the request was admitted.
+        """
+        with self.lock:
+            if self.in_flight >= self.max_in_flight:
+                self.rejected += 1
+                return False
+            self.in_flight += 1
+            return True
+
+    def hold(self):
+        """
+        This method counts work of a request that was already admitted.
+        """
+        with self.lock:
+            self.in_flight += 1
+
+    def release(self):
+        """
+        This method stops counting a request or its work.
+        """
+        with self.lock:
+            self.in_flight -= 1
+
+    def stats(self):
+        """
+        This method gets the admission control statistics.
+
+        Returns:
+        - dict: The in-flight requests, the threshold and the rejections.
+        """
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "rejected": self.rejected,
+        }
+
+
+rate_limiter = RateLimiter(
+    RATE_LIMIT["rate"], RATE_LIMIT["burst"], RATE_LIMIT["idle_seconds"]
+)
+admission = AdmissionControl(RATE_LIMIT["max_in_flight"])
+
+
+def rate_limit_weight(weight: float):
+    """
+    This function sets the number of tokens a route takes from the bucket.
+    Routes take one token by default.
+
+    Args:
+    - weight (float): The number of tokens of the route.
+
+    Returns:
+    - Callable: The decorator of the route function.
+    """
+
+    def decorator(endpoint):
+        endpoint.rate_limit_weight = weight
+        return endpoint
+
+    return decorator
+
+
+async def rate_limit(request: Request, api_key: dict = Depends(get_api_key)):
+    """
+    This dependency takes tokens from the bucket of the API key.
+
+    Raises:
+    - HTTPException: 429 (Too Many Requests) with a Retry-After header if the
+      bucket does not have enough tokens.
+    """
+    endpoint = request.scope.get("endpoint")
+    weight = getattr(endpoint, "rate_limit_weight", 1)
+    retry_after = rate_limiter.acquire(api_key["key_hash"], weight)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+async def admission_control():
+    """
+    This dependency rejects the request when too many requests are doing
+    database work.
+
+    Raises:
+    - HTTPException: 503 (Service Unavailable) with a Retry-After header if
+      the in-flight requests reached the threshold.
+    """
+    if not admission.admit():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        yield
+    finally:
+        admission.release()
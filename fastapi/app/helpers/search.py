@@ -0,0 +1,284 @@
+"""
+Recipe full-text search
+"""
+
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+
+from config.database import (
+    RecipeCategoryModel,
+    RecipeIngredientModel,
+    RecipeModel,
+)
+from config.settings import SEARCH
+
+TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str):
+    """
+    This function splits a text into lowercase terms without accents, so
+    "Crème Brûlée" and "creme brulee" match.
+
+    Args:
+    - text (str): The text.
+
+    Returns:
+    - List[str]: The terms of the text.
+    """
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return TOKEN.findall(text)
+
+
+def recipe_text(recipe: dict):
+    """
+    This function gets the searchable text of a recipe.
+
+    Args:
+    - recipe (dict): The recipe row.
+
+    Returns:
+    - str: The name, description and instructions of the recipe.
+    """
+    return " ".join((recipe["name"], recipe["description"], recipe["instructions"]))
+
+
+class SearchIndex:
+    """
+    This class represents an in-memory inverted index of the recipes.
+
+    Every term has a posting list with the term frequency of each recipe, and
+    every category and ingredient a posting set of recipe ids. Filters
+    intersect the posting sets, smallest first, and the matches are ranked
+    with BM25.
+    """
+
+    def __init__(self, config: dict):
+        self.config = config
+        self.postings = {}
+        self.lengths = {}
+        self.total_length = 0
+        self.filters = {"categories": {}, "ingredients": {}}
+        self.documents = {}
+        self.lock = threading.Lock()
+
+    def load(self):
+        """
+        This method rebuilds the index from the database. Only the active,
+        public recipes are indexed.
+        """
+        recipes = list(
+            RecipeModel.select()
+            .where(RecipeModel.is_active & RecipeModel.is_public)
+            .dicts()
+        )
+        categories = {}
+        for recipe_id, category_id in RecipeCategoryModel.select(
+            RecipeCategoryModel.recipe_id, RecipeCategoryModel.category_id
+        ).tuples():
+            categories.setdefault(recipe_id, []).append(category_id)
+        ingredients = {}
+        for recipe_id, ingredient_id in RecipeIngredientModel.select(
+            RecipeIngredientModel.recipe_id, RecipeIngredientModel.ingredient_id
+        ).tuples():
+            ingredients.setdefault(recipe_id, []).append(ingredient_id)
+        index = SearchIndex(self.config)
+        for recipe in recipes:
+            index.set_recipe(
+                recipe,
+                categories.get(recipe["id"], []),
+                ingredients.get(recipe["id"], []),
+            )
+        with self.lock:
+            self.postings = index.postings
+            self.lengths = index.lengths
+            self.total_length = index.total_length
+            self.filters = index.filters
+            self.documents = index.documents
+
+    def set_recipe(self, recipe: dict, category_ids, ingredient_ids):
+        """
+        This method adds a recipe to the index or replaces it. Inactive or
+        private recipes are removed instead.
+
+        Args:
+        - recipe (dict): The recipe row.
+        - category_ids (List[int]): The ids of the categories of the recipe.
+        - ingredient_ids (List[int]): The ids of the ingredients of the recipe.
+        """
+        with self.lock:
+            self._remove(recipe["id"])
+            if recipe["is_active"] and recipe["is_public"]:
+                self._add(
+                    recipe["id"], recipe_text(recipe), category_ids, ingredient_ids
+                )
+
+    def remove(self, recipe_id: int):
+        """
+        This method removes a recipe from the index.
+
+        Args:
+        - recipe_id (int): The id of the recipe.
+        """
+        with self.lock:
+            self._remove(recipe_id)
+
+    def search(
+        self,
+        query: str = "",
+        category_ids=(),
+        ingredient_ids=(),
+        limit: int = 20,
+    ):
+        """
+        This method finds the recipes that match a query and the filters.
+
+        Every term of the query is optional; recipes with more, rarer terms
+        rank higher. Every category and ingredient of the filters is required.
+        Without query terms, the filtered recipes are returned by id.
+
+        Args:
+        - query (str): The text to search.
+        - category_ids (List[int]): The categories the recipes must have.
+        - ingredient_ids (List[int]): The ingredients the recipes must have.
+        - limit (int): The maximum number of results.
+
+        Returns:
+        - Tuple[List[Tuple[int, float]], int]: The ids and scores of the best
+          recipes, best first, and the number of matching recipes.
+        """
+        terms = set(tokenize(query))
+        with self.lock:
+            allowed = self._filter(category_ids, ingredient_ids)
+            if not terms:
+                if allowed is None:
+                    allowed = self.documents.keys()
+                first = heapq.nsmallest(limit, allowed)
+                return [(recipe_id, 0.0) for recipe_id in first], len(allowed)
+            scores = self._score(terms, allowed)
+        best = heapq.nlargest(
+            limit, scores.items(), key=lambda item: (item[1], -item[0])
+        )
+        return best, len(scores)
+
+    def stats(self):
+        """
+        This method gets the size of the index.
+
+        Returns:
+        - dict: The number of recipes, terms, categories and ingredients.
+        """
+        return {
+            "recipes": len(self.documents),
+            "terms": len(self.postings),
+            "categories": len(self.filters["categories"]),
+            "ingredients": len(self.filters["ingredients"]),
+        }
+
+    def _filter(self, category_ids, ingredient_ids):
+        sets = [
+            self.filters["categories"].get(category_id, set())
+            for category_id in category_ids
+        ]
+        sets += [
+            self.filters["ingredients"].get(ingredient_id, set())
+            for ingredient_id in ingredient_ids
+        ]
+        if not sets:
+            return None
+        sets.sort(key=len)
+        allowed = set(sets[0])
+        for posting in sets[1:]:
+            allowed &= posting
+            if not allowed:
+                break
+        return allowed
+
+    def _score(self, terms, allowed):
+        k1 = self.config["k1"]
+        b = self.config["b"]
+        count = len(self.documents)
+        average_length = self.total_length / count if count else 0
+        scores = {}
+        for term in terms:
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (count - len(posting) + 0.5) / (len(posting) + 0.5))
+            if allowed is not None and len(allowed) < len(posting):
+                matches = (
+                    (recipe_id, posting[recipe_id])
+                    for recipe_id in allowed
+                    if recipe_id in posting
+                )
+            else:
+                matches = (
+                    (recipe_id, frequency)
+                    for recipe_id, frequency in posting.items()
+                    if allowed is None or recipe_id in allowed
+                )
+            for recipe_id, frequency in matches:
+                norm = k1 * (1 - b + b * self.lengths[recipe_id] / average_length)
+                scores[recipe_id] = scores.get(recipe_id, 0.0) + idf * (
+                    frequency * (k1 + 1) / (frequency + norm)
+                )
+        return scores
+
+    def _add(self, recipe_id, text, category_ids, ingredient_ids):
+        category_ids = set(category_ids)
+        ingredient_ids = set(ingredient_ids)
+        frequencies = Counter(tokenize(text))
+        for term, frequency in frequencies.items():
+            self.postings.setdefault(term, {})[recipe_id] = frequency
+        length = sum(frequencies.values())
+        self.lengths[recipe_id] = length
+        self.total_length += length
+        for category_id in category_ids:
+            self.filters["categories"].setdefault(category_id, set()).add(recipe_id)
+        for ingredient_id in ingredient_ids:
+            self.filters["ingredients"].setdefault(ingredient_id, set()).add(recipe_id)
+        self.documents[recipe_id] = (
+            tuple(frequencies),
+            tuple(category_ids),
+            tuple(ingredient_ids),
+        )
+
+    def _remove(self, recipe_id):
+        document = self.documents.pop(recipe_id, None)
+        if document is None:
+            return
+        terms, category_ids, ingredient_ids = document
+        for term in terms:
+            posting = self.postings[term]
+            del posting[recipe_id]
+            if not posting:
+                del self.postings[term]
+        self.total_length -= self.lengths.pop(recipe_id)
+        for category_id in category_ids:
+            discard(self.filters["categories"], category_id, recipe_id)
+        for ingredient_id in ingredient_ids:
+            discard(self.filters["ingredients"], ingredient_id, recipe_id)
+
+
+def discard(postings: dict, key: int, recipe_id: int):
+    """
+    This function removes a recipe from a posting set, and the set when it
+    becomes empty.
+
+    Args:
+    - postings (dict): The posting sets.
+    - key (int): The key of the posting set.
+    - recipe_id (int): The id of the recipe.
+    """
+    posting = postings[key]
+    posting.discard(recipe_id)
+    if not posting:
+        del postings[key]
+
+
+search_index = SearchIndex(SEARCH)
@@ -0,0 +1,171 @@
+"""
+Response serialization
+"""
+
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from pydantic import TypeAdapter, create_model
+from fastapi import HTTPException, Query, Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Used for the routes that return plain dicts: orjson when it is installed,
+# the standard library otherwise.
+DefaultResponse = ORJSONResponse if orjson is not None else JSONResponse
+
+KEY_FIELD = "id"
+
+
+@lru_cache(maxsize=None)
+def project(schema: type, fields: Optional[Tuple[str, ...]] = None):
+    """
+    This function builds the schema of a projection. The projections are
+    cached, so each set of fields builds its schema once.
+
+    Args:
+    - schema (type): The response schema.
+    - fields (Tuple[str, ...]): The fields to keep, or None for all of them.
+
+    Returns:
+    - type: The projected schema.
+    """
+    if fields is None:
+        return schema
+    return create_model(
+        f"{schema.__name__}_{'_'.join(fields)}",
+        __config__=schema.model_config,
+        **{
+            name: (field.annotation, field)
+            for name, field in schema.model_fields.items()
+            if name in fields
+        },
+    )
+
+
+@lru_cache(maxsize=None)
+def page_schema(schema: type):
+    """
+    This function builds the schema of a page of a response schema.
+
+    Args:
+    - schema (type): The response schema of the items.
+
+    Returns:
+    - type: The schema with the items and the cursor of the next page.
+    """
+    return create_model(
+        f"{schema.__name__}Page",
+        items=(List[schema], ...),
+        next_cursor=(Optional[int], None),
+    )
+
+
+@lru_cache(maxsize=None)
+def adapter(schema: type, many: bool):
+    """
+    This function builds the cached validator and serializer of a schema.
+
+    Args:
+    - schema (type): The schema.
+    - many (bool): Whether a list of the schema is serialized.
+
+    Returns:
+    - TypeAdapter: The adapter of the schema.
+    """
+    return TypeAdapter(List[schema] if many else schema)
+
+
+def render(schema: type, data, fields: Optional[Tuple[str, ...]] = None):
+    """
+    This function serializes a row, or a list of rows, with a response
+    schema.
+
+    The rows are validated and encoded by pydantic-core, without going
+    through `jsonable_encoder`. Columns that are not in the schema, like
+    the password of the users, are never written.
+
+    Args:
+    - schema (type): The response schema.
+    - data (dict | Model | list): The row or the rows.
+    - fields (Tuple[str, ...]): The fields to keep, or None for all of them.
+
+    Returns:
+    - Response: The JSON response.
+    """
+    many = isinstance(data, list)
+    type_adapter = adapter(project(schema, fields), many)
+    content = type_adapter.dump_json(type_adapter.validate_python(data))
+    return Response(content=content, media_type="application/json")
+
+
+def render_page(schema: type, page: dict, fields: Optional[Tuple[str, ...]] = None):
+    """
+    This function serializes a page of rows with a response schema.
+
+    Args:
+    - schema (type): The response schema of the items.
+    - page (dict): The items of the page and the cursor of the next page.
+    - fields (Tuple[str, ...]): The fields to keep, or None for all of them.
+
+    Returns:
+    - Response: The JSON response.
+    """
+    type_adapter = adapter(page_schema(project(schema, fields)), False)
+    content = type_adapter.dump_json(type_adapter.validate_python(page))
+    return Response(content=content, media_type="application/json")
+
+
+def select_columns(model, fields: Optional[Tuple[str, ...]] = None):
+    """
+    This function gets the columns a query has to select for a projection.
+
+    Args:
+    - model (Model): The peewee model.
+    - fields (Tuple[str, ...]): The fields to keep, or None for all of them.
+
+    Returns:
+    - list: The peewee fields, or an empty list to select every column.
+    """
+    if fields is None:
+        return []
+    columns = model._meta.fields  # pylint: disable=protected-access
+    return [columns[name] for name in fields]
+
+
+def projection_fields(schema: type):
+    """
+    This function builds a dependency that parses the `fields` query parameter.
+
+    Args:
+    - schema (type): The response schema the fields are checked against.
+
+    Returns:
+    - Callable: The FastAPI dependency, which returns the sorted field names,
+      always including the id, or None when no projection is requested.
+    """
+    names = tuple(schema.model_fields)
+
+    def parse_fields(
+        fields: Optional[str] = Query(
+            None,
+            description=f"Comma-separated fields to return: {', '.join(names)}.",
+        )
+    ):
+        if not fields:
+            return None
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = requested - set(names)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+            )
+        requested.add(KEY_FIELD)
+        return tuple(name for name in names if name in requested)
+
+    return parse_fields
@@ -0,0 +1,308 @@
+"""
+Slow query log
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from peewee import SqliteDatabase
+from config.settings import SLOW_QUERIES
+
+logger = logging.getLogger(__name__)
+
+request_scope = ContextVar("request_scope", default=None)
+
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+PLACEHOLDER_LISTS = re.compile(r"\?(?:\s*,\s*\?)+")
+EXPLAINABLE = ("SELECT", "UPDATE", "DELETE")
+SENSITIVE_COLUMNS = re.compile(r"\b(?:password|key_hash)\b", re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def normalize(sql: str) -> str:
+    """
+    This function gets the shape of a SQL statement: the literals become
+    placeholders and the lists of placeholders, e.g. of an IN, collapse into
+    one, so the same query with different values has one shape.
+
+    Args:
+    - sql (str): The SQL statement.
+
+    Returns:
+    - str: The shape of the statement.
+    """
+    shape = LITERALS.sub("?", sql.replace("%s", "?"))
+    return " ".join(PLACEHOLDER_LISTS.sub("?, ...", shape).split())
+
+
+def explain_sql(sql: str, sqlite: bool):
+    """
+    This function builds the EXPLAIN of a SQL statement.
+
+    Args:
+    - sql (str): The SQL statement.
+    - sqlite (bool): Whether the database is SQLite.
+
+    Returns:
+    - str: The EXPLAIN statement, or None if the statement can not be
+      explained.
+    """
+    if not sql.lstrip()[:6].upper().startswith(EXPLAINABLE):
+        return None
+    return f"EXPLAIN QUERY PLAN {sql}" if sqlite else f"EXPLAIN {sql}"
+
+
+def loggable(params, redact: bool = False):
+    """
+    This function converts the parameters of a query to JSON values, cutting
+    long strings.
+
+    Args:
+    - params (Sequence): The parameters of the query.
+    - redact (bool): Whether to keep only the type and length of the values
+      that are not numbers, for the queries on sensitive columns.
+
+    Returns:
+    - list: The parameters.
+    """
+    return [
+        (
+            value
+            if value is None or isinstance(value, (bool, int, float))
+            else (
+                {"type": type(value).__name__, "length": len(str(value))}
+                if redact
+                else str(value)[:200]
+            )
+        )
+        for value in params or ()
+    ]
+
+
+def sensitive(sql: str) -> bool:
+    """
+    This function checks if a SQL statement reads or writes a sensitive
+    column, such as a password hash or the hash of an API key.
+
+    Args:
+    - sql (str): The SQL statement.
+
+    Returns:
+    - bool: Whether the parameters of the statement must be redacted.
+    """
+    return SENSITIVE_COLUMNS.search(sql) is not None
+
+
+class SlowQueryLog:
+    """
+    This class records the queries slower than a threshold in a bounded ring
+    buffer, with their parameters, duration and the route that ran them. The
+    parameters of the queries on sensitive columns keep only their type and
+    length.
+
+    The first slow query of every shape is explained, and the plan is kept
+    with the shape, so the EXPLAIN runs once and not on every slow query.
+    """
+
+    def __init__(self, config: dict):
+        self.config = config
+        self.threshold = config["threshold_ms"] / 1000
+        self.entries = deque(maxlen=config["size"])
+        self.shapes = OrderedDict()
+        self.lock = threading.Lock()
+
+    def observe(self, sql: str, params, seconds: float):
+        """
+        This method records a query if it is slow.
+
+        Args:
+        - sql (str): The SQL of the query.
+        - params (Sequence): The parameters of the query.
+        - seconds (float): The duration of the query.
+
+        Returns:
+        - str: The shape of the query if it should be explained, else None.
+        """
+        if seconds < self.threshold:
+            return None
+        shape = normalize(sql)
+        scope = request_scope.get()
+        route = getattr((scope or {}).get("route"), "path", None)
+        entry = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round(seconds * 1000, 3),
+            "method": scope["method"] if scope else None,
+            "route": route or (scope["path"] if scope else None),
+            "sql": sql,
+            "params": loggable(params, redact=sensitive(sql)),
+            "shape": shape,
+        }
+        logger.warning(
+            "Slow query (%.1f ms) on %s %s: %s",
+            entry["duration_ms"],
+            entry["method"],
+            entry["route"],
+            sql,
+        )
+        with self.lock:
+            self.entries.append(entry)
+            stats = self.shapes.get(shape)
+            if stats is not None:
+                self.shapes.move_to_end(shape)
+                stats["count"] += 1
+                stats["max_ms"] = max(stats["max_ms"], entry["duration_ms"])
+                return None
+            self.shapes[shape] = {
+                "shape": shape,
+                "count": 1,
+                "max_ms": entry["duration_ms"],
+                "plan": None,
+            }
+            if len(self.shapes) > self.config["max_shapes"]:
+                self.shapes.popitem(last=False)
+        return shape if self.config["explain"] else None
+
+    def set_plan(self, shape: str, plan):
+        """
+        This method stores the plan of a query shape.
+
+        Args:
+        - shape (str): The shape of the query.
+        - plan (List[list] | str): The rows of the EXPLAIN, or the error it
+          raised.
+        """
+        with self.lock:
+            if shape in self.shapes:
+                self.shapes[shape]["plan"] = plan
+
+    def snapshot(self):
+        """
+        This method gets the recorded queries.
+
+        Returns:
+        - dict: The threshold, the slow queries, newest first, and the shapes,
+          most recent first, with their count, maximum duration and plan.
+        """
+        with self.lock:
+            return {
+                "threshold_ms": self.config["threshold_ms"],
+                "entries": list(reversed(self.entries)),
+                "shapes": [dict(stats) for stats in reversed(self.shapes.values())],
+            }
+
+    def clear(self):
+        """
+        This method removes the recorded queries and plans.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.shapes.clear()
+
+
+class SlowQueryMiddleware:
+    """
+    This class is a pure ASGI middleware that keeps the scope of the current
+    request in a context variable, so a slow query can name its route.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_scope.reset(token)
+
+
+def plan_rows(rows):
+    """
+    This function converts the rows of an EXPLAIN to JSON values.
+
+    Args:
+    - rows (Sequence): The rows.
+
+    Returns:
+    - List[list]: The rows.
+    """
+    return [loggable(row.values() if isinstance(row, dict) else row) for row in rows]
+
+
+def log_slow_queries(database, log: SlowQueryLog = None):
+    """
+    This function records the slow statements the peewee database runs.
+
+    Args:
+    - database (Database): The peewee database.
+    - log (SlowQueryLog): The log to record the queries in.
+    """
+    log = log or slow_query_log
+    sqlite = isinstance(database, SqliteDatabase)
+    execute_sql = database.execute_sql
+
+    def logged_execute_sql(sql, params=None, **kwargs):
+        start = time.perf_counter()
+        cursor = execute_sql(sql, params, **kwargs)
+        shape = log.observe(sql, params, time.perf_counter() - start)
+        explain = shape and explain_sql(sql, sqlite)
+        if explain:
+            try:
+                log.set_plan(shape, plan_rows(execute_sql(explain, params).fetchall()))
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                log.set_plan(shape, str(exc))
+        return cursor
+
+    database.execute_sql = logged_execute_sql
+
+
+def log_slow_async_queries(async_database, log: SlowQueryLog = None):
+    """
+    This function records the slow statements an asynchronous driver runs.
+    The threadpool backend goes through the peewee database, and only the
+    databases of its replicas need to be wrapped.
+
+    Args:
+    - async_database (AsyncDatabase): The asynchronous database, or the
+      router of the primary and the replicas.
+    - log (SlowQueryLog): The log to record the queries in.
+    """
+    if hasattr(async_database, "members"):
+        for member in async_database.members():
+            log_slow_async_queries(member, log)
+        return
+    if getattr(async_database, "database", None) is not None:
+        log_slow_queries(async_database.database, log)
+        return
+    if not hasattr(async_database, "run"):
+        return
+    log = log or slow_query_log
+    sqlite = isinstance(async_database.dialect, SqliteDatabase)
+    run = async_database.run
+
+    async def logged_run(sql, params, fetch):
+        start = time.perf_counter()
+        result = await run(sql, params, fetch)
+        shape = log.observe(sql, params, time.perf_counter() - start)
+        explain = shape and explain_sql(sql, sqlite)
+        if explain:
+            try:
+                rows, _, _ = await run(explain, params, True)
+                log.set_plan(shape, plan_rows(rows))
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                log.set_plan(shape, str(exc))
+        return result
+
+    async_database.run = logged_run
+
+
+slow_query_log = SlowQueryLog(SLOW_QUERIES)
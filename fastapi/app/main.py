@@ -3,31 +3,155 @@ This module is the main module of the FastAPI application.
 """
 
 from contextlib import asynccontextmanager
-from config.database import database as connection
+from functools import partial
+from config.async_database import async_database
+from config.settings import (
+    COMPRESSION,
+    METRICS,
+    PASSWORD_HASHING,
+    SERVER,
+    SLOW_QUERIES,
+)
+from config.database import (
+    database as connection,
+    close_database,
+    get_db,
+    reset_db_state,
+)
 from routes.user_role import user_role_router
 from routes.permission import permission_router
 from routes.user import user_router
+from routes.database import database_router
+from routes.cache import cache_router
+from routes.api_key import api_key_router
+from routes.recipe import recipe_router
+from routes.shopping_list import shopping_list_router
+from routes.ingredient import ingredient_router
+from routes.menu import menu_router
+from routes.inventory import inventory_router
+from routes.nutrition import nutrition_router
+from routes.metrics import metrics_router
 from fastapi import Depends, FastAPI
 from fastapi.responses import RedirectResponse
-from helpers.api_key_auth import get_api_key
+from helpers.api_key_auth import (
+    ADMIN_SCOPE,
+    api_key_store,
+    get_api_key,
+    require_scope,
+    route_reads,
+)
+from helpers.authorization import permission_index
+from helpers.cache import entity_cache, entity_key
+from helpers.compression import CompressionMiddleware
+from helpers.etag import sync_table_versions, table_versions
+from helpers.expiry import expiry_scheduler
+from helpers.matcher import recipe_matrix
+from helpers.metrics import (
+    MetricsMiddleware,
+    instrument_async_database,
+    instrument_database,
+)
+from helpers.password import password_hasher
+from helpers.rate_limit import admission_control, rate_limit
+from helpers.search import search_index
+from helpers.slow_queries import (
+    SlowQueryMiddleware,
+    log_slow_async_queries,
+    log_slow_queries,
+)
+from helpers.serialization import DefaultResponse
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
-    This function gets a connection from the database.
+    This function checks the database connection, loads the table versions,
+    the permission index, the API keys, the recipe search index, the recipe
+    matrix and the expiry schedule, and opens the asynchronous and password
+    hashing pools and starts the expiry alerts on startup, and stops them on
+    shutdown.
+
+    The versions are loaded first, so a write of another worker during the
+    startup is reloaded by the first requests.
+
+    With `SERVER_WARMUP`, set by serve.py, the recipe matrix is also built
+    and the password hashing processes are spawned, so the first requests of
+    a worker do not pay for them.
     """
 
-    if connection.is_closed():
-        connection.connect()
+    reset_db_state()
+    connection.connect(reuse_if_open=True)
+    table_versions.load(notify=False)
+    permission_index.load()
+    api_key_store.load()
+    search_index.load()
+    recipe_matrix.load()
+    expiry_scheduler.load()
+    if SERVER["warmup"]:
+        recipe_matrix.current()
+    connection.close()
+    await async_database.connect()
+    password_hasher.start()
+    if SERVER["warmup"]:
+        password_hasher.hash_many(["warmup"] * PASSWORD_HASHING["workers"])
+    expiry_scheduler.start()
     try:
         yield
     finally:
-        if not connection.is_closed():
-            connection.close()
+        await expiry_scheduler.stop()
+        password_hasher.shutdown()
+        await async_database.close()
+        close_database()
 
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=DefaultResponse)
+
+table_versions.listen(
+    ("users", "permissions", "role_permissions"), permission_index.load
+)
+table_versions.listen(("recipes",), search_index.load)
+table_versions.listen(("recipes",), recipe_matrix.load)
+table_versions.listen(("ingredients", "inventory"), expiry_scheduler.load)
+for cached_table in (
+    "users",
+    "user_roles",
+    "permissions",
+    "recipes",
+    "menus",
+    "ingredients",
+):
+    table_versions.listen(
+        (cached_table,),
+        partial(entity_cache.delete_prefix, entity_key(cached_table, "")),
+    )
+
+if COMPRESSION["enabled"]:
+    app.add_middleware(CompressionMiddleware)
+
+if METRICS["enabled"]:
+    app.add_middleware(MetricsMiddleware)
+    instrument_database(connection)
+    instrument_async_database(async_database)
+
+if SLOW_QUERIES["enabled"]:
+    app.add_middleware(SlowQueryMiddleware)
+    log_slow_queries(connection)
+    log_slow_async_queries(async_database)
+
+api_dependencies = [
+    Depends(get_db),
+    Depends(route_reads),
+    Depends(sync_table_versions),
+    Depends(get_api_key),
+    Depends(rate_limit),
+    Depends(admission_control),
+]
+
+admin_dependencies = [
+    Depends(get_db),
+    Depends(route_reads),
+    Depends(require_scope(ADMIN_SCOPE)),
+]
 
 
 @app.get("/")
@@ -42,17 +166,76 @@ app.include_router(
     user_role_router,
     prefix="/api/user_roles",
     tags=["user_roles"],
-    dependencies=[Depends(get_api_key)],
+    dependencies=api_dependencies,
 )
 app.include_router(
     permission_router,
     prefix="/api/permissions",
     tags=["permissions"],
-    dependencies=[Depends(get_api_key)],
+    dependencies=api_dependencies,
 )
 app.include_router(
     user_router,
     prefix="/api/users",
     tags=["users"],
-    dependencies=[Depends(get_api_key)],
+    dependencies=api_dependencies,
+)
+app.include_router(
+    recipe_router,
+    prefix="/api/recipes",
+    tags=["recipes"],
+    dependencies=api_dependencies,
+)
+app.include_router(
+    shopping_list_router,
+    prefix="/api/shopping_lists",
+    tags=["shopping_lists"],
+    dependencies=api_dependencies,
+)
+app.include_router(
+    ingredient_router,
+    prefix="/api/ingredients",
+    tags=["ingredients"],
+    dependencies=api_dependencies,
+)
+app.include_router(
+    menu_router,
+    prefix="/api/menus",
+    tags=["menus"],
+    dependencies=api_dependencies,
+)
+app.include_router(
+    inventory_router,
+    prefix="/api/inventory",
+    tags=["inventory"],
+    dependencies=api_dependencies,
+)
+app.include_router(
+    nutrition_router,
+    prefix="/api/nutrition",
+    tags=["nutrition"],
+    dependencies=api_dependencies,
+)
+app.include_router(
+    database_router,
+    prefix="/api/database",
+    tags=["database"],
+    dependencies=admin_dependencies,
+)
+app.include_router(
+    cache_router,
+    prefix="/api/cache",
+    tags=["cache"],
+    dependencies=admin_dependencies,
+)
+app.include_router(
+    api_key_router,
+    prefix="/api/api_keys",
+    tags=["api_keys"],
+    dependencies=admin_dependencies,
+)
+app.include_router(
+    metrics_router,
+    tags=["metrics"],
+    dependencies=admin_dependencies,
 )
@@ -8,6 +8,7 @@ from sqlalchemy import (
     Column,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     String,
     Date,
@@ -153,6 +154,7 @@ class Ingredient(Base):
     """
 
     __tablename__ = "ingredients"
+    __table_args__ = (Index("ix_ingredients_expiration_date", "expiration_date"),)
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(30), unique=True, nullable=False)
     calories = Column(Integer, nullable=False)
@@ -178,7 +180,9 @@ class InventoryIngredient(Base):
 
     __tablename__ = "inventory_ingredients"
     user_id = Column(Integer, ForeignKey("users.id"), primary_key=True, nullable=False)
-    ingredient_id = Column(Integer, ForeignKey("ingredients.id"), nullable=False)
+    ingredient_id = Column(
+        Integer, ForeignKey("ingredients.id"), primary_key=True, nullable=False
+    )
     quantity = Column(Integer, nullable=False)
 
     # relationship
@@ -186,6 +190,19 @@ class InventoryIngredient(Base):
     user = relationship("User", back_populates="inventories")
 
 
+class ExpiryNotification(Base):
+    """
+    Expiry notifications table
+    """
+
+    __tablename__ = "expiry_notifications"
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True, nullable=False)
+    ingredient_id = Column(
+        Integer, ForeignKey("ingredients.id"), primary_key=True, nullable=False
+    )
+    expiration_date = Column(Date, primary_key=True, nullable=False, index=True)
+
+
 class Category(Base):
     """
     Recipe categories table
@@ -266,6 +283,7 @@ class Menu(Base):
     """
 
     __tablename__ = "menus"
+    __table_args__ = (Index("ix_menus_user_id_menu_date", "user_id", "menu_date"),)
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(30), unique=True, nullable=False)
     menu_date = Column(Date, nullable=False)
@@ -330,6 +348,63 @@ class ShoppingListIngredient(Base):
     ingredient = relationship("Ingredient", back_populates="shopping_lists")
 
 
+class RecipeCalories(Base):
+    """
+    Recipe calories table
+    """
+
+    __tablename__ = "recipe_calories"
+    recipe_id = Column(
+        Integer, ForeignKey("recipes.id"), primary_key=True, nullable=False
+    )
+    calories = Column(Integer, nullable=False, default=0)
+
+
+class MenuCalories(Base):
+    """
+    Menu calories table
+    """
+
+    __tablename__ = "menu_calories"
+    menu_id = Column(Integer, ForeignKey("menus.id"), primary_key=True, nullable=False)
+    calories = Column(Integer, nullable=False, default=0)
+
+
+class UserDayCalories(Base):
+    """
+    User day calories table
+    """
+
+    __tablename__ = "user_day_calories"
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True, nullable=False)
+    day = Column(Date, primary_key=True, nullable=False)
+    calories = Column(Integer, nullable=False, default=0)
+
+
+class ApiKey(Base):
+    """
+    API keys table
+    """
+
+    __tablename__ = "api_keys"
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(30), unique=True, nullable=False)
+    key_hash = Column(String(64), unique=True, nullable=False)
+    scopes = Column(String(255), nullable=False, default="")
+    is_active = Column(Boolean, default=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+
+
+class TableVersion(Base):
+    """
+    Table versions table
+    """
+
+    __tablename__ = "table_versions"
+    name = Column(String(30), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
 # config database
 user_info = f"{DATABASE['user']}:{DATABASE['password']}"
 host_info = f"{DATABASE['host']}/{DATABASE['name']}"
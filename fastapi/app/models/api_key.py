@@ -0,0 +1,35 @@
+"""
+This file contains the model for the API key.
+"""
+
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class ApiKey(BaseModel):
+    """
+    This class represents the API key model.
+    """
+
+    name: str = Field(
+        ..., example="mobile-app", description="The name of the client.", max_length=30
+    )
+    scopes: List[str] = Field(
+        default_factory=list,
+        example=["admin"],
+        description="The scopes granted to the API key.",
+    )
+    user_id: Optional[int] = Field(
+        None,
+        example=1,
+        description="The id of the user the API key acts as, for the permission "
+        "checks.",
+    )
+
+    class Config:
+        """
+        strips leading/trailing whitespace
+        """
+
+        anystr_strip_whitespace = True
@@ -0,0 +1,55 @@
+"""
+This file contains the model for the ingredient.
+"""
+
+from datetime import date
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class Ingredient(BaseModel):
+    """
+    This class represents the ingredient model.
+    """
+
+    name: str = Field(
+        ..., example="Flour", description="The name of the ingredient.", max_length=30
+    )
+    calories: int = Field(
+        ..., example=4, description="The calories of one unit of the ingredient.", ge=0
+    )
+    expiration_date: date = Field(
+        ..., example="2024-12-31", description="The expiration date of the ingredient."
+    )
+    is_active: bool = Field(
+        True, example=True, description="The status of the ingredient."
+    )
+    category_id: int = Field(
+        ..., example=1, description="The id of the category of the ingredient."
+    )
+    unit_id: int = Field(..., example=1, description="The id of the unit.")
+
+    class Config:
+        """
+        strips leading/trailing whitespace
+        """
+
+        anystr_strip_whitespace = True
+
+
+class IngredientResponse(BaseModel):
+    """
+    This class represents an ingredient as returned by the API.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(..., description="The id of the ingredient.")
+    name: str = Field(..., description="The name of the ingredient.")
+    calories: int = Field(..., description="The calories of one unit.")
+    expiration_date: date = Field(
+        ..., description="The expiration date of the ingredient."
+    )
+    is_active: bool = Field(..., description="The status of the ingredient.")
+    category_id: int = Field(..., description="The id of the category.")
+    unit_id: int = Field(..., description="The id of the unit.")
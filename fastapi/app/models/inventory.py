@@ -0,0 +1,42 @@
+"""
+This file contains the model for the inventory.
+"""
+
+from datetime import date
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class InventoryIngredient(BaseModel):
+    """
+    This class represents an ingredient of the inventory of a user.
+    """
+
+    user_id: int = Field(..., example=1, description="The id of the user.")
+    ingredient_id: int = Field(..., example=1, description="The id of the ingredient.")
+    quantity: int = Field(
+        ..., example=500, description="The quantity of the ingredient.", gt=0
+    )
+
+
+class InventoryIngredientResponse(BaseModel):
+    """
+    This class represents an ingredient of an inventory as returned by the API.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    user_id: int = Field(..., description="The id of the user.")
+    ingredient_id: int = Field(..., description="The id of the ingredient.")
+    quantity: int = Field(..., description="The quantity of the ingredient.")
+
+
+class ExpiringIngredient(BaseModel):
+    """
+    This class represents an ingredient of an inventory that expires soon.
+    """
+
+    ingredient_id: int = Field(..., description="The id of the ingredient.")
+    expiration_date: date = Field(
+        ..., description="The expiration date of the ingredient."
+    )
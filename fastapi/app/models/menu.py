@@ -0,0 +1,83 @@
+"""
+This file contains the model for the menu.
+"""
+
+from datetime import date
+from typing import List, Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from models.recipe import RecipeIngredientDetail
+
+
+class Menu(BaseModel):
+    """
+    This class represents the menu model.
+    """
+
+    name: str = Field(
+        ...,
+        example="Monday breakfast",
+        description="The name of the menu.",
+        max_length=30,
+    )
+    menu_date: date = Field(
+        ..., example="2024-10-14", description="The day of the menu."
+    )
+    meal_type: Literal["Breakfast", "Lunch", "Dinner"] = Field(
+        ..., example="Breakfast", description="The meal of the menu."
+    )
+    is_active: bool = Field(True, example=True, description="The status of the menu.")
+    user_id: int = Field(..., example=1, description="The id of the user.")
+    recipe_ids: List[int] = Field(
+        default_factory=list,
+        example=[1],
+        description="The ids of the recipes of the menu.",
+    )
+
+    class Config:
+        """
+        strips leading/trailing whitespace
+        """
+
+        anystr_strip_whitespace = True
+
+
+class MenuResponse(BaseModel):
+    """
+    This class represents a menu as returned by the API.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(..., description="The id of the menu.")
+    name: str = Field(..., description="The name of the menu.")
+    menu_date: date = Field(..., description="The day of the menu.")
+    meal_type: str = Field(..., description="The meal of the menu.")
+    is_active: bool = Field(..., description="The status of the menu.")
+    created_at: date = Field(..., description="The day the menu was created.")
+    user_id: int = Field(..., description="The id of the user.")
+
+
+class MenuRecipeDetail(BaseModel):
+    """
+    This class represents a recipe of a menu with its ingredients.
+    """
+
+    id: int = Field(..., description="The id of the recipe.")
+    name: str = Field(..., description="The name of the recipe.")
+    preparation_time: int = Field(..., description="The preparation time in minutes.")
+    difficulty: int = Field(..., description="The difficulty of the recipe.")
+    ingredients: List[RecipeIngredientDetail] = Field(
+        ..., description="The ingredients of the recipe."
+    )
+    calories: int = Field(..., description="The calories of the recipe.")
+
+
+class MenuDetailResponse(MenuResponse):
+    """
+    This class represents a menu with its recipes and their ingredients.
+    """
+
+    recipes: List[MenuRecipeDetail] = Field(..., description="The recipes of the menu.")
+    calories: int = Field(..., description="The calories of the menu.")
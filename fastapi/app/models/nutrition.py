@@ -0,0 +1,45 @@
+"""
+This file contains the model for the calorie rollups.
+"""
+
+from datetime import date
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class RecipeCalories(BaseModel):
+    """
+    This class represents the calories of a recipe.
+    """
+
+    recipe_id: int = Field(..., description="The id of the recipe.")
+    calories: int = Field(..., description="The calories of the recipe.")
+
+
+class MenuCalories(BaseModel):
+    """
+    This class represents the calories of a menu.
+    """
+
+    menu_id: int = Field(..., description="The id of the menu.")
+    calories: int = Field(..., description="The calories of the recipes of the menu.")
+
+
+class DayCalories(BaseModel):
+    """
+    This class represents the calories of a user on a day.
+    """
+
+    day: date = Field(..., description="The day.")
+    calories: int = Field(..., description="The calories of the active menus.")
+
+
+class UserCalories(BaseModel):
+    """
+    This class represents the calories of a user in a date range.
+    """
+
+    user_id: int = Field(..., description="The id of the user.")
+    days: List[DayCalories] = Field(..., description="The calories of every day.")
+    total: int = Field(..., description="The calories of the date range.")
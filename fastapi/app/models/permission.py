@@ -2,7 +2,7 @@
 This file contains the model for the permission.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class Permission(BaseModel):
@@ -29,3 +29,15 @@ class Permission(BaseModel):
         """
 
         anystr_strip_whitespace = True
+
+
+class PermissionResponse(BaseModel):
+    """
+    This class represents a permission as returned by the API.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(..., description="The id of the permission.")
+    name: str = Field(..., description="The name of the permission.")
+    description: str = Field(..., description="The description of the permission.")
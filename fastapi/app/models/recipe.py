@@ -0,0 +1,172 @@
+"""
+This file contains the model for the recipe.
+"""
+
+from typing import List
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class RecipeIngredient(BaseModel):
+    """
+    This class represents an ingredient of a recipe.
+    """
+
+    ingredient_id: int = Field(..., example=1, description="The id of the ingredient.")
+    quantity: int = Field(
+        ..., example=200, description="The quantity of the ingredient.", gt=0
+    )
+
+
+class Recipe(BaseModel):
+    """
+    This class represents the recipe model.
+    """
+
+    name: str = Field(
+        ..., example="Pancakes", description="The name of the recipe.", max_length=30
+    )
+    description: str = Field(
+        ...,
+        example="Fluffy breakfast pancakes.",
+        description="The description of the recipe.",
+        max_length=100,
+    )
+    instructions: str = Field(
+        ...,
+        example="Mix the flour, milk and eggs, then cook on a hot pan.",
+        description="The instructions of the recipe.",
+        max_length=255,
+    )
+    preparation_time: int = Field(
+        ..., example=20, description="The preparation time in minutes.", ge=0
+    )
+    difficulty: int = Field(
+        ..., example=1, description="The difficulty of the recipe.", ge=0
+    )
+    is_public: bool = Field(
+        True, example=True, description="Whether the recipe is public."
+    )
+    is_active: bool = Field(True, example=True, description="The status of the recipe.")
+    category_ids: List[int] = Field(
+        default_factory=list,
+        example=[1],
+        description="The ids of the categories of the recipe.",
+    )
+    ingredients: List[RecipeIngredient] = Field(
+        default_factory=list, description="The ingredients of the recipe."
+    )
+
+    class Config:
+        """
+        strips leading/trailing whitespace
+        """
+
+        anystr_strip_whitespace = True
+
+
+class RecipeResponse(BaseModel):
+    """
+    This class represents a recipe as returned by the API.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(..., description="The id of the recipe.")
+    name: str = Field(..., description="The name of the recipe.")
+    description: str = Field(..., description="The description of the recipe.")
+    instructions: str = Field(..., description="The instructions of the recipe.")
+    preparation_time: int = Field(..., description="The preparation time in minutes.")
+    difficulty: int = Field(..., description="The difficulty of the recipe.")
+    is_public: bool = Field(..., description="Whether the recipe is public.")
+    is_active: bool = Field(..., description="The status of the recipe.")
+    user_id: int = Field(..., description="The id of the author of the recipe.")
+
+
+class CategoryResponse(BaseModel):
+    """
+    This class represents a category of a recipe.
+    """
+
+    id: int = Field(..., description="The id of the category.")
+    name: str = Field(..., description="The name of the category.")
+
+
+class RecipeIngredientDetail(BaseModel):
+    """
+    This class represents an ingredient of a recipe, with its unit and
+    calories.
+    """
+
+    ingredient_id: int = Field(..., description="The id of the ingredient.")
+    name: str = Field(..., description="The name of the ingredient.")
+    quantity: int = Field(..., description="The quantity of the ingredient.")
+    unit: str = Field(..., description="The unit of the quantity.")
+    calories: int = Field(..., description="The calories of one unit.")
+
+
+class RecipeDetailResponse(RecipeResponse):
+    """
+    This class represents a recipe with its author, categories and
+    ingredients.
+    """
+
+    author: str = Field(..., description="The username of the author.")
+    categories: List[CategoryResponse] = Field(
+        ..., description="The categories of the recipe."
+    )
+    ingredients: List[RecipeIngredientDetail] = Field(
+        ..., description="The ingredients of the recipe."
+    )
+    calories: int = Field(..., description="The calories of the recipe.")
+
+
+class RecipeSearchResult(RecipeResponse):
+    """
+    This class represents a recipe found by a search.
+    """
+
+    score: float = Field(..., description="The BM25 score of the recipe.")
+
+
+class RecipeSearchResponse(BaseModel):
+    """
+    This class represents the results of a recipe search.
+    """
+
+    items: List[RecipeSearchResult] = Field(..., description="The best recipes.")
+    total: int = Field(..., description="The number of matching recipes.")
+
+
+class MissingIngredient(BaseModel):
+    """
+    This class represents an ingredient the inventory does not cover.
+    """
+
+    ingredient_id: int = Field(..., description="The id of the ingredient.")
+    required: int = Field(..., description="The quantity the recipe needs.")
+    available: int = Field(..., description="The quantity in the inventory.")
+
+
+class RecipeMatch(RecipeResponse):
+    """
+    This class represents a recipe ranked against an inventory.
+    """
+
+    coverage: float = Field(
+        ..., description="The share of the recipe the inventory covers, 0 to 1."
+    )
+    missing: List[MissingIngredient] = Field(
+        ..., description="The ingredients the inventory does not cover."
+    )
+
+
+class RecipeMatchResponse(BaseModel):
+    """
+    This class represents the recipes a user can cook.
+    """
+
+    items: List[RecipeMatch] = Field(..., description="The best recipes.")
+    total: int = Field(
+        ..., description="The number of recipes with the minimum coverage."
+    )
@@ -0,0 +1,49 @@
+"""
+This file contains the model for the shopping list.
+"""
+
+from datetime import date
+from typing import List
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ShoppingListRequest(BaseModel):
+    """
+    This class represents the menus a shopping list is generated from.
+    """
+
+    user_id: int = Field(..., example=1, description="The id of the user.")
+    start_date: date = Field(
+        ..., example="2024-10-14", description="The first day of the menus."
+    )
+    end_date: date = Field(
+        ..., example="2024-10-20", description="The last day of the menus."
+    )
+
+
+class ShoppingListItem(BaseModel):
+    """
+    This class represents an ingredient of a shopping list.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    ingredient_id: int = Field(..., description="The id of the ingredient.")
+    quantity: int = Field(..., description="The quantity to buy.")
+    bought: bool = Field(..., description="Whether the ingredient was bought.")
+
+
+class ShoppingListResponse(BaseModel):
+    """
+    This class represents a shopping list as returned by the API.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(..., description="The id of the shopping list.")
+    user_id: int = Field(..., description="The id of the user.")
+    created_at: date = Field(..., description="The creation date of the list.")
+    items: List[ShoppingListItem] = Field(
+        ..., description="The ingredients of the shopping list."
+    )
@@ -2,7 +2,7 @@
 This file contains the model for the user.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class User(BaseModel):
@@ -44,3 +44,32 @@ class User(BaseModel):
         """
 
         anystr_strip_whitespace = True
+
+
+class UserLogin(BaseModel):
+    """
+    This class represents the credentials of a user.
+    """
+
+    username: str = Field(
+        ..., example="johndoe", description="The username of the user.", max_length=30
+    )
+    password: str = Field(
+        ..., example="password", description="The password of the user.", max_length=255
+    )
+
+
+class UserResponse(BaseModel):
+    """
+    This class represents a user as returned by the API, without the password.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(..., description="The id of the user.")
+    username: str = Field(..., description="The username of the user.")
+    email: str = Field(..., description="The email of the user.")
+    account_type: str = Field(..., description="The account type of the user.")
+    profile_picture: str = Field(..., description="The profile picture of the user.")
+    role_id: int = Field(..., description="The role id of the user.")
+    is_active: bool = Field(..., description="The status of the user.")
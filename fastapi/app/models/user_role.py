@@ -2,7 +2,7 @@
 This file contains the model for the user role.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class UserRole(BaseModel):
@@ -26,3 +26,14 @@ class UserRole(BaseModel):
         """
 
         anystr_strip_whitespace = True
+
+
+class UserRoleResponse(BaseModel):
+    """
+    This class represents a user role as returned by the API.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(..., description="The id of the user role.")
+    name: str = Field(..., description="The name of the user role.")
@@ -0,0 +1,70 @@
+"""
+This file contains the routes for the API key.
+"""
+
+from models.api_key import ApiKey
+
+from services.api_key import (
+    get_all_api_keys_async,
+    create_api_key_async,
+    rotate_api_key_async,
+    revoke_api_key_async,
+)
+
+
+from fastapi import APIRouter
+
+api_key_router = APIRouter()
+
+
+@api_key_router.get("/")
+async def get_api_keys():
+    """
+    This route gets all the API keys.
+
+    Returns:
+    - List[dict]: A list of API keys, without the keys themselves.
+    """
+    return await get_all_api_keys_async()
+
+
+@api_key_router.post("/")
+async def post_api_key(api_key: ApiKey):
+    """
+    This route creates an API key.
+
+    Args:
+    - api_key (ApiKey): The name, scopes and user of the API key.
+
+    Returns:
+    - dict: The created API key, including the key.
+    """
+    return await create_api_key_async(api_key)
+
+
+@api_key_router.post("/{api_key_id}/rotate")
+async def rotate_api_key(api_key_id: int):
+    """
+    This route replaces an API key with a new one.
+
+    Args:
+    - api_key_id (int): The id of the API key.
+
+    Returns:
+    - dict: The rotated API key, including the new key.
+    """
+    return await rotate_api_key_async(api_key_id)
+
+
+@api_key_router.delete("/{api_key_id}")
+async def delete_api_key(api_key_id: int):
+    """
+    This route revokes an API key.
+
+    Args:
+    - api_key_id (int): The id of the API key.
+
+    Returns:
+    - dict: The revoked API key.
+    """
+    return await revoke_api_key_async(api_key_id)
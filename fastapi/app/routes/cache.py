@@ -0,0 +1,45 @@
+"""
+This file contains the routes for the cache.
+"""
+
+from helpers.cache import entity_cache
+from helpers.compression import response_compressor
+
+from fastapi import APIRouter
+
+cache_router = APIRouter()
+
+
+@cache_router.get("/stats")
+async def get_cache_stats():
+    """
+    This route gets the entity cache statistics.
+
+    Returns:
+    - dict: The hit and miss counters and the size of the cache.
+    """
+    return entity_cache.stats()
+
+
+@cache_router.get("/compression")
+async def get_compression_stats():
+    """
+    This route gets the response compression statistics.
+
+    Returns:
+    - dict: The bytes saved and the CPU time of every encoding, and the
+      counters and size of the compressed body cache.
+    """
+    return response_compressor.stats()
+
+
+@cache_router.delete("/")
+async def clear_cache():
+    """
+    This route removes every entity from the cache.
+
+    Returns:
+    - dict: The cache statistics after clearing it.
+    """
+    entity_cache.clear()
+    return entity_cache.stats()
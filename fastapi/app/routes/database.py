@@ -0,0 +1,97 @@
+"""
+This file contains the routes for the database.
+"""
+
+from config.async_database import async_database
+from config.database import get_pool_stats
+from helpers.expiry import expiry_scheduler
+from helpers.nutrition import calorie_rollups
+from helpers.rate_limit import admission, rate_limiter
+from helpers.slow_queries import slow_query_log
+
+from fastapi import APIRouter
+
+database_router = APIRouter()
+
+
+@database_router.get("/pool")
+def get_pool():
+    """
+    This route gets the connection pool statistics.
+
+    Returns:
+    - dict: The idle and in-use connections of the pool.
+    """
+    return get_pool_stats()
+
+
+@database_router.get("/replicas")
+def get_replicas():
+    """
+    This route gets the health of the read replicas.
+
+    Returns:
+    - dict: The health, lag and reads of every replica.
+    """
+    if hasattr(async_database, "stats"):
+        return async_database.stats()
+    return {"replicas": []}
+
+
+@database_router.get("/admission")
+def get_admission():
+    """
+    This route gets the rate limiter and admission control statistics.
+
+    Returns:
+    - dict: The tracked API keys and the in-flight requests.
+    """
+    return {"rate_limit": rate_limiter.stats(), "admission": admission.stats()}
+
+
+@database_router.get("/nutrition")
+def get_nutrition_check():
+    """
+    This route compares the calorie rollups with a full recompute in the
+    database.
+
+    Returns:
+    - dict: The number of recipes, menus and days checked, and the
+      differences found.
+    """
+    return calorie_rollups.check()
+
+
+@database_router.get("/expiry")
+def get_expiry():
+    """
+    This route gets the expiry schedule statistics.
+
+    Returns:
+    - dict: The number of users, scheduled ingredients and heap entries.
+    """
+    return expiry_scheduler.stats()
+
+
+@database_router.get("/slow_queries")
+def get_slow_queries():
+    """
+    This route gets the slow query log.
+
+    Returns:
+    - dict: The threshold, the slow queries, newest first, and the plan of
+      every query shape.
+    """
+    return slow_query_log.snapshot()
+
+
+@database_router.delete("/slow_queries")
+def clear_slow_queries():
+    """
+    This route removes every query from the slow query log.
+
+    Returns:
+    - dict: The slow query log after clearing it.
+    """
+    slow_query_log.clear()
+    return slow_query_log.snapshot()
@@ -0,0 +1,96 @@
+"""
+This file contains the routes for the ingredient.
+"""
+
+from typing import Optional, Tuple
+
+from models.ingredient import Ingredient, IngredientResponse
+from helpers.pagination import Page
+from helpers.serialization import page_schema, projection_fields, render, render_page
+
+from services.ingredient import (
+    get_all_ingredients_async,
+    get_ingredient_by_id_async,
+    create_ingredient_async,
+    update_ingredient_async,
+)
+
+
+from fastapi import APIRouter, Depends
+
+ingredient_router = APIRouter()
+
+
+@ingredient_router.get("/", response_model=page_schema(IngredientResponse))
+async def get_ingredients(
+    page: Page = Depends(),
+    fields: Optional[Tuple[str, ...]] = Depends(projection_fields(IngredientResponse)),
+):
+    """
+    This route gets a page of the ingredients.
+
+    Args:
+    - page (Page): The cursor and the limit of the page.
+    - fields (Tuple[str, ...]): The fields to return, or None for all of them.
+
+    Returns:
+    - dict: A list of ingredients and the cursor of the next page.
+    """
+    return render_page(
+        IngredientResponse,
+        await get_all_ingredients_async(page.cursor, page.limit, fields),
+        fields,
+    )
+
+
+@ingredient_router.get("/{id}", response_model=IngredientResponse)
+async def get_ingredient(
+    ingredient_id: int,
+    fields: Optional[Tuple[str, ...]] = Depends(projection_fields(IngredientResponse)),
+):
+    """
+    This route gets an ingredient by id.
+
+    Args:
+    - ingredient_id (int): The id of the ingredient.
+    - fields (Tuple[str, ...]): The fields to return, or None for all of them.
+
+    Returns:
+    - Ingredient: The ingredient.
+    """
+    return render(
+        IngredientResponse,
+        await get_ingredient_by_id_async(ingredient_id, fields),
+        fields,
+    )
+
+
+@ingredient_router.post("/", response_model=IngredientResponse)
+async def post_ingredient(ingredient: Ingredient):
+    """
+    This route creates an ingredient.
+
+    Args:
+    - ingredient (Ingredient): The ingredient to create.
+
+    Returns:
+    - Ingredient: The created ingredient.
+    """
+    return render(IngredientResponse, await create_ingredient_async(ingredient))
+
+
+@ingredient_router.put("/{id}", response_model=IngredientResponse)
+async def put_ingredient(ingredient_id: int, ingredient: Ingredient):
+    """
+    This route updates an ingredient.
+
+    Args:
+    - ingredient_id (int): The id of the ingredient.
+    - ingredient (Ingredient): The ingredient to update.
+
+    Returns:
+    - Ingredient: The updated ingredient.
+    """
+    return render(
+        IngredientResponse, await update_ingredient_async(ingredient_id, ingredient)
+    )
@@ -0,0 +1,92 @@
+"""
+This file contains the routes for the inventory.
+"""
+
+from typing import List
+
+from models.inventory import (
+    ExpiringIngredient,
+    InventoryIngredient,
+    InventoryIngredientResponse,
+)
+from helpers.serialization import render
+
+from services.inventory import (
+    get_inventory_async,
+    set_inventory_ingredient_async,
+    delete_inventory_ingredient_async,
+    get_expiring_ingredients,
+)
+
+
+from fastapi import APIRouter, Query
+
+inventory_router = APIRouter()
+
+
+@inventory_router.get("/", response_model=List[InventoryIngredientResponse])
+async def get_inventory(user_id: int):
+    """
+    This route gets the inventory of a user.
+
+    Args:
+    - user_id (int): The id of the user.
+
+    Returns:
+    - List[InventoryIngredient]: The ingredients of the inventory.
+    """
+    return render(InventoryIngredientResponse, await get_inventory_async(user_id))
+
+
+@inventory_router.get("/expiring", response_model=List[ExpiringIngredient])
+async def get_expiring(
+    user_id: int,
+    days: int = Query(7, ge=0, le=366, description="The number of days to look at."),
+):
+    """
+    This route gets the ingredients of the inventory of a user that expire in
+    the next days.
+
+    Args:
+    - user_id (int): The id of the user.
+    - days (int): The number of days.
+
+    Returns:
+    - List[ExpiringIngredient]: The ingredients, soonest first.
+    """
+    return render(ExpiringIngredient, get_expiring_ingredients(user_id, days))
+
+
+@inventory_router.put("/", response_model=InventoryIngredientResponse)
+async def put_inventory_ingredient(ingredient: InventoryIngredient):
+    """
+    This route adds an ingredient to the inventory of a user, or replaces its
+    quantity.
+
+    Args:
+    - ingredient (InventoryIngredient): The ingredient of the inventory.
+
+    Returns:
+    - InventoryIngredient: The ingredient of the inventory.
+    """
+    return render(
+        InventoryIngredientResponse, await set_inventory_ingredient_async(ingredient)
+    )
+
+
+@inventory_router.delete("/", response_model=InventoryIngredientResponse)
+async def delete_inventory_ingredient(user_id: int, ingredient_id: int):
+    """
+    This route removes an ingredient from the inventory of a user.
+
+    Args:
+    - user_id (int): The id of the user.
+    - ingredient_id (int): The id of the ingredient.
+
+    Returns:
+    - InventoryIngredient: The removed ingredient.
+    """
+    return render(
+        InventoryIngredientResponse,
+        await delete_inventory_ingredient_async(user_id, ingredient_id),
+    )
@@ -0,0 +1,109 @@
+"""
+This file contains the routes for the menu.
+"""
+
+from typing import Optional, Tuple
+
+from models.menu import Menu, MenuDetailResponse, MenuResponse
+from helpers.pagination import Page
+from helpers.serialization import page_schema, projection_fields, render, render_page
+
+from services.menu import (
+    get_all_menus_async,
+    get_menu_by_id_async,
+    get_menu_detail_async,
+    create_menu_async,
+    update_menu_async,
+)
+
+
+from fastapi import APIRouter, Depends
+
+menu_router = APIRouter()
+
+
+@menu_router.get("/", response_model=page_schema(MenuResponse))
+async def get_menus(
+    page: Page = Depends(),
+    fields: Optional[Tuple[str, ...]] = Depends(projection_fields(MenuResponse)),
+):
+    """
+    This route gets a page of the menus.
+
+    Args:
+    - page (Page): The cursor and the limit of the page.
+    - fields (Tuple[str, ...]): The fields to return, or None for all of them.
+
+    Returns:
+    - dict: A list of menus and the cursor of the next page.
+    """
+    return render_page(
+        MenuResponse,
+        await get_all_menus_async(page.cursor, page.limit, fields),
+        fields,
+    )
+
+
+@menu_router.get("/{id}", response_model=MenuResponse)
+async def get_menu(
+    menu_id: int,
+    fields: Optional[Tuple[str, ...]] = Depends(projection_fields(MenuResponse)),
+):
+    """
+    This route gets a menu by id.
+
+    Args:
+    - menu_id (int): The id of the menu.
+    - fields (Tuple[str, ...]): The fields to return, or None for all of them.
+
+    Returns:
+    - Menu: The menu.
+    """
+    return render(
+        MenuResponse,
+        await get_menu_by_id_async(menu_id, fields),
+        fields,
+    )
+
+
+@menu_router.get("/{menu_id}/detail", response_model=MenuDetailResponse)
+async def get_menu_detail(menu_id: int):
+    """
+    This route gets a menu with its recipes and their ingredients.
+
+    Args:
+    - menu_id (int): The id of the menu.
+
+    Returns:
+    - dict: The menu with its recipes and their ingredients.
+    """
+    return render(MenuDetailResponse, await get_menu_detail_async(menu_id))
+
+
+@menu_router.post("/", response_model=MenuResponse)
+async def post_menu(menu: Menu):
+    """
+    This route creates a menu.
+
+    Args:
+    - menu (Menu): The menu to create.
+
+    Returns:
+    - Menu: The created menu.
+    """
+    return render(MenuResponse, await create_menu_async(menu))
+
+
+@menu_router.put("/{id}", response_model=MenuResponse)
+async def put_menu(menu_id: int, menu: Menu):
+    """
+    This route updates a menu.
+
+    Args:
+    - menu_id (int): The id of the menu.
+    - menu (Menu): The menu to update.
+
+    Returns:
+    - Menu: The updated menu.
+    """
+    return render(MenuResponse, await update_menu_async(menu_id, menu))
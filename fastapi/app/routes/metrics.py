@@ -0,0 +1,24 @@
+"""
+This file contains the routes for the metrics.
+"""
+
+from helpers.metrics import metrics
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    This route gets the metrics in the Prometheus text format.
+
+    Returns:
+    - PlainTextResponse: The request latencies, the requests in flight, the
+      database query durations and the connection pool statistics.
+    """
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,64 @@
+"""
+This file contains the routes for the calorie rollups.
+"""
+
+from datetime import date
+
+from models.nutrition import MenuCalories, RecipeCalories, UserCalories
+from helpers.serialization import render
+
+from services.nutrition import (
+    get_recipe_calories,
+    get_menu_calories,
+    get_user_calories,
+)
+
+
+from fastapi import APIRouter
+
+nutrition_router = APIRouter()
+
+
+@nutrition_router.get("/recipes/{recipe_id}", response_model=RecipeCalories)
+async def get_recipe_nutrition(recipe_id: int):
+    """
+    This route gets the calories of a recipe.
+
+    Args:
+    - recipe_id (int): The id of the recipe.
+
+    Returns:
+    - dict: The id and the calories of the recipe.
+    """
+    return render(RecipeCalories, await get_recipe_calories(recipe_id))
+
+
+@nutrition_router.get("/menus/{menu_id}", response_model=MenuCalories)
+async def get_menu_nutrition(menu_id: int):
+    """
+    This route gets the calories of a menu.
+
+    Args:
+    - menu_id (int): The id of the menu.
+
+    Returns:
+    - dict: The id and the calories of the menu.
+    """
+    return render(MenuCalories, await get_menu_calories(menu_id))
+
+
+@nutrition_router.get("/users/{user_id}", response_model=UserCalories)
+async def get_user_nutrition(user_id: int, start_date: date, end_date: date):
+    """
+    This route gets the calories of the active menus of a user on every day
+    of a date range.
+
+    Args:
+    - user_id (int): The id of the user.
+    - start_date (date): The first day.
+    - end_date (date): The last day.
+
+    Returns:
+    - dict: The calories of every day and of the whole range.
+    """
+    return render(UserCalories, await get_user_calories(user_id, start_date, end_date))
@@ -2,48 +2,103 @@
 This file contains the routes for the permission.
 """
 
-from models.permission import Permission
+from typing import List, Optional, Tuple
+
+from config.settings import BULK
+from models.permission import Permission, PermissionResponse
+from helpers.etag import conditional_get, tagged
+from helpers.export import Export
+from helpers.pagination import Page
+from helpers.rate_limit import rate_limit_weight
+from helpers.serialization import page_schema, projection_fields, render, render_page
 
 from services.permission import (
-    get_all_permissions,
-    get_permission_by_id,
-    create_permission,
-    update_permission,
+    get_all_permissions_async,
+    get_permission_by_id_async,
+    create_permission_async,
+    update_permission_async,
+    create_permissions_bulk_async,
+    export_permissions,
 )
 
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Body, Depends
 
 permission_router = APIRouter()
 
 
-@permission_router.get("/")
-def get_permissions():
+@permission_router.get("/", response_model=page_schema(PermissionResponse))
+async def get_permissions(
+    page: Page = Depends(),
+    etag: str = Depends(conditional_get("permissions")),
+    fields: Optional[Tuple[str, ...]] = Depends(projection_fields(PermissionResponse)),
+):
+    """
+    This route gets a page of the permissions.
+
+    Args:
+    - page (Page): The cursor and the limit of the page.
+    - etag (str): The ETag of the permissions, checked against
+      If-None-Match.
+    - fields (Tuple[str, ...]): The fields to return, or None for all of them.
+
+    Returns:
+    - dict: A list of permissions and the cursor of the next page.
+    """
+    return tagged(
+        render_page(
+            PermissionResponse,
+            await get_all_permissions_async(page.cursor, page.limit, fields),
+            fields,
+        ),
+        etag,
+    )
+
+
+@permission_router.get("/export")
+@rate_limit_weight(10)
+async def get_permissions_export(export: Export = Depends()):
     """
-    This route gets all the permissions.
+    This route streams all the permissions as NDJSON or CSV.
+
+    Args:
+    - export (Export): The format of the export and the id to resume from.
 
     Returns:
-    - List[Permission]: A list of permissions.
+    - StreamingResponse: The streamed permissions.
     """
-    return get_all_permissions()
+    return export_permissions(export.export_format, export.since_id)
 
 
-@permission_router.get("/{id}")
-def get_permission(permission_id: int):
+@permission_router.get("/{id}", response_model=PermissionResponse)
+async def get_permission(
+    permission_id: int,
+    etag: str = Depends(conditional_get("permissions", "permission_id")),
+    fields: Optional[Tuple[str, ...]] = Depends(projection_fields(PermissionResponse)),
+):
     """
     This route gets a permission by id.
 
     Args:
     - permission_id (int): The id of the permission.
+    - etag (str): The ETag of the permission, checked against If-None-Match.
+    - fields (Tuple[str, ...]): The fields to return, or None for all of them.
 
     Returns:
     - Permission: The permission.
     """
-    return get_permission_by_id(permission_id)
-
-
-@permission_router.post("/")
-def post_permission(permission: Permission):
+    return tagged(
+        render(
+            PermissionResponse,
+            await get_permission_by_id_async(permission_id, fields),
+            fields,
+        ),
+        etag,
+    )
+
+
+@permission_router.post("/", response_model=PermissionResponse)
+async def post_permission(permission: Permission):
     """
     This route creates a permission.
 
@@ -53,11 +108,32 @@ def post_permission(permission: Permission):
     Returns:
     - Permission: The created permission.
     """
-    return create_permission(permission)
+    return render(PermissionResponse, await create_permission_async(permission))
+
+
+@permission_router.post("/bulk")
+@rate_limit_weight(10)
+async def post_permissions_bulk(
+    permissions: List[Permission] = Body(..., max_length=BULK["max_items"])
+):
+    """
+    This route creates many permissions.
+
+    The whole payload is validated before anything is inserted, and every
+    permission gets its own result.
+
+    Args:
+    - permissions (List[Permission]): The permissions to create.
+
+    Returns:
+    - dict: The number of created and conflicting permissions and the result of
+      every permission.
+    """
+    return await create_permissions_bulk_async(permissions)
 
 
-@permission_router.put("/{id}")
-def put_permission(permission_id: int, permission: Permission):
+@permission_router.put("/{id}", response_model=PermissionResponse)
+async def put_permission(permission_id: int, permission: Permission):
     """
     This route updates a permission.
 
@@ -68,4 +144,6 @@ def put_permission(permission_id: int, permission: Permission):
     Returns:
     - Permission: The updated permission.
     """
-    return update_permission(permission_id, permission)
+    return render(
+        PermissionResponse, await update_permission_async(permission_id, permission)
+    )
@@ -0,0 +1,181 @@
+"""
+This file contains the routes for the recipe.
+"""
+
+from typing import List, Optional, Tuple
+
+from config.settings import MATCHER, SEARCH
+from models.recipe import (
+    Recipe,
+    RecipeDetailResponse,
+    RecipeMatchResponse,
+    RecipeResponse,
+    RecipeSearchResponse,
+)
+from helpers.authorization import require_permission
+from helpers.pagination import Page
+from helpers.serialization import page_schema, projection_fields, render, render_page
+
+from services.recipe import (
+    get_all_recipes_async,
+    get_recipe_by_id_async,
+    get_recipe_detail_async,
+    create_recipe_async,
+    update_recipe_async,
+    search_recipes_async,
+    get_cookable_recipes_async,
+)
+
+
+from fastapi import APIRouter, Depends, Query
+
+recipe_router = APIRouter()
+
+
+@recipe_router.get("/", response_model=page_schema(RecipeResponse))
+async def get_recipes(
+    page: Page = Depends(),
+    fields: Optional[Tuple[str, ...]] = Depends(projection_fields(RecipeResponse)),
+):
+    """
+    This route gets a page of the recipes.
+
+    Args:
+    - page (Page): The cursor and the limit of the page.
+    - fields (Tuple[str, ...]): The fields to return, or None for all of them.
+
+    Returns:
+    - dict: A list of recipes and the cursor of the next page.
+    """
+    return render_page(
+        RecipeResponse,
+        await get_all_recipes_async(page.cursor, page.limit, fields),
+        fields,
+    )
+
+
+@recipe_router.get("/search", response_model=RecipeSearchResponse)
+async def get_recipes_search(
+    q: str = Query("", max_length=200, description="The text to search."),
+    category_id: List[int] = Query(
+        [], description="The categories the recipes must have."
+    ),
+    ingredient_id: List[int] = Query(
+        [], description="The ingredients the recipes must have."
+    ),
+    limit: int = Query(SEARCH["default_limit"], ge=1, le=SEARCH["max_limit"]),
+):
+    """
+    This route searches the public recipes, ranked by relevance.
+
+    Args:
+    - q (str): The text to search.
+    - category_id (List[int]): The categories the recipes must have.
+    - ingredient_id (List[int]): The ingredients the recipes must have.
+    - limit (int): The maximum number of results.
+
+    Returns:
+    - dict: The best recipes, with their scores, and the number of matching
+      recipes.
+    """
+    return render(
+        RecipeSearchResponse,
+        await search_recipes_async(q, category_id, ingredient_id, limit),
+    )
+
+
+@recipe_router.get("/cookable", response_model=RecipeMatchResponse)
+async def get_cookable_recipes(
+    user_id: int,
+    limit: int = Query(MATCHER["default_limit"], ge=1, le=MATCHER["max_limit"]),
+    min_coverage: float = Query(
+        0.0, ge=0.0, le=1.0, description="The minimum coverage of the recipes."
+    ),
+):
+    """
+    This route ranks the public recipes by how much of them the inventory of a
+    user covers.
+
+    Args:
+    - user_id (int): The id of the user.
+    - limit (int): The maximum number of recipes.
+    - min_coverage (float): The minimum coverage of the recipes, from 0 to 1.
+
+    Returns:
+    - dict: The best recipes, with their coverage and missing ingredients,
+      and the number of recipes with at least the minimum coverage.
+    """
+    return render(
+        RecipeMatchResponse,
+        await get_cookable_recipes_async(user_id, limit, min_coverage),
+    )
+
+
+@recipe_router.get("/{id}", response_model=RecipeResponse)
+async def get_recipe(
+    recipe_id: int,
+    fields: Optional[Tuple[str, ...]] = Depends(projection_fields(RecipeResponse)),
+):
+    """
+    This route gets a recipe by id.
+
+    Args:
+    - recipe_id (int): The id of the recipe.
+    - fields (Tuple[str, ...]): The fields to return, or None for all of them.
+
+    Returns:
+    - Recipe: The recipe.
+    """
+    return render(
+        RecipeResponse, await get_recipe_by_id_async(recipe_id, fields), fields
+    )
+
+
+@recipe_router.get("/{recipe_id}/detail", response_model=RecipeDetailResponse)
+async def get_recipe_detail(recipe_id: int):
+    """
+    This route gets a recipe with its author, categories and ingredients.
+
+    Args:
+    - recipe_id (int): The id of the recipe.
+
+    Returns:
+    - dict: The recipe with its author, categories and ingredients.
+    """
+    return render(RecipeDetailResponse, await get_recipe_detail_async(recipe_id))
+
+
+@recipe_router.post("/", response_model=RecipeResponse)
+async def post_recipe(
+    recipe: Recipe, user: dict = Depends(require_permission("Create Recipe"))
+):
+    """
+    This route creates a recipe. The author is the user of the API key.
+
+    Args:
+    - recipe (Recipe): The recipe to create.
+    - user (dict): The user creating the recipe.
+
+    Returns:
+    - Recipe: The created recipe.
+    """
+    return render(RecipeResponse, await create_recipe_async(recipe, user["id"]))
+
+
+@recipe_router.put(
+    "/{id}",
+    response_model=RecipeResponse,
+    dependencies=[Depends(require_permission("Create Recipe"))],
+)
+async def put_recipe(recipe_id: int, recipe: Recipe):
+    """
+    This route updates a recipe.
+
+    Args:
+    - recipe_id (int): The id of the recipe.
+    - recipe (Recipe): The recipe to update.
+
+    Returns:
+    - Recipe: The updated recipe.
+    """
+    return render(RecipeResponse, await update_recipe_async(recipe_id, recipe))
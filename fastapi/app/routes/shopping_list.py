@@ -0,0 +1,47 @@
+"""
+This file contains the routes for the shopping list.
+"""
+
+from models.shopping_list import ShoppingListRequest, ShoppingListResponse
+from helpers.serialization import render
+
+from services.shopping_list import (
+    create_shopping_list_async,
+    get_shopping_list_by_id_async,
+)
+
+
+from fastapi import APIRouter
+
+shopping_list_router = APIRouter()
+
+
+@shopping_list_router.get("/{id}", response_model=ShoppingListResponse)
+async def get_shopping_list(shopping_list_id: int):
+    """
+    This route gets a shopping list by id.
+
+    Args:
+    - shopping_list_id (int): The id of the shopping list.
+
+    Returns:
+    - ShoppingList: The shopping list with its ingredients.
+    """
+    return render(
+        ShoppingListResponse, await get_shopping_list_by_id_async(shopping_list_id)
+    )
+
+
+@shopping_list_router.post("/", response_model=ShoppingListResponse)
+async def post_shopping_list(request: ShoppingListRequest):
+    """
+    This route generates a shopping list with the ingredients of the menus of
+    a user in a date range, minus the inventory of the user.
+
+    Args:
+    - request (ShoppingListRequest): The user and the date range.
+
+    Returns:
+    - ShoppingList: The created shopping list with its ingredients.
+    """
+    return render(ShoppingListResponse, await create_shopping_list_async(request))
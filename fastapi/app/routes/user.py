@@ -2,48 +2,99 @@
 This file contains the routes for the user.
 """
 
-from models.user import User
+from typing import List, Optional, Tuple
+
+from config.settings import BULK
+from models.user import User, UserResponse, UserLogin
+from helpers.etag import conditional_get, tagged
+from helpers.export import Export
+from helpers.pagination import Page
+from helpers.rate_limit import rate_limit_weight
+from helpers.serialization import page_schema, projection_fields, render, render_page
 
 from services.user import (
-    get_all_users,
-    get_user_by_id,
-    create_user,
-    update_user,
+    get_all_users_async,
+    get_user_by_id_async,
+    create_user_async,
+    update_user_async,
+    create_users_bulk_async,
+    export_users,
+    login_user_async,
 )
 
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Body, Depends
 
 user_router = APIRouter()
 
 
-@user_router.get("/")
-def get_users():
+@user_router.get("/", response_model=page_schema(UserResponse))
+async def get_users(
+    page: Page = Depends(),
+    etag: str = Depends(conditional_get("users")),
+    fields: Optional[Tuple[str, ...]] = Depends(projection_fields(UserResponse)),
+):
     """
-    This route gets all the users.
+    This route gets a page of the users.
+
+    Args:
+    - page (Page): The cursor and the limit of the page.
+    - etag (str): The ETag of the users, checked against If-None-Match.
+    - fields (Tuple[str, ...]): The fields to return, or None for all of them.
 
     Returns:
-    - List[User]: A list of users.
+    - dict: A list of users and the cursor of the next page.
+    """
+    return tagged(
+        render_page(
+            UserResponse,
+            await get_all_users_async(page.cursor, page.limit, fields),
+            fields,
+        ),
+        etag,
+    )
+
+
+@user_router.get("/export")
+@rate_limit_weight(10)
+async def get_users_export(export: Export = Depends()):
     """
-    return get_all_users()
+    This route streams all the users as NDJSON or CSV.
 
+    Args:
+    - export (Export): The format of the export and the id to resume from.
 
-@user_router.get("/{id}")
-def get_user(user_id: int):
+    Returns:
+    - StreamingResponse: The streamed users.
+    """
+    return export_users(export.export_format, export.since_id)
+
+
+@user_router.get("/{id}", response_model=UserResponse)
+async def get_user(
+    user_id: int,
+    etag: str = Depends(conditional_get("users", "user_id")),
+    fields: Optional[Tuple[str, ...]] = Depends(projection_fields(UserResponse)),
+):
     """
     This route gets a user by id.
 
     Args:
     - user_id (int): The id of the user.
+    - etag (str): The ETag of the user, checked against If-None-Match.
+    - fields (Tuple[str, ...]): The fields to return, or None for all of them.
 
     Returns:
     - User: The user.
     """
-    return get_user_by_id(user_id)
+    return tagged(
+        render(UserResponse, await get_user_by_id_async(user_id, fields), fields),
+        etag,
+    )
 
 
-@user_router.post("/")
-def post_user(user: User):
+@user_router.post("/", response_model=UserResponse)
+async def post_user(user: User):
     """
     This route creates a user.
 
@@ -53,11 +104,45 @@ def post_user(user: User):
     Returns:
     - User: The created user.
     """
-    return create_user(user)
+    return render(UserResponse, await create_user_async(user))
+
+
+@user_router.post("/bulk")
+@rate_limit_weight(10)
+async def post_users_bulk(users: List[User] = Body(..., max_length=BULK["max_items"])):
+    """
+    This route creates many users.
+
+    The whole payload is validated before anything is inserted, and every
+    user gets its own result.
+
+    Args:
+    - users (List[User]): The users to create.
+
+    Returns:
+    - dict: The number of created and conflicting users and the result of
+      every user.
+    """
+    return await create_users_bulk_async(users)
+
+
+@user_router.post("/login", response_model=UserResponse)
+@rate_limit_weight(5)
+async def post_user_login(login: UserLogin):
+    """
+    This route verifies the credentials of a user.
+
+    Args:
+    - login (UserLogin): The username and password.
+
+    Returns:
+    - dict: The user, without the password.
+    """
+    return render(UserResponse, await login_user_async(login))
 
 
-@user_router.put("/{id}")
-def put_user(user_id: int, user: User):
+@user_router.put("/{id}", response_model=UserResponse)
+async def put_user(user_id: int, user: User):
     """
     This route updates a user.
 
@@ -65,4 +150,4 @@ def put_user(user_id: int, user: User):
     - user_id (int): The id of the user.
     - user (User): The user to update.
     """
-    return update_user(user_id, user)
+    return render(UserResponse, await update_user_async(user_id, user))
@@ -2,48 +2,107 @@
 This file contains the routes for the user role.
 """
 
-from models.user_role import UserRole
+from typing import List, Optional, Tuple
+
+from config.settings import BULK
+from models.user_role import UserRole, UserRoleResponse
+from helpers.api_key_auth import ADMIN_SCOPE, require_scope
+from helpers.etag import conditional_get, tagged
+from helpers.export import Export
+from helpers.pagination import Page
+from helpers.rate_limit import rate_limit_weight
+from helpers.serialization import page_schema, projection_fields, render, render_page
 
 from services.user_role import (
-    get_all_user_roles,
-    get_user_role_by_id,
-    create_user_role,
-    update_user_role,
+    get_all_user_roles_async,
+    get_user_role_by_id_async,
+    create_user_role_async,
+    update_user_role_async,
+    create_user_roles_bulk_async,
+    export_user_roles,
+    get_user_role_permissions_async,
+    grant_permission_async,
+    revoke_permission_async,
 )
 
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Body, Depends
 
 user_role_router = APIRouter()
 
 
-@user_role_router.get("/")
-def get_user_roles():
+@user_role_router.get("/", response_model=page_schema(UserRoleResponse))
+async def get_user_roles(
+    page: Page = Depends(),
+    etag: str = Depends(conditional_get("user_roles")),
+    fields: Optional[Tuple[str, ...]] = Depends(projection_fields(UserRoleResponse)),
+):
     """
-    This route gets all the user roles.
+    This route gets a page of the user roles.
+
+    Args:
+    - page (Page): The cursor and the limit of the page.
+    - etag (str): The ETag of the user roles, checked against
+      If-None-Match.
+    - fields (Tuple[str, ...]): The fields to return, or None for all of them.
 
     Returns:
-    - List[UserRole]: A list of user roles.
+    - dict: A list of user roles and the cursor of the next page.
+    """
+    return tagged(
+        render_page(
+            UserRoleResponse,
+            await get_all_user_roles_async(page.cursor, page.limit, fields),
+            fields,
+        ),
+        etag,
+    )
+
+
+@user_role_router.get("/export")
+@rate_limit_weight(10)
+async def get_user_roles_export(export: Export = Depends()):
     """
-    return get_all_user_roles()
+    This route streams all the user roles as NDJSON or CSV.
 
+    Args:
+    - export (Export): The format of the export and the id to resume from.
 
-@user_role_router.get("/{id}")
-def get_user_role(user_role_id: int):
+    Returns:
+    - StreamingResponse: The streamed user roles.
+    """
+    return export_user_roles(export.export_format, export.since_id)
+
+
+@user_role_router.get("/{id}", response_model=UserRoleResponse)
+async def get_user_role(
+    user_role_id: int,
+    etag: str = Depends(conditional_get("user_roles", "user_role_id")),
+    fields: Optional[Tuple[str, ...]] = Depends(projection_fields(UserRoleResponse)),
+):
     """
     This route gets a user role by id.
 
     Args:
     - user_role_id (int): The id of the user role.
+    - etag (str): The ETag of the user role, checked against If-None-Match.
+    - fields (Tuple[str, ...]): The fields to return, or None for all of them.
 
     Returns:
     - UserRole: The user role.
     """
-    return get_user_role_by_id(user_role_id)
-
-
-@user_role_router.post("/")
-def post_user_role(user_role: UserRole):
+    return tagged(
+        render(
+            UserRoleResponse,
+            await get_user_role_by_id_async(user_role_id, fields),
+            fields,
+        ),
+        etag,
+    )
+
+
+@user_role_router.post("/", response_model=UserRoleResponse)
+async def post_user_role(user_role: UserRole):
     """
     This route creates a user role.
 
@@ -53,11 +112,32 @@ def post_user_role(user_role: UserRole):
     Returns:
     - UserRole: The created user role.
     """
-    return create_user_role(user_role)
+    return render(UserRoleResponse, await create_user_role_async(user_role))
 
 
-@user_role_router.put("/{id}")
-def put_user_role(user_role_id: int, user_role: UserRole):
+@user_role_router.post("/bulk")
+@rate_limit_weight(10)
+async def post_user_roles_bulk(
+    user_roles: List[UserRole] = Body(..., max_length=BULK["max_items"])
+):
+    """
+    This route creates many user roles.
+
+    The whole payload is validated before anything is inserted, and every
+    user role gets its own result.
+
+    Args:
+    - user_roles (List[UserRole]): The user roles to create.
+
+    Returns:
+    - dict: The number of created and conflicting user roles and the result of
+      every user role.
+    """
+    return await create_user_roles_bulk_async(user_roles)
+
+
+@user_role_router.put("/{id}", response_model=UserRoleResponse)
+async def put_user_role(user_role_id: int, user_role: UserRole):
     """
     This route updates a user role.
 
@@ -65,4 +145,59 @@ def put_user_role(user_role_id: int, user_role: UserRole):
     - user_role_id (int): The id of the user role.
     - user_role (UserRole): The user role to update.
     """
-    return update_user_role(user_role_id, user_role)
+    return render(
+        UserRoleResponse, await update_user_role_async(user_role_id, user_role)
+    )
+
+
+@user_role_router.get(
+    "/{user_role_id}/permissions",
+    dependencies=[Depends(require_scope(ADMIN_SCOPE))],
+)
+async def get_user_role_permissions(user_role_id: int):
+    """
+    This route gets the permissions of a user role.
+
+    Args:
+    - user_role_id (int): The id of the user role.
+
+    Returns:
+    - dict: The id of the user role and the ids of its permissions.
+    """
+    return await get_user_role_permissions_async(user_role_id)
+
+
+@user_role_router.put(
+    "/{user_role_id}/permissions/{permission_id}",
+    dependencies=[Depends(require_scope(ADMIN_SCOPE))],
+)
+async def put_user_role_permission(user_role_id: int, permission_id: int):
+    """
+    This route grants a permission to a user role.
+
+    Args:
+    - user_role_id (int): The id of the user role.
+    - permission_id (int): The id of the permission.
+
+    Returns:
+    - dict: The id of the user role and the ids of its permissions.
+    """
+    return await grant_permission_async(user_role_id, permission_id)
+
+
+@user_role_router.delete(
+    "/{user_role_id}/permissions/{permission_id}",
+    dependencies=[Depends(require_scope(ADMIN_SCOPE))],
+)
+async def delete_user_role_permission(user_role_id: int, permission_id: int):
+    """
+    This route revokes a permission from a user role.
+
+    Args:
+    - user_role_id (int): The id of the user role.
+    - permission_id (int): The id of the permission.
+
+    Returns:
+    - dict: The id of the user role and the ids of its permissions.
+    """
+    return await revoke_permission_async(user_role_id, permission_id)
@@ -0,0 +1,268 @@
+"""
+Production launcher of the FastAPI application.
+
+Runs `main:app` on uvicorn worker processes. The number of workers comes
+from `SERVER_WORKERS`, or from the CPUs available to the container. The
+database connection budget, `SERVER_DB_CONNECTIONS` or the MySQL
+`max_connections` minus `SERVER_DB_RESERVED`, is split across the workers,
+with one share kept for the worker that replaces another during a restart,
+so the pools never exceed it. Every worker warms up before it accepts
+traffic.
+
+Every worker keeps its own permission index, entity cache, search index,
+recipe matrix and expiry schedule. The writes bump the version of their
+table in the table_versions table, and every worker reloads the versions
+every `TABLE_VERSIONS_REFRESH_SECONDS`, and with them the state built from
+the tables another worker wrote to. The ETags are built from these shared
+versions, so they are the same in every worker. The API keys are reloaded
+the same way, every `API_KEYS_REFRESH_SECONDS`. The rate limits and the
+read-your-writes stickiness of the replicas stay per worker.
+
+Signals:
+- HUP: rolling restart. Every worker is replaced by a new one, and stopped
+  gracefully once the new one is warm and serving. The old and the new
+  worker overlap like any two workers do.
+- TERM, INT: graceful stop.
+- TTOU: one worker less. TTIN is ignored, since the budget is already split.
+
+Usage:
+    python serve.py
+    SERVER_WORKERS=4 SERVER_DB_CONNECTIONS=140 python serve.py
+"""
+
+import logging
+import math
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import uvicorn
+from peewee import DatabaseError, ImproperlyConfigured
+from uvicorn.supervisors.multiprocess import Multiprocess, Process
+from config.settings import ASYNC_DATABASE, DATABASE, DATABASE_POOL, SERVER
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def available_cpus() -> int:
+    """
+    This function gets the CPUs the process may use: the CPU affinity,
+    capped by the cgroup CPU quota of the container.
+
+    Returns:
+    - int: The number of CPUs.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    try:
+        quota, period = (
+            Path("/sys/fs/cgroup/cpu.max").read_text(encoding="utf-8").split()
+        )
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def database_budget() -> int:
+    """
+    This function gets the number of connections the workers may open.
+
+    Returns:
+    - int: `SERVER_DB_CONNECTIONS` if it is set, else the MySQL
+      `max_connections` minus `SERVER_DB_RESERVED`, or 0 for SQLite, which
+      has no connection limit. If MySQL can not be queried, the pool sizes
+      of one process.
+    """
+    if SERVER["db_connections"]:
+        return SERVER["db_connections"]
+    if DATABASE["engine"].endswith("SqliteDatabase"):
+        return 0
+    # pylint: disable=import-outside-toplevel
+    from config.database import close_database, database
+
+    try:
+        with database.connection_context():
+            (max_connections,) = database.execute_sql(
+                "SELECT @@max_connections"
+            ).fetchone()
+        return max(int(max_connections) - SERVER["db_reserved"], 1)
+    except (DatabaseError, ImproperlyConfigured) as exc:
+        fallback = DATABASE_POOL["max_connections"]
+        if ASYNC_DATABASE["driver"] != "threadpool":
+            fallback += ASYNC_DATABASE["max_size"]
+        logger.warning(
+            "Could not read max_connections (%s), budget of %d connections",
+            exc,
+            fallback,
+        )
+        return fallback
+    finally:
+        close_database()
+
+
+def size_workers(workers: int, budget: int, async_pool: bool):
+    """
+    This function splits the connection budget across the workers.
+
+    Every worker gets the same share, and one more share is kept for the
+    new worker of a rolling restart. Workers that would get no connection
+    are dropped. The shares never go over the configured pool sizes.
+
+    Args:
+    - workers (int): The requested number of workers.
+    - budget (int): The connection budget, or 0 for no limit.
+    - async_pool (bool): Whether the workers have an asynchronous driver
+      pool besides the peewee pool.
+
+    Returns:
+    - Tuple[int, int, int]: The number of workers, and the size of the
+      peewee and asynchronous pools of every worker.
+    """
+    sync_size = DATABASE_POOL["max_connections"]
+    async_size = ASYNC_DATABASE["max_size"] if async_pool else 0
+    if not budget:
+        return workers, sync_size, async_size
+    minimum = 2 if async_pool else 1
+    workers = min(workers, budget // minimum - 1)
+    if workers < 1:
+        raise SystemExit(
+            f"A budget of {budget} connections is too small for one worker "
+            "and the spare share of a restart"
+        )
+    share = budget // (workers + 1)
+    if async_pool:
+        async_size = min(async_size, share // 2)
+    return workers, min(sync_size, share - async_size), async_size
+
+
+def worker_environment(workers: int, sync_size: int, async_size: int, cpus: int):
+    """
+    This function builds the settings of the workers.
+
+    Args:
+    - workers (int): The number of workers.
+    - sync_size (int): The size of the peewee pool of every worker.
+    - async_size (int): The size of the asynchronous pool of every worker.
+    - cpus (int): The available CPUs.
+
+    Returns:
+    - dict: The environment variables of the workers.
+    """
+    environment = {
+        "SERVER_WARMUP": os.getenv("SERVER_WARMUP", "true"),
+        "MYSQL_POOL_MAX_CONNECTIONS": str(sync_size),
+        "PASSWORD_HASHING_WORKERS": os.getenv(
+            "PASSWORD_HASHING_WORKERS", str(max(1, cpus // workers))
+        ),
+    }
+    if async_size:
+        environment["ASYNC_DATABASE_POOL_MAX_SIZE"] = str(async_size)
+        environment["ASYNC_DATABASE_POOL_MIN_SIZE"] = str(
+            min(ASYNC_DATABASE["min_size"], async_size)
+        )
+    return environment
+
+
+class ReadyServer(uvicorn.Server):
+    """
+    This class is a uvicorn server that tells the launcher when it is warm
+    and serving, by creating a file named after its pid.
+    """
+
+    async def startup(self, sockets=None):
+        await super().startup(sockets=sockets)
+        ready_dir = os.getenv("SERVER_READY_DIR")
+        if ready_dir and not self.should_exit:
+            Path(ready_dir, str(os.getpid())).touch()
+
+
+class Supervisor(Multiprocess):
+    """
+    This class manages the worker processes. Restarts are rolling: the old
+    worker is stopped only when its replacement is ready, so the capacity
+    never drops.
+    """
+
+    def __init__(self, config, target, sockets, ready_dir: str):
+        super().__init__(config, target, sockets)
+        self.ready_dir = ready_dir
+
+    def start_ready(self):
+        """
+        This method starts a worker and waits until it is warm and serving,
+        or until `SERVER_READY_TIMEOUT`.
+
+        Returns:
+        - Process: The worker.
+        """
+        process = Process(self.config, self.target, self.sockets)
+        process.start()
+        marker = Path(self.ready_dir, str(process.pid))
+        deadline = time.monotonic() + SERVER["ready_timeout"]
+        while not marker.exists():
+            if not process.process.is_alive() or time.monotonic() > deadline:
+                logger.warning("Worker [%s] did not get ready", process.pid)
+                return process
+            time.sleep(0.1)
+        marker.unlink()
+        return process
+
+    def restart_all(self):
+        for index, process in enumerate(self.processes):
+            self.processes[index] = self.start_ready()
+            process.terminate()
+            process.join()
+
+    def handle_ttin(self):
+        logger.warning(
+            "Received SIGTTIN, ignored: the database budget is split across "
+            "%d workers.",
+            self.processes_num,
+        )
+
+
+def main():
+    """
+    Runs the workers until the launcher is stopped.
+    """
+    cpus = available_cpus()
+    workers, sync_size, async_size = size_workers(
+        SERVER["workers"] or cpus,
+        database_budget(),
+        ASYNC_DATABASE["driver"] != "threadpool",
+    )
+    ready_dir = tempfile.mkdtemp(prefix="recipes-ready-")
+    os.environ.update(
+        worker_environment(workers, sync_size, async_size, cpus),
+        SERVER_READY_DIR=ready_dir,
+    )
+    config = uvicorn.Config(
+        "main:app",
+        host=SERVER["host"],
+        port=SERVER["port"],
+        workers=workers,
+        timeout_graceful_shutdown=SERVER["graceful_timeout"],
+    )
+    logger.info(
+        "Starting %d workers on %d CPUs, with %d + %d connections each",
+        workers,
+        cpus,
+        sync_size,
+        async_size,
+    )
+    sock = config.bind_socket()
+    try:
+        Supervisor(config, ReadyServer(config).run, [sock], ready_dir).run()
+    finally:
+        sock.close()
+        shutil.rmtree(ready_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+This file contains the functions for the API key service.
+"""
+
+from peewee import IntegrityError
+from config.async_database import async_database
+from config.database import ApiKeyModel
+from models.api_key import ApiKey
+from helpers.api_key_auth import api_key_store, generate_api_key, hash_api_key
+from fastapi import HTTPException
+
+
+def public_api_key(row: dict):
+    """
+    This function removes the digest from an API key row.
+
+    Args:
+    - row (dict): The API key row.
+
+    Returns:
+    - dict: The id, name, scopes, user and status of the API key.
+    """
+    return {
+        "id": row["id"],
+        "name": row["name"],
+        "scopes": [scope for scope in row["scopes"].split(",") if scope],
+        "user_id": row["user_id"],
+        "is_active": row["is_active"],
+    }
+
+
+async def get_all_api_keys_async():
+    """
+    This function gets all the API keys, without their digests.
+
+    Returns:
+    - List[dict]: A list of API keys.
+    """
+    rows = await async_database.fetch_all(ApiKeyModel.select().order_by(ApiKeyModel.id))
+    return [public_api_key(row) for row in rows]
+
+
+async def get_api_key_by_id_async(api_key_id: int):
+    """
+    This function gets an API key row by id.
+
+    Args:
+    - api_key_id (int): The id of the API key.
+
+    Returns:
+    - dict: The API key row.
+    """
+    row = await async_database.fetch_one(
+        ApiKeyModel.select().where(ApiKeyModel.id == api_key_id)
+    )
+    if row is None:
+        raise HTTPException(status_code=404, detail="API key not found")
+    return row
+
+
+async def create_api_key_async(api_key: ApiKey):
+    """
+    This function creates an API key.
+
+    Args:
+    - api_key (ApiKey): The name, scopes and user of the API key.
+
+    Returns:
+    - dict: The created API key. The key itself is only returned here.
+    """
+    key = generate_api_key()
+    row = {
+        "name": api_key.name,
+        "key_hash": hash_api_key(key),
+        "scopes": ",".join(api_key.scopes),
+        "user_id": api_key.user_id,
+        "is_active": True,
+    }
+    try:
+        row["id"] = await async_database.execute(ApiKeyModel.insert(**row))
+    except IntegrityError as exc:
+        raise HTTPException(status_code=400, detail="API key already exists") from exc
+    api_key_store.add(row)
+    return {**public_api_key(row), "key": key}
+
+
+async def rotate_api_key_async(api_key_id: int):
+    """
+    This function replaces an API key with a new one. The previous key stops
+    working immediately. A revoked key can not be rotated back to life.
+
+    Args:
+    - api_key_id (int): The id of the API key.
+
+    Returns:
+    - dict: The rotated API key. The key itself is only returned here.
+    """
+    row = await get_api_key_by_id_async(api_key_id)
+    key = generate_api_key()
+    rotated = {**row, "key_hash": hash_api_key(key)}
+    updated = await async_database.execute(
+        ApiKeyModel.update(key_hash=rotated["key_hash"]).where(
+            ApiKeyModel.id == api_key_id, ApiKeyModel.is_active
+        )
+    )
+    if not updated:
+        raise HTTPException(status_code=409, detail="API key is revoked")
+    api_key_store.remove(row["key_hash"])
+    api_key_store.add(rotated)
+    return {**public_api_key(rotated), "key": key}
+
+
+async def revoke_api_key_async(api_key_id: int):
+    """
+    This function revokes an API key.
+
+    Args:
+    - api_key_id (int): The id of the API key.
+
+    Returns:
+    - dict: The revoked API key.
+    """
+    row = await get_api_key_by_id_async(api_key_id)
+    await async_database.execute(
+        ApiKeyModel.update(is_active=False).where(ApiKeyModel.id == api_key_id)
+    )
+    api_key_store.remove(row["key_hash"])
+    return public_api_key({**row, "is_active": False})
@@ -0,0 +1,153 @@
+"""
+This file contains the functions for the ingredient service.
+"""
+
+from typing import Optional, Tuple
+
+from peewee import IntegrityError
+from config.async_database import async_database
+from config.replicas import replica_read, replica_served
+from config.database import write_transaction, IngredientModel
+from models.ingredient import Ingredient
+from helpers.cache import entity_cache, entity_key
+from helpers.etag import table_versions
+from helpers.expiry import expiry_scheduler
+from helpers.nutrition import calorie_rollups
+from helpers.pagination import page_query, page_response
+from helpers.serialization import select_columns
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+
+@replica_read
+async def get_all_ingredients_async(
+    cursor: Optional[int] = None,
+    limit: Optional[int] = None,
+    fields: Optional[Tuple[str, ...]] = None,
+):
+    """
+    This function gets a page of the ingredients without blocking the event
+    loop.
+
+    Args:
+    - cursor (int): The id of the last ingredient of the previous page.
+    - limit (int): The maximum number of ingredients of the page.
+    - fields (Tuple[str, ...]): The columns to select, or None for all of them.
+
+    Returns:
+    - dict: A list of ingredients and the cursor of the next page.
+    """
+    query, limit = page_query(
+        IngredientModel.select(*select_columns(IngredientModel, fields)),
+        IngredientModel.id,
+        cursor,
+        limit,
+    )
+    return page_response(await async_database.fetch_all(query), "id", limit)
+
+
+@replica_read
+async def get_ingredient_by_id_async(
+    ingredient_id: int, fields: Optional[Tuple[str, ...]] = None
+):
+    """
+    This function gets an ingredient by id without blocking the event loop.
+
+    Args:
+    - ingredient_id (int): The id of the ingredient.
+    - fields (Tuple[str, ...]): The columns to select, or None for all of them.
+      Projected rows are not cached.
+
+    Returns:
+    - dict: The ingredient.
+    """
+    key = entity_key("ingredients", ingredient_id)
+    ingredient = entity_cache.get(key)
+    if ingredient is not None:
+        return ingredient
+    token = entity_cache.token()
+    ingredient = await async_database.fetch_one(
+        IngredientModel.select(*select_columns(IngredientModel, fields)).where(
+            IngredientModel.id == ingredient_id
+        )
+    )
+    if ingredient is None:
+        raise HTTPException(status_code=404, detail="Ingredient not found")
+    if fields is None and not replica_served():
+        entity_cache.set(key, ingredient, token)
+    return ingredient
+
+
+async def create_ingredient_async(ingredient: Ingredient):
+    """
+    This function creates an ingredient without blocking the event loop.
+
+    Args:
+    - ingredient (Ingredient): The ingredient to create.
+
+    Returns:
+    - dict: The created ingredient.
+    """
+    data = ingredient.dict()
+    try:
+        ingredient_id = await async_database.execute(IngredientModel.insert(**data))
+    except IntegrityError as exc:
+        raise HTTPException(
+            status_code=400, detail="Ingredient already exists"
+        ) from exc
+    entity_cache.delete(entity_key("ingredients", ingredient_id))
+    await table_versions.bump_async("ingredients")
+    return {"id": ingredient_id, **data}
+
+
+def update_ingredient(ingredient_id: int, ingredient: Ingredient):
+    """
+    This function updates an ingredient in one transaction, which also
+    refreshes the calories of the recipes, menus and days that use it.
+
+    Args:
+    - ingredient_id (int): The id of the ingredient.
+    - ingredient (Ingredient): The ingredient to update.
+
+    Returns:
+    - dict: The updated ingredient.
+    """
+    # pylint: disable=no-value-for-parameter
+    data = ingredient.dict()
+    try:
+        with write_transaction():
+            found = (
+                IngredientModel.select(IngredientModel.id)
+                .where(IngredientModel.id == ingredient_id)
+                .exists()
+            )
+            if not found:
+                raise HTTPException(status_code=404, detail="Ingredient not found")
+            IngredientModel.update(**data).where(
+                IngredientModel.id == ingredient_id
+            ).execute()
+            calorie_rollups.set_ingredient(ingredient_id)
+            table_versions.bump("ingredients")
+    except IntegrityError as exc:
+        raise HTTPException(
+            status_code=400, detail="Ingredient already exists"
+        ) from exc
+    return {"id": ingredient_id, **data}
+
+
+async def update_ingredient_async(ingredient_id: int, ingredient: Ingredient):
+    """
+    This function updates an ingredient in the threadpool. A change of the
+    expiration date moves its expiry alerts.
+
+    Args:
+    - ingredient_id (int): The id of the ingredient.
+    - ingredient (Ingredient): The ingredient to update.
+
+    Returns:
+    - dict: The updated ingredient.
+    """
+    row = await run_in_threadpool(update_ingredient, ingredient_id, ingredient)
+    entity_cache.delete(entity_key("ingredients", ingredient_id))
+    expiry_scheduler.set_ingredient(ingredient_id, row["expiration_date"])
+    return row
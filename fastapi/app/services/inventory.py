@@ -0,0 +1,108 @@
+"""
+This file contains the functions for the inventory service.
+"""
+
+from config.async_database import async_database
+from config.database import IngredientModel, InventoryIngredientModel
+from models.inventory import InventoryIngredient
+from helpers.expiry import expiry_scheduler
+from helpers.etag import table_versions
+from fastapi import HTTPException
+
+
+async def get_inventory_async(user_id: int):
+    """
+    This function gets the inventory of a user without blocking the event
+    loop.
+
+    Args:
+    - user_id (int): The id of the user.
+
+    Returns:
+    - List[dict]: The ingredients of the inventory.
+    """
+    return await async_database.fetch_all(
+        InventoryIngredientModel.select()
+        .where(InventoryIngredientModel.user_id == user_id)
+        .order_by(InventoryIngredientModel.ingredient_id)
+    )
+
+
+async def set_inventory_ingredient_async(ingredient: InventoryIngredient):
+    """
+    This function adds an ingredient to the inventory of a user, or replaces
+    its quantity, and schedules its expiry alert.
+
+    Args:
+    - ingredient (InventoryIngredient): The ingredient of the inventory.
+
+    Returns:
+    - dict: The ingredient of the inventory.
+    """
+    expiration_date = await async_database.fetch_one(
+        IngredientModel.select(IngredientModel.expiration_date).where(
+            IngredientModel.id == ingredient.ingredient_id
+        )
+    )
+    if expiration_date is None:
+        raise HTTPException(status_code=404, detail="Ingredient not found")
+    data = ingredient.dict()
+    await async_database.execute(
+        InventoryIngredientModel.insert(**data).on_conflict_replace()
+    )
+    await table_versions.bump_async("inventory")
+    expiry_scheduler.set(
+        ingredient.user_id,
+        ingredient.ingredient_id,
+        expiration_date["expiration_date"],
+    )
+    return data
+
+
+async def delete_inventory_ingredient_async(user_id: int, ingredient_id: int):
+    """
+    This function removes an ingredient from the inventory of a user and
+    unschedules its expiry alert.
+
+    Args:
+    - user_id (int): The id of the user.
+    - ingredient_id (int): The id of the ingredient.
+
+    Returns:
+    - dict: The removed ingredient of the inventory.
+    """
+    inventory_ingredient = await async_database.fetch_one(
+        InventoryIngredientModel.select().where(
+            (InventoryIngredientModel.user_id == user_id)
+            & (InventoryIngredientModel.ingredient_id == ingredient_id)
+        )
+    )
+    if inventory_ingredient is None:
+        raise HTTPException(
+            status_code=404, detail="Ingredient not found in the inventory"
+        )
+    await async_database.execute(
+        InventoryIngredientModel.delete().where(
+            (InventoryIngredientModel.user_id == user_id)
+            & (InventoryIngredientModel.ingredient_id == ingredient_id)
+        )
+    )
+    await table_versions.bump_async("inventory")
+    expiry_scheduler.remove(user_id, ingredient_id)
+    return inventory_ingredient
+
+
+def get_expiring_ingredients(user_id: int, days: int):
+    """
+    This function gets the ingredients of the inventory of a user that expire
+    in the next days, from the expiry schedule.
+
+    Args:
+    - user_id (int): The id of the user.
+    - days (int): The number of days.
+
+    Returns:
+    - List[dict]: The id and the expiration date of the ingredients, soonest
+      first.
+    """
+    return expiry_scheduler.upcoming(user_id, days)
@@ -0,0 +1,248 @@
+"""
+This file contains the functions for the menu service.
+"""
+
+from datetime import date
+from typing import Optional, Tuple
+
+from peewee import IntegrityError
+from config.async_database import async_database
+from config.replicas import replica_read, replica_served
+from config.database import (
+    write_transaction,
+    MenuModel,
+    MenuRecipeModel,
+    RecipeModel,
+)
+from models.menu import Menu
+from helpers.cache import entity_cache, entity_key
+from helpers.etag import table_versions
+from helpers.nutrition import calorie_rollups
+from helpers.pagination import page_query, page_response
+from helpers.serialization import select_columns
+from services.recipe import (
+    group_ingredients,
+    ingredient_calories,
+    ingredient_details_query,
+)
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+
+@replica_read
+async def get_all_menus_async(
+    cursor: Optional[int] = None,
+    limit: Optional[int] = None,
+    fields: Optional[Tuple[str, ...]] = None,
+):
+    """
+    This function gets a page of the menus without blocking the event loop.
+
+    Args:
+    - cursor (int): The id of the last menu of the previous page.
+    - limit (int): The maximum number of menus of the page.
+    - fields (Tuple[str, ...]): The columns to select, or None for all of them.
+
+    Returns:
+    - dict: A list of menus and the cursor of the next page.
+    """
+    query, limit = page_query(
+        MenuModel.select(*select_columns(MenuModel, fields)),
+        MenuModel.id,
+        cursor,
+        limit,
+    )
+    return page_response(await async_database.fetch_all(query), "id", limit)
+
+
+@replica_read
+async def get_menu_by_id_async(menu_id: int, fields: Optional[Tuple[str, ...]] = None):
+    """
+    This function gets a menu by id without blocking the event loop.
+
+    Args:
+    - menu_id (int): The id of the menu.
+    - fields (Tuple[str, ...]): The columns to select, or None for all of them.
+      Projected rows are not cached.
+
+    Returns:
+    - dict: The menu.
+    """
+    key = entity_key("menus", menu_id)
+    menu = entity_cache.get(key)
+    if menu is not None:
+        return menu
+    token = entity_cache.token()
+    menu = await async_database.fetch_one(
+        MenuModel.select(*select_columns(MenuModel, fields)).where(
+            MenuModel.id == menu_id
+        )
+    )
+    if menu is None:
+        raise HTTPException(status_code=404, detail="Menu not found")
+    if fields is None and not replica_served():
+        entity_cache.set(key, menu, token)
+    return menu
+
+
+async def get_menu_detail_async(menu_id: int):
+    """
+    This function gets a menu with its recipes and their ingredients with at
+    most three queries, whatever their number.
+
+    Args:
+    - menu_id (int): The id of the menu.
+
+    Returns:
+    - dict: The menu with its recipes and their ingredients.
+    """
+    menu = await async_database.fetch_one(
+        MenuModel.select().where(MenuModel.id == menu_id)
+    )
+    if menu is None:
+        raise HTTPException(status_code=404, detail="Menu not found")
+    recipes = await async_database.fetch_all(
+        RecipeModel.select(
+            RecipeModel.id,
+            RecipeModel.name,
+            RecipeModel.preparation_time,
+            RecipeModel.difficulty,
+        )
+        .join(MenuRecipeModel)
+        .where(MenuRecipeModel.menu_id == menu_id)
+        .order_by(RecipeModel.id)
+    )
+    ingredients = {}
+    if recipes:
+        ingredients = group_ingredients(
+            await async_database.fetch_all(
+                ingredient_details_query(*(recipe["id"] for recipe in recipes))
+            )
+        )
+    for recipe in recipes:
+        recipe["ingredients"] = ingredients.get(recipe["id"], [])
+        recipe["calories"] = ingredient_calories(recipe["ingredients"])
+    menu["recipes"] = recipes
+    menu["calories"] = sum(recipe["calories"] for recipe in recipes)
+    return menu
+
+
+def write_menu_recipes(menu_id: int, recipe_ids):
+    """
+    This function replaces the recipes of a menu with one multi-row INSERT.
+
+    Args:
+    - menu_id (int): The id of the menu.
+    - recipe_ids (List[int]): The ids of the recipes.
+    """
+    # pylint: disable=no-value-for-parameter
+    MenuRecipeModel.delete().where(MenuRecipeModel.menu_id == menu_id).execute()
+    if recipe_ids:
+        MenuRecipeModel.insert_many(
+            [{"menu_id": menu_id, "recipe_id": recipe_id} for recipe_id in recipe_ids]
+        ).execute()
+
+
+def index_menu(row: dict):
+    """
+    This function updates the cache after a write.
+
+    Args:
+    - row (dict): The menu row.
+
+    Returns:
+    - dict: The menu row.
+    """
+    entity_cache.delete(entity_key("menus", row["id"]))
+    return row
+
+
+def create_menu(menu: Menu):
+    """
+    This function creates a menu with its recipes and calories in one
+    transaction.
+
+    Args:
+    - menu (Menu): The menu to create.
+
+    Returns:
+    - dict: The created menu.
+    """
+    # pylint: disable=no-value-for-parameter
+    data = {**menu.dict(exclude={"recipe_ids"}), "created_at": date.today()}
+    recipe_ids = sorted(set(menu.recipe_ids))
+    try:
+        with write_transaction():
+            menu_id = MenuModel.insert(**data).execute()
+            write_menu_recipes(menu_id, recipe_ids)
+            calorie_rollups.set_menus([menu_id])
+            table_versions.bump("menus")
+    except IntegrityError as exc:
+        raise HTTPException(status_code=400, detail="Menu already exists") from exc
+    return index_menu({"id": menu_id, **data})
+
+
+def update_menu(menu_id: int, menu: Menu):
+    """
+    This function updates a menu and replaces its recipes in one transaction,
+    which also refreshes the calories of the menu and of the user days it
+    leaves and joins.
+
+    Args:
+    - menu_id (int): The id of the menu.
+    - menu (Menu): The menu to update.
+
+    Returns:
+    - dict: The updated menu.
+    """
+    # pylint: disable=no-value-for-parameter
+    data = menu.dict(exclude={"recipe_ids"})
+    recipe_ids = sorted(set(menu.recipe_ids))
+    try:
+        with write_transaction():
+            previous = (
+                MenuModel.select(
+                    MenuModel.created_at, MenuModel.user_id, MenuModel.menu_date
+                )
+                .where(MenuModel.id == menu_id)
+                .dicts()
+                .first()
+            )
+            if previous is None:
+                raise HTTPException(status_code=404, detail="Menu not found")
+            MenuModel.update(**data).where(MenuModel.id == menu_id).execute()
+            write_menu_recipes(menu_id, recipe_ids)
+            calorie_rollups.set_menus(
+                [menu_id], days=[(previous["user_id"], previous["menu_date"])]
+            )
+            table_versions.bump("menus")
+    except IntegrityError as exc:
+        raise HTTPException(status_code=400, detail="Menu already exists") from exc
+    return index_menu({"id": menu_id, **data, "created_at": previous["created_at"]})
+
+
+async def create_menu_async(menu: Menu):
+    """
+    This function creates a menu in the threadpool.
+
+    Args:
+    - menu (Menu): The menu to create.
+
+    Returns:
+    - dict: The created menu.
+    """
+    return await run_in_threadpool(create_menu, menu)
+
+
+async def update_menu_async(menu_id: int, menu: Menu):
+    """
+    This function updates a menu in the threadpool.
+
+    Args:
+    - menu_id (int): The id of the menu.
+    - menu (Menu): The menu to update.
+
+    Returns:
+    - dict: The updated menu.
+    """
+    return await run_in_threadpool(update_menu, menu_id, menu)
@@ -0,0 +1,103 @@
+"""
+This file contains the functions for the nutrition service.
+"""
+
+from datetime import date, timedelta
+
+from config.async_database import async_database
+from config.database import (
+    MenuCaloriesModel,
+    RecipeCaloriesModel,
+    UserDayCaloriesModel,
+)
+from config.replicas import replica_read
+from config.settings import NUTRITION
+from fastapi import HTTPException
+
+
+@replica_read
+async def get_recipe_calories(recipe_id: int):
+    """
+    This function gets the calories of a recipe from the rollups.
+
+    Args:
+    - recipe_id (int): The id of the recipe.
+
+    Returns:
+    - dict: The id and the calories of the recipe.
+    """
+    row = await async_database.fetch_one(
+        RecipeCaloriesModel.select(RecipeCaloriesModel.calories).where(
+            RecipeCaloriesModel.recipe_id == recipe_id
+        )
+    )
+    if row is None:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    return {"recipe_id": recipe_id, "calories": row["calories"]}
+
+
+@replica_read
+async def get_menu_calories(menu_id: int):
+    """
+    This function gets the calories of a menu from the rollups.
+
+    Args:
+    - menu_id (int): The id of the menu.
+
+    Returns:
+    - dict: The id and the calories of the menu.
+    """
+    row = await async_database.fetch_one(
+        MenuCaloriesModel.select(MenuCaloriesModel.calories).where(
+            MenuCaloriesModel.menu_id == menu_id
+        )
+    )
+    if row is None:
+        raise HTTPException(status_code=404, detail="Menu not found")
+    return {"menu_id": menu_id, "calories": row["calories"]}
+
+
+@replica_read
+async def get_user_calories(user_id: int, start_date: date, end_date: date):
+    """
+    This function gets the calories of the active menus of a user on every
+    day of a date range from the rollups.
+
+    Args:
+    - user_id (int): The id of the user.
+    - start_date (date): The first day.
+    - end_date (date): The last day.
+
+    Returns:
+    - dict: The calories of every day and of the whole range.
+    """
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=400, detail="The end date is before the start date"
+        )
+    count = (end_date - start_date).days + 1
+    if count > NUTRITION["max_days"]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"The date range is longer than {NUTRITION['max_days']} days",
+        )
+    calories = {
+        row["day"]: row["calories"]
+        for row in await async_database.fetch_all(
+            UserDayCaloriesModel.select(
+                UserDayCaloriesModel.day, UserDayCaloriesModel.calories
+            ).where(
+                UserDayCaloriesModel.user_id == user_id,
+                UserDayCaloriesModel.day.between(start_date, end_date),
+            )
+        )
+    }
+    days = [
+        {"day": day, "calories": calories.get(day, 0)}
+        for day in (start_date + timedelta(days=offset) for offset in range(count))
+    ]
+    return {
+        "user_id": user_id,
+        "days": days,
+        "total": sum(day["calories"] for day in days),
+    }
@@ -2,72 +2,188 @@
 This file contains the functions for the permission service.
 """
 
+from typing import List, Optional, Tuple
+
+from peewee import IntegrityError
+from config.async_database import async_database
+from config.replicas import replica_read, replica_served
 from config.database import PermissionModel
 from models.permission import Permission
-from fastapi import Body, HTTPException
-
-
-def get_all_permissions():
+from helpers.authorization import permission_index
+from helpers.bulk import bulk_insert, bulk_summary
+from helpers.export import export_response
+from helpers.cache import entity_cache, entity_key
+from helpers.etag import table_versions
+from helpers.pagination import page_query, page_response
+from helpers.serialization import select_columns
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+
+@replica_read
+async def get_all_permissions_async(
+    cursor: Optional[int] = None,
+    limit: Optional[int] = None,
+    fields: Optional[Tuple[str, ...]] = None,
+):
     """
-    This function gets all the permissions.
+    This function gets a page of the permissions without blocking the event loop.
+
+    Args:
+    - cursor (int): The id of the last permission of the previous page.
+    - limit (int): The maximum number of permissions of the page.
+    - fields (Tuple[str, ...]): The columns to select, or None for all of them.
 
     Returns:
-    - List[Permission]: A list of permissions.
+    - dict: A list of permissions and the cursor of the next page.
     """
-    return list(PermissionModel.select().dicts())
-
-
-def get_permission_by_id(permission_id: int):
+    query, limit = page_query(
+        PermissionModel.select(*select_columns(PermissionModel, fields)),
+        PermissionModel.id,
+        cursor,
+        limit,
+    )
+    return page_response(await async_database.fetch_all(query), "id", limit)
+
+
+@replica_read
+async def get_permission_by_id_async(
+    permission_id: int, fields: Optional[Tuple[str, ...]] = None
+):
     """
-    This function gets a permission by id.
+    This function gets a permission by id without blocking the event loop.
 
     Args:
     - permission_id (int): The id of the permission.
+    - fields (Tuple[str, ...]): The columns to select, or None for all of them.
+      Projected rows are not cached.
 
     Returns:
-    - Permission: The permission.
+    - dict: The permission.
     """
-    try:
-        return PermissionModel.get_by_id(permission_id)
-    except PermissionModel.DoesNotExist as exc:
-        raise HTTPException(status_code=404, detail="Permission not found") from exc
-
-
-def create_permission(permission: Permission = Body(...)):
+    key = entity_key("permissions", permission_id)
+    permission = entity_cache.get(key)
+    if permission is not None:
+        return permission
+    token = entity_cache.token()
+    permission = await async_database.fetch_one(
+        PermissionModel.select(*select_columns(PermissionModel, fields)).where(
+            PermissionModel.id == permission_id
+        )
+    )
+    if permission is None:
+        raise HTTPException(status_code=404, detail="Permission not found")
+    if fields is None and not replica_served():
+        entity_cache.set(key, permission, token)
+    return permission
+
+
+async def create_permission_async(permission: Permission):
     """
-    This function creates a permission.
+    This function creates a permission without blocking the event loop.
 
     Args:
     - permission (Permission): The permission to create.
 
     Returns:
-    - Permission: The created permission.
+    - dict: The created permission.
     """
-
+    data = permission.dict()
     try:
-        return PermissionModel.create(**permission.dict())
-    except Exception as exc:
+        permission_id = await async_database.execute(PermissionModel.insert(**data))
+    except IntegrityError as exc:
         raise HTTPException(
             status_code=400, detail="Permission already exists"
         ) from exc
+    entity_cache.delete(entity_key("permissions", permission_id))
+    await table_versions.bump_async("permissions")
+    permission_index.set_permission(permission_id, data["name"])
+    return {"id": permission_id, **data}
 
 
-def update_permission(permission_id: int, permission: Permission = Body(...)):
+async def update_permission_async(permission_id: int, permission: Permission):
     """
-    This function updates a permission.
+    This function updates a permission without blocking the event loop.
 
     Args:
     - permission_id (int): The id of the permission.
     - permission (Permission): The permission to update.
 
     Returns:
-    - Permission: The updated permission.
+    - dict: The updated permission.
     """
+    await get_permission_by_id_async(permission_id)
+    data = permission.dict()
     try:
-        permission_model = PermissionModel.get_by_id(permission_id)
-        for key, value in permission.dict().items():
-            setattr(permission_model, key, value)
-        permission_model.save()
-        return permission_model
-    except PermissionModel.DoesNotExist as exc:
-        raise HTTPException(status_code=404, detail="Permission not found") from exc
+        await async_database.execute(
+            PermissionModel.update(**data).where(PermissionModel.id == permission_id)
+        )
+    except IntegrityError as exc:
+        raise HTTPException(
+            status_code=400, detail="Permission already exists"
+        ) from exc
+    entity_cache.delete(entity_key("permissions", permission_id))
+    await table_versions.bump_async("permissions")
+    permission_index.set_permission(permission_id, data["name"])
+    return {"id": permission_id, **data}
+
+
+def create_permissions_bulk(permissions: List[Permission]):
+    """
+    This function creates many permissions with batched multi-row INSERTs.
+
+    Args:
+    - permissions (List[Permission]): The permissions to create.
+
+    Returns:
+    - dict: The number of created and conflicting permissions and the result of
+      every permission.
+    """
+    results = bulk_insert(
+        PermissionModel,
+        [permission.dict() for permission in permissions],
+        [PermissionModel.name],
+    )
+    for result in results:
+        if result["status"] == "created":
+            entity_cache.delete(entity_key("permissions", result["id"]))
+            permission_index.set_permission(
+                result["id"], permissions[result["index"]].name
+            )
+    table_versions.bump("permissions")
+    return bulk_summary(results)
+
+
+async def create_permissions_bulk_async(permissions: List[Permission]):
+    """
+    This function creates many permissions in the threadpool.
+
+    Args:
+    - permissions (List[Permission]): The permissions to create.
+
+    Returns:
+    - dict: The number of created and conflicting permissions and the result of
+      every permission.
+    """
+    return await run_in_threadpool(create_permissions_bulk, permissions)
+
+
+def export_permissions(export_format: str = "ndjson", since_id: Optional[int] = None):
+    """
+    This function streams the permissions as NDJSON or CSV.
+
+    Args:
+    - export_format (str): The format of the export, "ndjson" or "csv".
+    - since_id (int): The id of the last exported permission, to resume an
+      export.
+
+    Returns:
+    - StreamingResponse: The streamed permissions.
+    """
+    return export_response(
+        PermissionModel.select(),
+        PermissionModel.id,
+        export_format,
+        since_id,
+        "permissions",
+    )
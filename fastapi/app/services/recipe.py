@@ -0,0 +1,443 @@
+"""
+This file contains the functions for the recipe service.
+"""
+
+from typing import List, Optional, Tuple
+
+from peewee import IntegrityError
+from config.async_database import async_database
+from config.replicas import replica_read, replica_served
+from config.database import (
+    write_transaction,
+    CategoryModel,
+    IngredientModel,
+    InventoryIngredientModel,
+    RecipeCategoryModel,
+    RecipeIngredientModel,
+    RecipeModel,
+    UnitModel,
+    UserModel,
+)
+from models.recipe import Recipe
+from helpers.cache import entity_cache, entity_key
+from helpers.etag import table_versions
+from helpers.matcher import recipe_matrix
+from helpers.nutrition import calorie_rollups
+from helpers.pagination import page_query, page_response
+from helpers.search import search_index
+from helpers.serialization import select_columns
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+
+@replica_read
+async def get_all_recipes_async(
+    cursor: Optional[int] = None,
+    limit: Optional[int] = None,
+    fields: Optional[Tuple[str, ...]] = None,
+):
+    """
+    This function gets a page of the recipes without blocking the event loop.
+
+    Args:
+    - cursor (int): The id of the last recipe of the previous page.
+    - limit (int): The maximum number of recipes of the page.
+    - fields (Tuple[str, ...]): The columns to select, or None for all of them.
+
+    Returns:
+    - dict: A list of recipes and the cursor of the next page.
+    """
+    query, limit = page_query(
+        RecipeModel.select(*select_columns(RecipeModel, fields)),
+        RecipeModel.id,
+        cursor,
+        limit,
+    )
+    return page_response(await async_database.fetch_all(query), "id", limit)
+
+
+@replica_read
+async def get_recipe_by_id_async(
+    recipe_id: int, fields: Optional[Tuple[str, ...]] = None
+):
+    """
+    This function gets a recipe by id without blocking the event loop.
+
+    Args:
+    - recipe_id (int): The id of the recipe.
+    - fields (Tuple[str, ...]): The columns to select, or None for all of them.
+      Projected rows are not cached.
+
+    Returns:
+    - dict: The recipe.
+    """
+    key = entity_key("recipes", recipe_id)
+    recipe = entity_cache.get(key)
+    if recipe is not None:
+        return recipe
+    token = entity_cache.token()
+    recipe = await async_database.fetch_one(
+        RecipeModel.select(*select_columns(RecipeModel, fields)).where(
+            RecipeModel.id == recipe_id
+        )
+    )
+    if recipe is None:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    if fields is None and not replica_served():
+        entity_cache.set(key, recipe, token)
+    return recipe
+
+
+def ingredient_details_query(*recipe_ids: int):
+    """
+    This function builds the query of the ingredients of some recipes, joined
+    with their names, units and calories.
+
+    Args:
+    - recipe_ids (int): The ids of the recipes.
+
+    Returns:
+    - Select: The ingredients of the recipes.
+    """
+    return (
+        RecipeIngredientModel.select(
+            RecipeIngredientModel.recipe_id,
+            RecipeIngredientModel.ingredient_id,
+            IngredientModel.name,
+            RecipeIngredientModel.quantity,
+            UnitModel.name.alias("unit"),
+            IngredientModel.calories,
+        )
+        .join(IngredientModel)
+        .join(UnitModel)
+        .where(RecipeIngredientModel.recipe_id.in_(recipe_ids))
+        .order_by(RecipeIngredientModel.recipe_id, RecipeIngredientModel.ingredient_id)
+    )
+
+
+def group_ingredients(rows):
+    """
+    This function groups ingredient rows by recipe.
+
+    Args:
+    - rows (List[dict]): The rows of the ingredient details query.
+
+    Returns:
+    - dict: The ingredients of every recipe id.
+    """
+    ingredients = {}
+    for row in rows:
+        ingredients.setdefault(row.pop("recipe_id"), []).append(row)
+    return ingredients
+
+
+def ingredient_calories(ingredients):
+    """
+    This function adds up the calories of the ingredients of a recipe.
+
+    Args:
+    - ingredients (List[dict]): The ingredients, with quantities and calories.
+
+    Returns:
+    - int: The calories of the recipe.
+    """
+    return sum(
+        ingredient["quantity"] * ingredient["calories"] for ingredient in ingredients
+    )
+
+
+async def get_recipe_detail_async(recipe_id: int):
+    """
+    This function gets a recipe with its author, categories and ingredients
+    with three queries, whatever their number.
+
+    Args:
+    - recipe_id (int): The id of the recipe.
+
+    Returns:
+    - dict: The recipe with its author, categories and ingredients.
+    """
+    recipe = await async_database.fetch_one(
+        RecipeModel.select(RecipeModel, UserModel.username.alias("author"))
+        .join(UserModel)
+        .where(RecipeModel.id == recipe_id)
+    )
+    if recipe is None:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    recipe["categories"] = await async_database.fetch_all(
+        CategoryModel.select(CategoryModel.id, CategoryModel.name)
+        .join(RecipeCategoryModel)
+        .where(RecipeCategoryModel.recipe_id == recipe_id)
+        .order_by(CategoryModel.id)
+    )
+    recipe["ingredients"] = group_ingredients(
+        await async_database.fetch_all(ingredient_details_query(recipe_id))
+    ).get(recipe_id, [])
+    recipe["calories"] = ingredient_calories(recipe["ingredients"])
+    return recipe
+
+
+def recipe_row(recipe: Recipe):
+    """
+    This function gets the columns of the recipes table of a recipe.
+
+    Args:
+    - recipe (Recipe): The recipe.
+
+    Returns:
+    - dict: The columns of the recipe.
+    """
+    return recipe.dict(exclude={"category_ids", "ingredients"})
+
+
+def recipe_quantities(recipe: Recipe):
+    """
+    This function gets the required quantity of every ingredient of a recipe.
+    Repeated ingredients are added up.
+
+    Args:
+    - recipe (Recipe): The recipe.
+
+    Returns:
+    - dict: The required quantity of every ingredient id.
+    """
+    quantities = {}
+    for ingredient in recipe.ingredients:
+        quantities[ingredient.ingredient_id] = (
+            quantities.get(ingredient.ingredient_id, 0) + ingredient.quantity
+        )
+    return quantities
+
+
+def write_recipe_links(recipe_id: int, recipe: Recipe):
+    """
+    This function replaces the categories and ingredients of a recipe, with
+    one multi-row INSERT for each table.
+
+    Args:
+    - recipe_id (int): The id of the recipe.
+    - recipe (Recipe): The recipe.
+    """
+    # pylint: disable=no-value-for-parameter
+    RecipeCategoryModel.delete().where(
+        RecipeCategoryModel.recipe_id == recipe_id
+    ).execute()
+    RecipeIngredientModel.delete().where(
+        RecipeIngredientModel.recipe_id == recipe_id
+    ).execute()
+    category_ids = sorted(set(recipe.category_ids))
+    if category_ids:
+        RecipeCategoryModel.insert_many(
+            [
+                {"recipe_id": recipe_id, "category_id": category_id}
+                for category_id in category_ids
+            ]
+        ).execute()
+    quantities = recipe_quantities(recipe)
+    if quantities:
+        RecipeIngredientModel.insert_many(
+            [
+                {
+                    "recipe_id": recipe_id,
+                    "ingredient_id": ingredient_id,
+                    "quantity": quantity,
+                }
+                for ingredient_id, quantity in quantities.items()
+            ]
+        ).execute()
+
+
+def index_recipe(recipe_id: int, data: dict, recipe: Recipe):
+    """
+    This function updates the search index, the recipe matrix and the cache
+    after a write.
+
+    Args:
+    - recipe_id (int): The id of the recipe.
+    - data (dict): The columns of the recipe.
+    - recipe (Recipe): The recipe.
+
+    Returns:
+    - dict: The recipe row.
+    """
+    row = {"id": recipe_id, **data}
+    quantities = recipe_quantities(recipe)
+    search_index.set_recipe(row, sorted(set(recipe.category_ids)), list(quantities))
+    recipe_matrix.set_recipe(row, quantities)
+    entity_cache.delete(entity_key("recipes", recipe_id))
+    return row
+
+
+def create_recipe(recipe: Recipe, user_id: int):
+    """
+    This function creates a recipe with its categories, ingredients and
+    calories in one transaction.
+
+    Args:
+    - recipe (Recipe): The recipe to create.
+    - user_id (int): The id of the author of the recipe.
+
+    Returns:
+    - dict: The created recipe.
+    """
+    # pylint: disable=no-value-for-parameter
+    data = {**recipe_row(recipe), "user_id": user_id}
+    try:
+        with write_transaction():
+            recipe_id = RecipeModel.insert(**data).execute()
+            write_recipe_links(recipe_id, recipe)
+            calorie_rollups.set_recipes([recipe_id])
+            table_versions.bump("recipes")
+    except IntegrityError as exc:
+        raise HTTPException(status_code=400, detail="Recipe already exists") from exc
+    return index_recipe(recipe_id, data, recipe)
+
+
+def update_recipe(recipe_id: int, recipe: Recipe):
+    """
+    This function updates a recipe and replaces its categories and
+    ingredients in one transaction, which also refreshes the calories of the
+    recipe and of its menus.
+
+    Args:
+    - recipe_id (int): The id of the recipe.
+    - recipe (Recipe): The recipe to update.
+
+    Returns:
+    - dict: The updated recipe.
+    """
+    try:
+        with write_transaction():
+            user_id = (
+                RecipeModel.select(RecipeModel.user_id)
+                .where(RecipeModel.id == recipe_id)
+                .scalar()
+            )
+            if user_id is None:
+                raise HTTPException(status_code=404, detail="Recipe not found")
+            data = {**recipe_row(recipe), "user_id": user_id}
+            RecipeModel.update(**data).where(RecipeModel.id == recipe_id).execute()
+            write_recipe_links(recipe_id, recipe)
+            calorie_rollups.set_recipes([recipe_id])
+            table_versions.bump("recipes")
+    except IntegrityError as exc:
+        raise HTTPException(status_code=400, detail="Recipe already exists") from exc
+    return index_recipe(recipe_id, data, recipe)
+
+
+async def create_recipe_async(recipe: Recipe, user_id: int):
+    """
+    This function creates a recipe in the threadpool.
+
+    Args:
+    - recipe (Recipe): The recipe to create.
+    - user_id (int): The id of the author of the recipe.
+
+    Returns:
+    - dict: The created recipe.
+    """
+    return await run_in_threadpool(create_recipe, recipe, user_id)
+
+
+async def update_recipe_async(recipe_id: int, recipe: Recipe):
+    """
+    This function updates a recipe in the threadpool.
+
+    Args:
+    - recipe_id (int): The id of the recipe.
+    - recipe (Recipe): The recipe to update.
+
+    Returns:
+    - dict: The updated recipe.
+    """
+    return await run_in_threadpool(update_recipe, recipe_id, recipe)
+
+
+async def search_recipes_async(
+    query: str,
+    category_ids: List[int],
+    ingredient_ids: List[int],
+    limit: int,
+):
+    """
+    This function searches the recipes in the search index and reads the best
+    ones with one query.
+
+    Args:
+    - query (str): The text to search.
+    - category_ids (List[int]): The categories the recipes must have.
+    - ingredient_ids (List[int]): The ingredients the recipes must have.
+    - limit (int): The maximum number of results.
+
+    Returns:
+    - dict: The best recipes, with their scores, and the number of matching
+      recipes.
+    """
+    results, total = search_index.search(query, category_ids, ingredient_ids, limit)
+    if not results:
+        return {"items": [], "total": total}
+    scores = dict(results)
+    rows = await async_database.fetch_all(
+        RecipeModel.select().where(RecipeModel.id.in_(list(scores)))
+    )
+    rows = {row["id"]: row for row in rows}
+    return {
+        "items": [
+            {**rows[recipe_id], "score": score}
+            for recipe_id, score in results
+            if recipe_id in rows
+        ],
+        "total": total,
+    }
+
+
+async def get_cookable_recipes_async(user_id: int, limit: int, min_coverage: float):
+    """
+    This function ranks the recipes by how much of them the inventory of a
+    user covers.
+
+    The inventory is read with one query and every recipe is scored at once
+    against the recipe matrix, in the threadpool.
+
+    Args:
+    - user_id (int): The id of the user.
+    - limit (int): The maximum number of recipes.
+    - min_coverage (float): The minimum coverage of the recipes, from 0 to 1.
+
+    Returns:
+    - dict: The best recipes, with their coverage and missing ingredients,
+      and the number of recipes with at least the minimum coverage.
+    """
+    rows = await async_database.fetch_all(
+        InventoryIngredientModel.select(
+            InventoryIngredientModel.ingredient_id, InventoryIngredientModel.quantity
+        ).where(InventoryIngredientModel.user_id == user_id)
+    )
+    inventory = {}
+    for row in rows:
+        inventory[row["ingredient_id"]] = (
+            inventory.get(row["ingredient_id"], 0) + row["quantity"]
+        )
+    matches, total = await run_in_threadpool(
+        recipe_matrix.match, inventory, limit, min_coverage
+    )
+    if not matches:
+        return {"items": [], "total": total}
+    recipes = await async_database.fetch_all(
+        RecipeModel.select().where(
+            RecipeModel.id.in_([match["recipe_id"] for match in matches])
+        )
+    )
+    recipes = {recipe["id"]: recipe for recipe in recipes}
+    return {
+        "items": [
+            {
+                **recipes[match["recipe_id"]],
+                "coverage": match["coverage"],
+                "missing": match["missing"],
+            }
+            for match in matches
+            if match["recipe_id"] in recipes
+        ],
+        "total": total,
+    }
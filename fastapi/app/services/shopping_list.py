@@ -0,0 +1,154 @@
+"""
+This file contains the functions for the shopping list service.
+"""
+
+from datetime import date
+
+from peewee import JOIN, fn
+from config.async_database import async_database
+from config.replicas import replica_read
+from config.database import (
+    write_transaction,
+    InventoryIngredientModel,
+    MenuModel,
+    MenuRecipeModel,
+    RecipeIngredientModel,
+    ShoppingListIngredientModel,
+    ShoppingListModel,
+)
+from models.shopping_list import ShoppingListRequest
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+
+def needed_ingredients_query(user_id: int, start_date: date, end_date: date):
+    """
+    This function builds the query of the ingredients a user has to buy for
+    the menus in a date range.
+
+    The quantities of every recipe of every active menu are added up by
+    ingredient in the database, and the quantity in the inventory of the
+    user is subtracted. A recipe in two menus counts twice.
+
+    Args:
+    - user_id (int): The id of the user.
+    - start_date (date): The first day of the menus.
+    - end_date (date): The last day of the menus.
+
+    Returns:
+    - Select: The query of the ingredient ids and the quantities to buy.
+    """
+    needed = fn.SUM(RecipeIngredientModel.quantity) - fn.COALESCE(
+        fn.MAX(InventoryIngredientModel.quantity), 0
+    )
+    return (
+        RecipeIngredientModel.select(
+            RecipeIngredientModel.ingredient_id, needed.alias("quantity")
+        )
+        .join(
+            MenuRecipeModel,
+            on=MenuRecipeModel.recipe_id == RecipeIngredientModel.recipe_id,
+        )
+        .join(MenuModel, on=MenuModel.id == MenuRecipeModel.menu_id)
+        .join(
+            InventoryIngredientModel,
+            JOIN.LEFT_OUTER,
+            on=(InventoryIngredientModel.user_id == MenuModel.user_id)
+            & (
+                InventoryIngredientModel.ingredient_id
+                == RecipeIngredientModel.ingredient_id
+            ),
+        )
+        .where(
+            (MenuModel.user_id == user_id)
+            & MenuModel.menu_date.between(start_date, end_date)
+            & MenuModel.is_active
+        )
+        .group_by(RecipeIngredientModel.ingredient_id)
+        .having(needed > 0)
+        .order_by(RecipeIngredientModel.ingredient_id)
+    )
+
+
+def create_shopping_list(request: ShoppingListRequest):
+    """
+    This function generates a shopping list for the menus of a user in a date
+    range.
+
+    The ingredients are computed with one aggregated query and saved with one
+    multi-row INSERT, in one transaction.
+
+    Args:
+    - request (ShoppingListRequest): The user and the date range.
+
+    Returns:
+    - dict: The created shopping list with its ingredients.
+    """
+    # pylint: disable=no-value-for-parameter
+    if request.end_date < request.start_date:
+        raise HTTPException(
+            status_code=400, detail="The end date is before the start date"
+        )
+    with write_transaction():
+        items = [
+            {"ingredient_id": ingredient_id, "quantity": int(quantity)}
+            for ingredient_id, quantity in needed_ingredients_query(
+                request.user_id, request.start_date, request.end_date
+            ).tuples()
+        ]
+        created_at = date.today()
+        shopping_list_id = ShoppingListModel.insert(
+            user_id=request.user_id, created_at=created_at
+        ).execute()
+        if items:
+            ShoppingListIngredientModel.insert_many(
+                [{"shopping_list_id": shopping_list_id, **item} for item in items]
+            ).execute()
+    return {
+        "id": shopping_list_id,
+        "user_id": request.user_id,
+        "created_at": created_at,
+        "items": [{**item, "bought": False} for item in items],
+    }
+
+
+async def create_shopping_list_async(request: ShoppingListRequest):
+    """
+    This function generates a shopping list in the threadpool.
+
+    Args:
+    - request (ShoppingListRequest): The user and the date range.
+
+    Returns:
+    - dict: The created shopping list with its ingredients.
+    """
+    return await run_in_threadpool(create_shopping_list, request)
+
+
+@replica_read
+async def get_shopping_list_by_id_async(shopping_list_id: int):
+    """
+    This function gets a shopping list with its ingredients without blocking
+    the event loop.
+
+    Args:
+    - shopping_list_id (int): The id of the shopping list.
+
+    Returns:
+    - dict: The shopping list with its ingredients.
+    """
+    shopping_list = await async_database.fetch_one(
+        ShoppingListModel.select().where(ShoppingListModel.id == shopping_list_id)
+    )
+    if shopping_list is None:
+        raise HTTPException(status_code=404, detail="Shopping list not found")
+    shopping_list["items"] = await async_database.fetch_all(
+        ShoppingListIngredientModel.select(
+            ShoppingListIngredientModel.ingredient_id,
+            ShoppingListIngredientModel.quantity,
+            ShoppingListIngredientModel.bought,
+        )
+        .where(ShoppingListIngredientModel.shopping_list_id == shopping_list_id)
+        .order_by(ShoppingListIngredientModel.ingredient_id)
+    )
+    return shopping_list
@@ -2,73 +2,232 @@
 This file contains the functions for the user service.
 """
 
-from config.database import UserModel
-from models.user import User
-from fastapi import Body, HTTPException
-
+from typing import List, Optional, Tuple
 
-def get_all_users():
+from peewee import IntegrityError
+from config.async_database import async_database
+from config.replicas import replica_read, replica_served
+from config.database import UserModel
+from models.user import User, UserLogin, UserResponse
+from helpers.authorization import permission_index
+from helpers.bulk import bulk_insert, bulk_summary
+from helpers.export import export_response
+from helpers.cache import entity_cache, entity_key
+from helpers.etag import table_versions
+from helpers.password import DUMMY_HASH, needs_rehash, password_hasher
+from helpers.pagination import page_query, page_response
+from helpers.serialization import select_columns
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+# The columns of a user, without the password hash, which is never cached.
+USER_COLUMNS = tuple(UserResponse.model_fields)
+
+
+@replica_read
+async def get_all_users_async(
+    cursor: Optional[int] = None,
+    limit: Optional[int] = None,
+    fields: Optional[Tuple[str, ...]] = None,
+):
     """
-    This function gets all the users.
+    This function gets a page of the users without blocking the event loop.
+
+    Args:
+    - cursor (int): The id of the last user of the previous page.
+    - limit (int): The maximum number of users of the page.
+    - fields (Tuple[str, ...]): The columns to select, or None for all of them.
 
     Returns:
-    - List[User]: A list of users.
+    - dict: A list of users and the cursor of the next page.
     """
-    return list(UserModel.select().dicts())
+    query, limit = page_query(
+        UserModel.select(*select_columns(UserModel, fields)),
+        UserModel.id,
+        cursor,
+        limit,
+    )
+    return page_response(await async_database.fetch_all(query), "id", limit)
 
 
-def get_user_by_id(user_id: int):
+@replica_read
+async def get_user_by_id_async(user_id: int, fields: Optional[Tuple[str, ...]] = None):
     """
-    This function gets a user by id.
+    This function gets a user by id without blocking the event loop.
 
     Args:
     - user_id (int): The id of the user.
+    - fields (Tuple[str, ...]): The columns to select, or None for all of them
+      but the password. Projected rows are not cached.
 
     Returns:
-    - User: The user.
+    - dict: The user.
     """
-    try:
-        return UserModel.get_by_id(user_id)
-    except UserModel.DoesNotExist as exc:
-        raise HTTPException(status_code=404, detail="User not found") from exc
-
-
-def create_user(user: User = Body(...)):
+    key = entity_key("users", user_id)
+    user = entity_cache.get(key)
+    if user is not None:
+        return user
+    token = entity_cache.token()
+    user = await async_database.fetch_one(
+        UserModel.select(*select_columns(UserModel, fields or USER_COLUMNS)).where(
+            UserModel.id == user_id
+        )
+    )
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    if fields is None and not replica_served():
+        entity_cache.set(key, user, token)
+    return user
+
+
+async def create_user_async(user: User):
     """
-    This function creates a user.
+    This function creates a user without blocking the event loop.
 
     Args:
     - user (User): The user to create.
 
     Returns:
-    - User: The created user.
+    - dict: The created user.
     """
-
+    data = user.dict()
+    data["password"] = await password_hasher.hash_async(user.password)
     try:
-        return UserModel.create(**user.dict())
-    except Exception as exc:
+        user_id = await async_database.execute(UserModel.insert(**data))
+    except IntegrityError as exc:
         raise HTTPException(status_code=400, detail="User already exists") from exc
+    entity_cache.delete(entity_key("users", user_id))
+    await table_versions.bump_async("users")
+    permission_index.set_user(user_id, data["role_id"], data["is_active"])
+    return {"id": user_id, **data}
 
 
-def update_user(user_id: int, user: User = Body(...)):
+async def update_user_async(user_id: int, user: User):
     """
-    This function updates a user.
+    This function updates a user without blocking the event loop.
 
     Args:
     - user_id (int): The id of the user.
     - user (User): The user to update.
 
     Returns:
-    - User: The updated user.
+    - dict: The updated user.
     """
-
+    await get_user_by_id_async(user_id)
+    data = user.dict()
+    data["password"] = await password_hasher.hash_async(user.password)
     try:
-        user_model = UserModel.get_by_id(user_id)
-        for key, value in user.dict().items():
-            setattr(user_model, key, value)
-        user_model.save()
-        return user_model
-    except UserModel.DoesNotExist as exc:
-        raise HTTPException(status_code=404, detail="User not found") from exc
-    except Exception as exc:
+        await async_database.execute(
+            UserModel.update(**data).where(UserModel.id == user_id)
+        )
+    except IntegrityError as exc:
         raise HTTPException(status_code=400, detail="User already exists") from exc
+    entity_cache.delete(entity_key("users", user_id))
+    await table_versions.bump_async("users")
+    permission_index.set_user(user_id, data["role_id"], data["is_active"])
+    return {"id": user_id, **data}
+
+
+def create_users_bulk(users: List[User]):
+    """
+    This function creates many users with batched multi-row INSERTs.
+
+    Args:
+    - users (List[User]): The users to create.
+
+    Returns:
+    - dict: The number of created and conflicting users and the result of
+      every user.
+    """
+    rows = [user.dict() for user in users]
+    hashes = password_hasher.hash_many([user.password for user in users])
+    for row, password in zip(rows, hashes):
+        row["password"] = password
+    results = bulk_insert(
+        UserModel,
+        rows,
+        [UserModel.username, UserModel.email],
+    )
+    for result in results:
+        if result["status"] == "created":
+            entity_cache.delete(entity_key("users", result["id"]))
+            row = rows[result["index"]]
+            permission_index.set_user(result["id"], row["role_id"], row["is_active"])
+    table_versions.bump("users")
+    return bulk_summary(results)
+
+
+async def create_users_bulk_async(users: List[User]):
+    """
+    This function creates many users in the threadpool.
+
+    Args:
+    - users (List[User]): The users to create.
+
+    Returns:
+    - dict: The number of created and conflicting users and the result of
+      every user.
+    """
+    return await run_in_threadpool(create_users_bulk, users)
+
+
+def export_users(export_format: str = "ndjson", since_id: Optional[int] = None):
+    """
+    This function streams the users as NDJSON or CSV.
+
+    The password is not exported.
+
+    Args:
+    - export_format (str): The format of the export, "ndjson" or "csv".
+    - since_id (int): The id of the last exported user, to resume an
+      export.
+
+    Returns:
+    - StreamingResponse: The streamed users.
+    """
+    return export_response(
+        UserModel.select(
+            UserModel.id,
+            UserModel.username,
+            UserModel.email,
+            UserModel.account_type,
+            UserModel.profile_picture,
+            UserModel.role_id,
+            UserModel.is_active,
+        ),
+        UserModel.id,
+        export_format,
+        since_id,
+        "users",
+    )
+
+
+async def login_user_async(login: UserLogin):
+    """
+    This function verifies the credentials of a user.
+
+    The password is verified on the process pool. Passwords hashed with
+    other parameters, or stored as plain text, are hashed again.
+
+    Args:
+    - login (UserLogin): The username and password.
+
+    Returns:
+    - dict: The user, without the password.
+    """
+    user = await async_database.fetch_one(
+        UserModel.select().where(UserModel.username == login.username)
+    )
+    encoded = user["password"] if user is not None else DUMMY_HASH
+    valid = await password_hasher.verify_async(login.password, encoded)
+    if user is None or not valid or not user["is_active"]:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    if needs_rehash(encoded):
+        await async_database.execute(
+            UserModel.update(
+                password=await password_hasher.hash_async(login.password)
+            ).where(UserModel.id == user["id"])
+        )
+        entity_cache.delete(entity_key("users", user["id"]))
+        await table_versions.bump_async("users")
+    return {key: value for key, value in user.items() if key != "password"}
@@ -2,72 +2,245 @@
 This file contains the functions for the user role service.
 """
 
-from config.database import UserRoleModel
+from typing import List, Optional, Tuple
+
+from peewee import IntegrityError
+from config.async_database import async_database
+from config.replicas import replica_read, replica_served
+from config.database import RolePermissionModel, UserRoleModel
 from models.user_role import UserRole
-from fastapi import Body, HTTPException
+from helpers.authorization import permission_index
+from helpers.bulk import bulk_insert, bulk_summary
+from helpers.export import export_response
+from helpers.cache import entity_cache, entity_key
+from helpers.etag import table_versions
+from helpers.pagination import page_query, page_response
+from helpers.serialization import select_columns
+from services.permission import get_permission_by_id_async
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+
+@replica_read
+async def get_all_user_roles_async(
+    cursor: Optional[int] = None,
+    limit: Optional[int] = None,
+    fields: Optional[Tuple[str, ...]] = None,
+):
+    """
+    This function gets a page of the user roles without blocking the event loop.
 
+    Args:
+    - cursor (int): The id of the last user role of the previous page.
+    - limit (int): The maximum number of user roles of the page.
+    - fields (Tuple[str, ...]): The columns to select, or None for all of them.
 
-def get_all_user_roles():
+    Returns:
+    - dict: A list of user roles and the cursor of the next page.
     """
-    This function gets all the user roles.
+    query, limit = page_query(
+        UserRoleModel.select(*select_columns(UserRoleModel, fields)),
+        UserRoleModel.id,
+        cursor,
+        limit,
+    )
+    return page_response(await async_database.fetch_all(query), "id", limit)
+
+
+@replica_read
+async def get_user_role_by_id_async(
+    user_role_id: int, fields: Optional[Tuple[str, ...]] = None
+):
+    """
+    This function gets a user role by id without blocking the event loop.
+
+    Args:
+    - user_role_id (int): The id of the user role.
+    - fields (Tuple[str, ...]): The columns to select, or None for all of them.
+      Projected rows are not cached.
 
     Returns:
-    - List[UserRole]: A list of user roles.
+    - dict: The user role.
+    """
+    key = entity_key("user_roles", user_role_id)
+    user_role = entity_cache.get(key)
+    if user_role is not None:
+        return user_role
+    token = entity_cache.token()
+    user_role = await async_database.fetch_one(
+        UserRoleModel.select(*select_columns(UserRoleModel, fields)).where(
+            UserRoleModel.id == user_role_id
+        )
+    )
+    if user_role is None:
+        raise HTTPException(status_code=404, detail="User role not found")
+    if fields is None and not replica_served():
+        entity_cache.set(key, user_role, token)
+    return user_role
+
+
+async def create_user_role_async(user_role: UserRole):
     """
-    return list(UserRoleModel.select().dicts())
+    This function creates a user role without blocking the event loop.
 
+    Args:
+    - user_role (UserRole): The user role to create.
 
-def get_user_role_by_id(user_role_id: int):
+    Returns:
+    - dict: The created user role.
     """
-    This function gets a user role by id.
+    data = {"name": user_role.name}
+    try:
+        user_role_id = await async_database.execute(UserRoleModel.insert(**data))
+    except IntegrityError as exc:
+        raise HTTPException(status_code=400, detail="User role already exists") from exc
+    entity_cache.delete(entity_key("user_roles", user_role_id))
+    await table_versions.bump_async("user_roles")
+    return {"id": user_role_id, **data}
+
+
+async def update_user_role_async(user_role_id: int, user_role: UserRole):
+    """
+    This function updates a user role without blocking the event loop.
 
     Args:
     - user_role_id (int): The id of the user role.
+    - user_role (UserRole): The user role to update.
 
     Returns:
-    - UserRole: The user role.
+    - dict: The updated user role.
     """
+    await get_user_role_by_id_async(user_role_id)
+    data = {"name": user_role.name}
     try:
-        return UserRoleModel.get_by_id(user_role_id)
-    except UserRoleModel.DoesNotExist as exc:
-        raise HTTPException(status_code=404, detail="User role not found") from exc
+        await async_database.execute(
+            UserRoleModel.update(**data).where(UserRoleModel.id == user_role_id)
+        )
+    except IntegrityError as exc:
+        raise HTTPException(status_code=400, detail="User role already exists") from exc
+    entity_cache.delete(entity_key("user_roles", user_role_id))
+    await table_versions.bump_async("user_roles")
+    return {"id": user_role_id, **data}
 
 
-def create_user_role(user_role: UserRole = Body(...)):
+def create_user_roles_bulk(user_roles: List[UserRole]):
     """
-    This function creates a user role.
+    This function creates many user roles with batched multi-row INSERTs.
 
     Args:
-    - user_role (UserRole): The user role to create.
+    - user_roles (List[UserRole]): The user roles to create.
 
     Returns:
-    - UserRole: The created user role.
+    - dict: The number of created and conflicting user roles and the result of
+      every user role.
+    """
+    results = bulk_insert(
+        UserRoleModel,
+        [{"name": user_role.name} for user_role in user_roles],
+        [UserRoleModel.name],
+    )
+    for result in results:
+        if result["status"] == "created":
+            entity_cache.delete(entity_key("user_roles", result["id"]))
+    table_versions.bump("user_roles")
+    return bulk_summary(results)
+
+
+async def create_user_roles_bulk_async(user_roles: List[UserRole]):
     """
+    This function creates many user roles in the threadpool.
 
-    try:
-        return UserRoleModel.create(**user_role.dict())
-    except Exception as exc:
-        raise HTTPException(status_code=400, detail="User role already exists") from exc
+    Args:
+    - user_roles (List[UserRole]): The user roles to create.
+
+    Returns:
+    - dict: The number of created and conflicting user roles and the result of
+      every user role.
+    """
+    return await run_in_threadpool(create_user_roles_bulk, user_roles)
 
 
-def update_user_role(user_role_id: int, user_role: UserRole = Body(...)):
+def export_user_roles(export_format: str = "ndjson", since_id: Optional[int] = None):
     """
-    This function updates a user role.
+    This function streams the user roles as NDJSON or CSV.
+
+    Args:
+    - export_format (str): The format of the export, "ndjson" or "csv".
+    - since_id (int): The id of the last exported user role, to resume an
+      export.
+
+    Returns:
+    - StreamingResponse: The streamed user roles.
+    """
+    return export_response(
+        UserRoleModel.select(),
+        UserRoleModel.id,
+        export_format,
+        since_id,
+        "user_roles",
+    )
+
+
+async def get_user_role_permissions_async(user_role_id: int):
+    """
+    This function gets the permissions of a user role from the permission index.
 
     Args:
     - user_role_id (int): The id of the user role.
-    - user_role (UserRole): The user role to update.
 
     Returns:
-    - UserRole: The updated user role.
+    - dict: The id of the user role and the ids of its permissions.
     """
-    try:
-        user_role_model = UserRoleModel.get_by_id(user_role_id)
-        for key, value in user_role.dict().items():
-            setattr(user_role_model, key, value)
-        user_role_model.save()
-        return user_role_model
-    except UserRoleModel.DoesNotExist as exc:
-        raise HTTPException(status_code=404, detail="User role not found") from exc
-    except Exception as exc:
-        raise HTTPException(status_code=400, detail="User role already exists") from exc
+    await get_user_role_by_id_async(user_role_id)
+    return {
+        "role_id": user_role_id,
+        "permissions": permission_index.role_permissions(user_role_id),
+    }
+
+
+async def grant_permission_async(user_role_id: int, permission_id: int):
+    """
+    This function grants a permission to a user role.
+
+    Args:
+    - user_role_id (int): The id of the user role.
+    - permission_id (int): The id of the permission.
+
+    Returns:
+    - dict: The id of the user role and the ids of its permissions.
+    """
+    await get_user_role_by_id_async(user_role_id)
+    permission = await get_permission_by_id_async(permission_id)
+    await async_database.execute(
+        RolePermissionModel.insert(
+            role_id=user_role_id, permission_id=permission_id
+        ).on_conflict_ignore()
+    )
+    await table_versions.bump_async("role_permissions")
+    permission_index.set_permission(permission_id, permission["name"])
+    permission_index.grant(user_role_id, permission_id)
+    return await get_user_role_permissions_async(user_role_id)
+
+
+async def revoke_permission_async(user_role_id: int, permission_id: int):
+    """
+    This function revokes a permission from a user role.
+
+    Args:
+    - user_role_id (int): The id of the user role.
+    - permission_id (int): The id of the permission.
+
+    Returns:
+    - dict: The id of the user role and the ids of its permissions.
+    """
+    deleted = await async_database.execute(
+        RolePermissionModel.delete().where(
+            (RolePermissionModel.role_id == user_role_id)
+            & (RolePermissionModel.permission_id == permission_id)
+        )
+    )
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Permission not granted")
+    await table_versions.bump_async("role_permissions")
+    permission_index.revoke(user_role_id, permission_id)
+    return await get_user_role_permissions_async(user_role_id)
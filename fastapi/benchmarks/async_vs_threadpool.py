@@ -0,0 +1,141 @@
+"""
+Benchmark of the asynchronous database backends.
+
+Compares the requests per second of the routers when the queries run on the
+peewee database in the threadpool and on the aiosqlite pool, both against a
+SQLite stand-in of the MySQL schema.
+
+Usage:
+    python benchmarks/async_vs_threadpool.py --requests 2000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+API_KEY = "benchmark"
+
+
+def configure(database_path: str, driver: str):
+    """
+    Points the application settings to the SQLite stand-in.
+    """
+    os.environ.update(
+        {
+            "DATABASE_ENGINE": "peewee.SqliteDatabase",
+            "MYSQL_DATABASE": database_path,
+            "ASYNC_DATABASE_DRIVER": driver,
+            "API_KEY": API_KEY,
+        }
+    )
+    sys.path.insert(0, APP_DIR)
+
+
+def seed(rows: int):
+    """
+    Creates the schema and inserts the users.
+    """
+    # pylint: disable=import-outside-toplevel,no-value-for-parameter
+    from config.database import database, PermissionModel, UserModel, UserRoleModel
+
+    database.connect()
+    try:
+        database.create_tables([UserRoleModel, PermissionModel, UserModel])
+        UserRoleModel.insert(name="Admin").execute()
+        with database.atomic():
+            UserModel.insert_many(
+                {
+                    "username": f"user{i}",
+                    "email": f"user{i}@example.com",
+                    "password": "password",
+                    "account_type": "admin",
+                    "profile_picture": "profile.jpg",
+                    "role_id": 1,
+                }
+                for i in range(rows)
+            ).execute()
+    finally:
+        database.close()
+
+
+async def run(requests: int, concurrency: int, rows: int):
+    """
+    Sends the requests to the application and measures the throughput.
+    """
+    # pylint: disable=import-outside-toplevel
+    import httpx
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    headers = {"x-api-key": API_KEY}
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+
+    async def worker(client):
+        while not queue.empty():
+            i = queue.get_nowait()
+            if i % 2:
+                await client.get("/api/users/", params={"limit": 20})
+            else:
+                await client.get("/api/users/{id}", params={"user_id": i % rows + 1})
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://benchmark", headers=headers
+        ) as client:
+            start = time.perf_counter()
+            await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+            elapsed = time.perf_counter() - start
+    return {"requests": requests, "seconds": elapsed, "rps": requests / elapsed}
+
+
+def main():
+    """
+    Runs the benchmark for every backend in a separate process.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--driver", help=argparse.SUPPRESS)
+    parser.add_argument("--database", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.driver:
+        configure(args.database, args.driver)
+        result = asyncio.run(run(args.requests, args.concurrency, args.rows))
+        print(json.dumps(result))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = os.path.join(directory, "benchmark.db")
+        configure(database_path, "threadpool")
+        seed(args.rows)
+        for driver in ("threadpool", "aiosqlite"):
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    f"--requests={args.requests}",
+                    f"--concurrency={args.concurrency}",
+                    f"--rows={args.rows}",
+                    f"--driver={driver}",
+                    f"--database={database_path}",
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{driver:>10}: {result['rps']:8.1f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark of the "what can I cook" matcher.
+
+Builds the recipe matrix for a synthetic catalog and measures the time to
+rank every recipe against random inventories, and to rank them right after
+a recipe is written. Only the in-memory scoring is measured; the route adds
+one inventory query and one query for the best recipes.
+
+Usage:
+    python benchmarks/cookable.py --recipes 100000 --ingredients 2000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+
+
+def main():
+    """
+    Runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--recipes", type=int, default=100000)
+    parser.add_argument("--ingredients", type=int, default=2000)
+    parser.add_argument("--per-recipe", type=int, default=8)
+    parser.add_argument("--inventory", type=int, default=60)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    sys.path.insert(0, APP_DIR)
+    from helpers.matcher import RecipeMatrix  # pylint: disable=import-outside-toplevel
+
+    generator = random.Random(0)
+    ingredients = range(1, args.ingredients + 1)
+    matrix = RecipeMatrix()
+    matrix.recipes = {
+        recipe_id: {
+            ingredient_id: generator.randint(1, 500)
+            for ingredient_id in generator.sample(ingredients, args.per_recipe)
+        }
+        for recipe_id in range(1, args.recipes + 1)
+    }
+    start = time.perf_counter()
+    matrix.current()
+    build = time.perf_counter() - start
+
+    timings = {"match": [], "match after a write": []}
+    for _ in range(args.runs):
+        for name, timing in timings.items():
+            if name == "match after a write":
+                matrix.set_recipe(
+                    {
+                        "id": generator.randint(1, args.recipes),
+                        "is_active": True,
+                        "is_public": True,
+                    },
+                    {
+                        ingredient_id: generator.randint(1, 500)
+                        for ingredient_id in generator.sample(
+                            ingredients, args.per_recipe
+                        )
+                    },
+                )
+            inventory = {
+                ingredient_id: generator.randint(1, 1000)
+                for ingredient_id in generator.sample(ingredients, args.inventory)
+            }
+            start = time.perf_counter()
+            matrix.match(inventory, args.limit)
+            timing.append((time.perf_counter() - start) * 1000)
+    print(f"recipes: {args.recipes}, non-zeros: {args.recipes * args.per_recipe}")
+    print(f"build: {build * 1000:.1f} ms")
+    for name, timing in timings.items():
+        timing.sort()
+        print(
+            f"{name}: p50 {statistics.median(timing):.1f} ms, "
+            f"p95 {timing[int(len(timing) * 0.95) - 1]:.1f} ms, "
+            f"max {timing[-1]:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
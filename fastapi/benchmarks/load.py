@@ -0,0 +1,725 @@
+"""
+Load test of the API.
+
+Runs `main.app` in process through an ASGI client against a seeded SQLite
+stand-in of the schema, replays a weighted mix of list, get, create and
+update calls at a fixed concurrency, and reports the p50/p95/p99 latency
+and the requests per second of every route. The results are written as
+JSON, so runs can be compared across commits.
+
+The reads of user roles and permissions send If-None-Match with the last
+ETag seen for their URL, so the 304 path is measured along with the full
+reads, and the writes of the mix include the role, permission and grant
+changes that invalidate those ETags and the permission index.
+
+Usage:
+    python benchmarks/load.py --requests 5000 --concurrency 32
+    python benchmarks/load.py --mix list=50,get=40,create=5,update=5 \\
+        --output load.json
+"""
+
+import argparse
+import asyncio
+import collections
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+API_KEY = "benchmark"
+AUTHOR_KEY = "benchmark-author"
+SIZES = {
+    "users": 1000,
+    "ingredients": 500,
+    "recipes": 2000,
+    "menus": 1000,
+    "user_roles": 20,
+    "permissions": 50,
+    "shopping_lists": 200,
+}
+UNLIMITED = {
+    "RATE_LIMIT_RATE": "1000000",
+    "RATE_LIMIT_BURST": "1000000",
+    "ADMISSION_MAX_IN_FLIGHT": "100000",
+    "EXPIRY_SINK": "queue",
+}
+
+
+def user(name: str):
+    """
+    Gets the payload of a user.
+    """
+    return {
+        "username": name,
+        "email": f"{name}@example.com",
+        "password": "password",
+        "role_id": 1,
+        "account_type": "admin",
+        "profile_picture": "profile.jpg",
+        "is_active": True,
+    }
+
+
+def role_grants(sizes: dict):
+    """
+    Gets the permissions the seed grants to the roles. Permission 1 lets the
+    author key create recipes; the mix never revokes or renames it.
+
+    Returns:
+    - List[tuple]: The role and permission ids.
+    """
+    return [
+        (role_id, permission_id)
+        for role_id in range(1, sizes["user_roles"] + 1)
+        for permission_id in range(2, sizes["permissions"] + 1)
+        if (role_id + permission_id) % 5 == 0
+    ]
+
+
+def configure(database_path: str, driver: str):
+    """
+    Points the application settings to the SQLite stand-in. The rate limits
+    are lifted and the password hashing is made cheap, so the benchmark
+    measures the routes and not the limits.
+    """
+    os.environ.update(
+        UNLIMITED,
+        DATABASE_ENGINE="peewee.SqliteDatabase",
+        MYSQL_DATABASE=database_path,
+        ASYNC_DATABASE_DRIVER=driver,
+        API_KEY=API_KEY,
+    )
+    os.environ.setdefault("PASSWORD_SCRYPT_N", "1024")
+    sys.path.insert(0, APP_DIR)
+
+
+def seed(sizes: dict):
+    """
+    Creates the schema and inserts the users, roles, permissions,
+    ingredients, inventories, recipes, menus and shopping lists.
+    """
+    # pylint: disable=import-outside-toplevel,no-value-for-parameter
+    from peewee import Model
+    import config.database as schema
+    from helpers.api_key_auth import hash_api_key
+    from helpers.nutrition import calorie_rollups
+
+    generator = random.Random(0)
+    models = [
+        value
+        for value in vars(schema).values()
+        if isinstance(value, type) and issubclass(value, Model) and value is not Model
+    ]
+    rows = {
+        schema.UserRoleModel: [
+            {"name": f"role{i}"} for i in range(1, sizes["user_roles"])
+        ],
+        schema.PermissionModel: [
+            {"name": f"permission{i}", "description": "A seeded permission."}
+            for i in range(1, sizes["permissions"])
+        ],
+        schema.RolePermissionModel: [
+            {"role_id": role_id, "permission_id": permission_id}
+            for role_id, permission_id in role_grants(sizes)
+        ],
+        schema.UserModel: [user(f"user{i}") for i in range(sizes["users"])],
+        schema.IngredientModel: [
+            {
+                "name": f"ingredient{i}",
+                "calories": generator.randint(1, 9),
+                "expiration_date": date.today() + timedelta(days=i % 60),
+                "category_id": 1,
+                "unit_id": 1,
+            }
+            for i in range(sizes["ingredients"])
+        ],
+        schema.RecipeModel: [
+            {
+                "name": f"recipe{i}",
+                "description": "A seeded recipe.",
+                "instructions": "Mix everything and cook it.",
+                "preparation_time": generator.randint(5, 90),
+                "difficulty": generator.randint(1, 5),
+                "user_id": generator.randint(1, sizes["users"]),
+            }
+            for i in range(sizes["recipes"])
+        ],
+        schema.RecipeIngredientModel: [
+            {"recipe_id": recipe_id, "ingredient_id": ingredient_id, "quantity": 10}
+            for recipe_id in range(1, sizes["recipes"] + 1)
+            for ingredient_id in generator.sample(range(1, sizes["ingredients"]), 6)
+        ],
+        schema.MenuModel: [
+            {
+                "name": f"menu{i}",
+                "menu_date": date.today() + timedelta(days=i % 30),
+                "meal_type": "Lunch",
+                "user_id": generator.randint(1, sizes["users"]),
+            }
+            for i in range(sizes["menus"])
+        ],
+        schema.MenuRecipeModel: [
+            {"menu_id": menu_id, "recipe_id": recipe_id}
+            for menu_id in range(1, sizes["menus"] + 1)
+            for recipe_id in generator.sample(range(1, sizes["recipes"]), 3)
+        ],
+        schema.InventoryIngredientModel: [
+            {"user_id": user_id, "ingredient_id": ingredient_id, "quantity": 100}
+            for user_id in range(1, sizes["users"] + 1)
+            for ingredient_id in generator.sample(range(1, sizes["ingredients"]), 5)
+        ],
+        schema.ShoppingListModel: [
+            {"user_id": generator.randint(1, sizes["users"])}
+            for _ in range(sizes["shopping_lists"])
+        ],
+        schema.ShoppingListIngredientModel: [
+            {
+                "shopping_list_id": shopping_list_id,
+                "ingredient_id": ingredient_id,
+                "quantity": 10,
+            }
+            for shopping_list_id in range(1, sizes["shopping_lists"] + 1)
+            for ingredient_id in generator.sample(range(1, sizes["ingredients"]), 5)
+        ],
+    }
+    database = schema.database
+    database.connect()
+    try:
+        database.create_tables(models)
+        with database.atomic():
+            schema.UserRoleModel.insert(name="Admin").execute()
+            schema.PermissionModel.insert(
+                name="Create Recipe", description="Create recipes."
+            ).execute()
+            schema.RolePermissionModel.insert(role_id=1, permission_id=1).execute()
+            schema.ApiKeyModel.insert(
+                name="author", key_hash=hash_api_key(AUTHOR_KEY), user_id=1
+            ).execute()
+            schema.UnitModel.insert(name="g").execute()
+            schema.IngredientCategoryModel.insert(name="Pantry").execute()
+            schema.CategoryModel.insert(name="Dinner").execute()
+            for model, values in rows.items():
+                for batch in range(0, len(values), 500):
+                    model.insert_many(values[batch : batch + 500]).execute()
+            calorie_rollups.rebuild()
+    finally:
+        database.close()
+
+
+def build_routes(sizes: dict):
+    """
+    Builds the requests of every kind of call.
+
+    Returns:
+    - dict: For every kind, the routes as (label, function of a random
+      generator returning the method, path and options of a request).
+    """
+    names = itertools.count()
+
+    def recipe(generator):
+        return {
+            "name": f"bench{next(names)}",
+            "description": "A benchmark recipe.",
+            "instructions": "Mix everything and cook it.",
+            "preparation_time": 30,
+            "difficulty": 2,
+            "category_ids": [1],
+            "ingredients": [
+                {"ingredient_id": ingredient_id, "quantity": 5}
+                for ingredient_id in generator.sample(range(1, sizes["ingredients"]), 4)
+            ],
+        }
+
+    def ingredient(_):
+        return {
+            "name": f"bench{next(names)}",
+            "calories": 3,
+            "expiration_date": date.today().isoformat(),
+            "category_id": 1,
+            "unit_id": 1,
+        }
+
+    def menu(generator):
+        return {
+            "name": f"bench{next(names)}",
+            "menu_date": date.today().isoformat(),
+            "meal_type": "Dinner",
+            "user_id": generator.randint(1, sizes["users"]),
+            "recipe_ids": generator.sample(range(1, sizes["recipes"]), 3),
+        }
+
+    def menu_week(generator):
+        return {
+            "user_id": generator.randint(1, sizes["users"]),
+            "start_date": date.today().isoformat(),
+            "end_date": (date.today() + timedelta(days=6)).isoformat(),
+        }
+
+    def pick(generator, table):
+        return generator.randint(1, sizes[table])
+
+    # The revokes take the oldest grant, so they find it; the grants add
+    # theirs to the end.
+    grants = collections.deque(role_grants(sizes))
+
+    def grant(generator):
+        pair = (
+            pick(generator, "user_roles"),
+            generator.randint(2, sizes["permissions"]),
+        )
+        grants.append(pair)
+        return f"/api/user_roles/{pair[0]}/permissions/{pair[1]}"
+
+    def revoke(_):
+        role_id, permission_id = grants.popleft() if grants else (1, 2)
+        return f"/api/user_roles/{role_id}/permissions/{permission_id}"
+
+    def role(_):
+        return {"name": f"bench{next(names)}", "description": "A benchmark role."}
+
+    author = {"x-api-key": AUTHOR_KEY}
+    return {
+        "list": [
+            ("GET /api/users/", lambda g: ("GET", "/api/users/", {})),
+            ("GET /api/recipes/", lambda g: ("GET", "/api/recipes/", {})),
+            ("GET /api/ingredients/", lambda g: ("GET", "/api/ingredients/", {})),
+            ("GET /api/menus/", lambda g: ("GET", "/api/menus/", {})),
+            (
+                "GET /api/recipes/search",
+                lambda g: ("GET", "/api/recipes/search", {"params": {"q": "cook"}}),
+            ),
+            (
+                "GET /api/user_roles/ (If-None-Match)",
+                lambda g: ("GET", "/api/user_roles/", {"conditional": True}),
+            ),
+            (
+                "GET /api/permissions/ (If-None-Match)",
+                lambda g: ("GET", "/api/permissions/", {"conditional": True}),
+            ),
+            (
+                "GET /api/inventory/",
+                lambda g: (
+                    "GET",
+                    "/api/inventory/",
+                    {"params": {"user_id": pick(g, "users")}},
+                ),
+            ),
+            (
+                "GET /api/inventory/expiring",
+                lambda g: (
+                    "GET",
+                    "/api/inventory/expiring",
+                    {"params": {"user_id": pick(g, "users"), "days": 30}},
+                ),
+            ),
+        ],
+        "get": [
+            (
+                "GET /api/users/{id}",
+                lambda g: (
+                    "GET",
+                    "/api/users/{id}",
+                    {"params": {"user_id": pick(g, "users")}},
+                ),
+            ),
+            (
+                "GET /api/recipes/{id}",
+                lambda g: (
+                    "GET",
+                    "/api/recipes/{id}",
+                    {"params": {"recipe_id": pick(g, "recipes")}},
+                ),
+            ),
+            (
+                "GET /api/recipes/{recipe_id}/detail",
+                lambda g: ("GET", f"/api/recipes/{pick(g, 'recipes')}/detail", {}),
+            ),
+            (
+                "GET /api/menus/{menu_id}/detail",
+                lambda g: ("GET", f"/api/menus/{pick(g, 'menus')}/detail", {}),
+            ),
+            (
+                "GET /api/nutrition/recipes/{recipe_id}",
+                lambda g: ("GET", f"/api/nutrition/recipes/{pick(g, 'recipes')}", {}),
+            ),
+            (
+                "GET /api/user_roles/{id} (If-None-Match)",
+                lambda g: (
+                    "GET",
+                    "/api/user_roles/{id}",
+                    {
+                        "params": {"user_role_id": pick(g, "user_roles")},
+                        "conditional": True,
+                    },
+                ),
+            ),
+            (
+                "GET /api/permissions/{id} (If-None-Match)",
+                lambda g: (
+                    "GET",
+                    "/api/permissions/{id}",
+                    {
+                        "params": {"permission_id": pick(g, "permissions")},
+                        "conditional": True,
+                    },
+                ),
+            ),
+            (
+                "GET /api/user_roles/{user_role_id}/permissions",
+                lambda g: (
+                    "GET",
+                    f"/api/user_roles/{pick(g, 'user_roles')}/permissions",
+                    {},
+                ),
+            ),
+            (
+                "GET /api/shopping_lists/{id}",
+                lambda g: (
+                    "GET",
+                    "/api/shopping_lists/{id}",
+                    {"params": {"shopping_list_id": pick(g, "shopping_lists")}},
+                ),
+            ),
+        ],
+        "create": [
+            (
+                "POST /api/recipes/",
+                lambda g: (
+                    "POST",
+                    "/api/recipes/",
+                    {"json": recipe(g), "headers": author},
+                ),
+            ),
+            (
+                "POST /api/ingredients/",
+                lambda g: ("POST", "/api/ingredients/", {"json": ingredient(g)}),
+            ),
+            ("POST /api/menus/", lambda g: ("POST", "/api/menus/", {"json": menu(g)})),
+            (
+                "POST /api/users/",
+                lambda g: (
+                    "POST",
+                    "/api/users/",
+                    {"json": user(f"bench{next(names)}")},
+                ),
+            ),
+            (
+                "POST /api/user_roles/",
+                lambda g: (
+                    "POST",
+                    "/api/user_roles/",
+                    {"json": role(g)},
+                ),
+            ),
+            (
+                "POST /api/permissions/",
+                lambda g: (
+                    "POST",
+                    "/api/permissions/",
+                    {
+                        "json": {
+                            "name": f"bench{next(names)}",
+                            "description": "A benchmark permission.",
+                        }
+                    },
+                ),
+            ),
+            (
+                "POST /api/shopping_lists/",
+                lambda g: ("POST", "/api/shopping_lists/", {"json": menu_week(g)}),
+            ),
+        ],
+        "update": [
+            (
+                "PUT /api/recipes/{id}",
+                lambda g: (
+                    "PUT",
+                    "/api/recipes/{id}",
+                    {
+                        "params": {"recipe_id": pick(g, "recipes")},
+                        "json": recipe(g),
+                        "headers": author,
+                    },
+                ),
+            ),
+            (
+                "PUT /api/ingredients/{id}",
+                lambda g: (
+                    "PUT",
+                    "/api/ingredients/{id}",
+                    {
+                        "params": {"ingredient_id": pick(g, "ingredients")},
+                        "json": ingredient(g),
+                    },
+                ),
+            ),
+            (
+                "PUT /api/menus/{id}",
+                lambda g: (
+                    "PUT",
+                    "/api/menus/{id}",
+                    {"params": {"menu_id": pick(g, "menus")}, "json": menu(g)},
+                ),
+            ),
+            (
+                "PUT /api/user_roles/{id}",
+                lambda g: (
+                    "PUT",
+                    "/api/user_roles/{id}",
+                    {
+                        "params": {"user_role_id": pick(g, "user_roles")},
+                        "json": role(g),
+                    },
+                ),
+            ),
+            (
+                "PUT /api/permissions/{id}",
+                lambda g: (
+                    "PUT",
+                    "/api/permissions/{id}",
+                    {
+                        "params": {"permission_id": g.randint(2, sizes["permissions"])},
+                        "json": {
+                            "name": f"bench{next(names)}",
+                            "description": "A benchmark permission.",
+                        },
+                    },
+                ),
+            ),
+            (
+                "PUT /api/user_roles/{user_role_id}/permissions/{permission_id}",
+                lambda g: ("PUT", grant(g), {}),
+            ),
+            (
+                "DELETE /api/user_roles/{user_role_id}/permissions/{permission_id}",
+                lambda g: ("DELETE", revoke(g), {}),
+            ),
+            (
+                "PUT /api/inventory/",
+                lambda g: (
+                    "PUT",
+                    "/api/inventory/",
+                    {
+                        "json": {
+                            "user_id": pick(g, "users"),
+                            "ingredient_id": pick(g, "ingredients"),
+                            "quantity": g.randint(1, 500),
+                        }
+                    },
+                ),
+            ),
+        ],
+    }
+
+
+def parse_mix(mix: str):
+    """
+    Parses a mix such as "list=40,get=40,create=10,update=10".
+
+    Returns:
+    - dict: The weight of every kind of call.
+    """
+    weights = {}
+    for part in mix.split(","):
+        kind, weight = part.split("=")
+        weights[kind.strip()] = float(weight)
+    return weights
+
+
+def percentile(values, q: float):
+    """
+    Gets a percentile of sorted values, by nearest rank.
+    """
+    if not values:
+        return None
+    rank = max(1, min(len(values), round(q / 100 * len(values) + 0.5)))
+    return values[rank - 1]
+
+
+def summarize(samples, elapsed: float):
+    """
+    Gets the latency percentiles and throughput of every route.
+
+    Returns:
+    - dict: The statistics of every route and of all of them.
+    """
+    routes = {}
+    for label, status, latency in samples:
+        routes.setdefault(label, []).append((status, latency))
+    routes["all"] = [(status, latency) for _, status, latency in samples]
+    summary = {}
+    for label, results in sorted(routes.items()):
+        latencies = sorted(latency * 1000 for _, latency in results)
+        statuses = {}
+        for status, _ in results:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        summary[label] = {
+            "requests": len(results),
+            "errors": sum(1 for status, _ in results if status >= 400),
+            "statuses": statuses,
+            "rps": len(results) / elapsed,
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "p99_ms": percentile(latencies, 99),
+            "max_ms": latencies[-1],
+        }
+    return summary
+
+
+def plan_requests(weights: dict, routes: dict, requests: int, generator):
+    """
+    Draws the routes of the requests from the weights of every kind of call.
+
+    Returns:
+    - List[tuple]: The label and the request builder of every request.
+    """
+    kinds = [kind for kind, weight in weights.items() if weight > 0]
+    unknown = set(kinds) - set(routes)
+    if unknown:
+        raise SystemExit(f"Unknown kinds of calls: {', '.join(sorted(unknown))}")
+    return [
+        generator.choice(routes[kind])
+        for kind in generator.choices(
+            kinds, [weights[kind] for kind in kinds], k=requests
+        )
+    ]
+
+
+async def send(client, build, generator, etags: dict):
+    """
+    Sends a request built from a random generator. A conditional request
+    sends the last ETag seen for its URL, and keeps the one it gets back.
+
+    Returns:
+    - Response: The response of the application.
+    """
+    method, path, options = build(generator)
+    key = None
+    if options.pop("conditional", False):
+        key = (path, tuple(sorted(options.get("params", {}).items())))
+        if key in etags:
+            options["headers"] = {
+                **options.get("headers", {}),
+                "If-None-Match": etags[key],
+            }
+    response = await client.request(method, path, **options)
+    if key is not None and "etag" in response.headers:
+        etags[key] = response.headers["etag"]
+    return response
+
+
+async def run(args, routes: dict):
+    """
+    Sends the requests to the application at a fixed concurrency.
+
+    Returns:
+    - Tuple[List[tuple], float]: The route, status and latency of every
+      request, and the elapsed seconds.
+    """
+    # pylint: disable=import-outside-toplevel
+    import httpx
+    from main import app
+
+    generator = random.Random(args.seed)
+    plan = plan_requests(parse_mix(args.mix), routes, args.requests, generator)
+    pending = iter(plan)
+    samples = []
+    etags = {}
+
+    async def worker(client, worker_generator):
+        for label, build in pending:
+            start = time.perf_counter()
+            response = await send(client, build, worker_generator, etags)
+            samples.append((label, response.status_code, time.perf_counter() - start))
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://benchmark",
+            headers={"x-api-key": API_KEY},
+        ) as client:
+            for _, build in plan[: args.warmup]:
+                await send(client, build, generator, etags)
+            start = time.perf_counter()
+            await asyncio.gather(
+                *(
+                    worker(client, random.Random(args.seed + worker_id))
+                    for worker_id in range(args.concurrency)
+                )
+            )
+            elapsed = time.perf_counter() - start
+    return samples, elapsed
+
+
+def commit():
+    """
+    Gets the current git commit, if any.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=APP_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    """
+    Seeds the database, runs the load test and reports the results.
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mix", default="list=40,get=40,create=10,update=10")
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--driver", default="threadpool")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        configure(os.path.join(directory, "benchmark.db"), args.driver)
+        seed(SIZES)
+        samples, elapsed = asyncio.run(run(args, build_routes(SIZES)))
+
+    summary = summarize(samples, elapsed)
+    width = max(len(label) for label in summary) + 2
+    print(
+        f"{'route':<{width}}{'requests':>9}{'errors':>8}{'rps':>9}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    )
+    for label, stats in summary.items():
+        print(
+            f"{label:<{width}}{stats['requests']:>9}{stats['errors']:>8}"
+            f"{stats['rps']:>9.1f}{stats['p50_ms']:>9.2f}"
+            f"{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}"
+        )
+    if args.output:
+        report = {
+            "commit": commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "settings": vars(args),
+            "sizes": SIZES,
+            "seconds": elapsed,
+            "routes": summary,
+        }
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
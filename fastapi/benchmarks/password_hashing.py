@@ -0,0 +1,84 @@
+"""
+Benchmark of the password hashing pool.
+
+Hashes passwords concurrently with a growing number of worker processes and
+reports the hashes per second and the worst event loop stall for each pool
+size. The first row hashes on the event loop itself, as the routes did
+before the pool existed.
+
+Usage:
+    python benchmarks/password_hashing.py --passwords 64 --max-workers 8
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+
+
+async def measure_stall(stop: asyncio.Event, interval: float = 0.005):
+    """
+    Measures the longest delay of a timer on the event loop.
+    """
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def run(passwords: int, workers: int):
+    """
+    Hashes the passwords with a pool of the given size, or on the event loop
+    when the size is 0.
+    """
+    # pylint: disable=import-outside-toplevel
+    from config.settings import PASSWORD_HASHING
+    from helpers.password import PasswordHasher, hash_password
+
+    config = {**PASSWORD_HASHING, "workers": workers or 1}
+    hasher = PasswordHasher(config)
+    stop = asyncio.Event()
+    stall = asyncio.create_task(measure_stall(stop))
+    if workers:
+        hasher.start()
+        await hasher.hash_async("warmup")
+    start = time.perf_counter()
+    if workers:
+        await asyncio.gather(
+            *(hasher.hash_async(f"password{i}") for i in range(passwords))
+        )
+    else:
+        for i in range(passwords):
+            hash_password(f"password{i}", config["n"], config["r"], config["p"])
+            await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    worst = await stall
+    hasher.shutdown()
+    return passwords / elapsed, worst
+
+
+def main():
+    """
+    Runs the benchmark for every pool size.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--passwords", type=int, default=64)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    sys.path.insert(0, APP_DIR)
+    print(f"{'workers':>10} {'hashes/s':>10} {'max stall (ms)':>15}")
+    for workers in range(args.max_workers + 1):
+        rate, worst = asyncio.run(run(args.passwords, workers))
+        label = workers or "event loop"
+        print(f"{label:>10} {rate:10.1f} {worst * 1000:15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark of the response serialization.
+
+Compares the time to serialize a page of users the way FastAPI does for a
+plain dict (`jsonable_encoder` and the standard library JSON response)
+with the response schemas encoded by pydantic-core, with and without a
+field projection.
+
+Usage:
+    python benchmarks/serialization.py --rows 100 1000 10000 --repeat 20
+"""
+
+import argparse
+import functools
+import os
+import sys
+import timeit
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+
+
+def page(rows: int):
+    """
+    Builds a page of user rows, as returned by the services.
+    """
+    return {
+        "items": [
+            {
+                "id": i,
+                "username": f"user{i}",
+                "email": f"user{i}@example.com",
+                "password": "scrypt$16384$8$1$c2FsdA==$aGFzaA==",
+                "account_type": "admin",
+                "profile_picture": "profile.jpg",
+                "role_id": 1,
+                "is_active": True,
+            }
+            for i in range(rows)
+        ],
+        "next_cursor": rows,
+    }
+
+
+def main():
+    """
+    Runs the benchmark for every page size.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    sys.path.insert(0, APP_DIR)
+    # pylint: disable=import-outside-toplevel
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from helpers.serialization import render_page
+    from models.user import UserResponse
+
+    fields = ("id", "username", "email")
+    cases = {
+        "jsonable_encoder": lambda data: JSONResponse(jsonable_encoder(data)),
+        "schema": lambda data: render_page(UserResponse, data),
+        "schema+fields": lambda data: render_page(UserResponse, data, fields),
+    }
+    print(f"{'rows':>8} " + " ".join(f"{name:>18}" for name in cases))
+    for rows in args.rows:
+        data = page(rows)
+        timings = []
+        for function in cases.values():
+            function(data)
+            seconds = min(
+                timeit.repeat(
+                    functools.partial(function, data), number=1, repeat=args.repeat
+                )
+            )
+            timings.append(f"{seconds * 1000:15.2f} ms")
+        print(f"{rows:>8} " + " ".join(timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Startup profile of the serving application.
+
+Imports `main:app` in fresh interpreters, runs its lifespan startup through
+a TestClient against a SQLite stand-in seeded like the load test, and
+reports the import and startup times and the `-X importtime` hotspots, per
+module and per top-level package. With `--budget-ms`, exits with status 1
+when the median time to a started application is over the budget, or when a
+module that only migrations or a first request need (SQLAlchemy, Alembic,
+numpy, scipy) is imported.
+
+tests/test_startup.py runs the same checks in the test suite.
+
+Usage:
+    python benchmarks/startup.py --runs 5 --top 15
+    python benchmarks/startup.py --budget-ms 1500 --json startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import load
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+FORBIDDEN = ("sqlalchemy", "alembic", "migrations", "numpy", "scipy")
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from main import app
+elapsed = time.perf_counter() - start
+modules = sorted(sys.modules)
+startup = None
+if "--import-only" not in sys.argv:
+    from fastapi.testclient import TestClient
+    client = TestClient(app)
+    start = time.perf_counter()
+    with client:
+        startup = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "startup": startup, "modules": modules}))
+"""
+
+
+def run_child(*options, import_only: bool = False):
+    """
+    Imports and starts the application in a fresh interpreter.
+
+    Returns:
+    - Tuple[dict, str, float]: The import and startup times and the imported
+      modules, the standard error and the wall time of the process in
+      seconds.
+    """
+    start = time.perf_counter()
+    child = subprocess.run(
+        [sys.executable, *options, "-c", CHILD]
+        + (["--import-only"] if import_only else []),
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = time.perf_counter() - start
+    return json.loads(child.stdout.strip().splitlines()[-1]), child.stderr, wall
+
+
+def parse_importtime(stderr: str):
+    """
+    Parses the output of `-X importtime`.
+
+    Returns:
+    - List[dict]: The module, self and cumulative microseconds of every
+      import.
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        imports.append(
+            {
+                "module": name.strip(),
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+            }
+        )
+    return imports
+
+
+def hotspots(imports, top: int):
+    """
+    Gets the slowest modules and top-level packages.
+
+    Returns:
+    - dict: The modules by self and cumulative time, and the packages by the
+      sum of the self time of their modules.
+    """
+    packages = {}
+    for entry in imports:
+        package = entry["module"].split(".")[0]
+        packages[package] = packages.get(package, 0) + entry["self_us"]
+    return {
+        "self": sorted(imports, key=lambda entry: -entry["self_us"])[:top],
+        "cumulative": sorted(imports, key=lambda entry: -entry["cumulative_us"])[:top],
+        "packages": [
+            {"package": package, "self_us": self_us}
+            for package, self_us in sorted(packages.items(), key=lambda item: -item[1])
+        ][:top],
+    }
+
+
+def main():
+    """
+    Runs the profile.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--forbid", default=",".join(FORBIDDEN))
+    parser.add_argument("--json", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        load.configure(os.path.join(directory, "startup.db"), "threadpool")
+        load.seed(load.SIZES)
+        # The first run compiles the bytecode; it is not measured.
+        run_child()
+        runs = [run_child() for _ in range(args.runs)]
+        _, stderr, _ = run_child("-X", "importtime", import_only=True)
+    imports_ms = sorted(result["seconds"] * 1000 for result, _, _ in runs)
+    startup_ms = sorted(result["startup"] * 1000 for result, _, _ in runs)
+    ready_ms = sorted(
+        (result["seconds"] + result["startup"]) * 1000 for result, _, _ in runs
+    )
+    process_ms = sorted(wall * 1000 for _, _, wall in runs)
+    profile = hotspots(parse_importtime(stderr), args.top)
+    forbidden = [
+        module
+        for module in runs[0][0]["modules"]
+        if module.split(".")[0] in args.forbid.split(",")
+    ]
+    report = {
+        "runs": args.runs,
+        "import_ms": {
+            "median": statistics.median(imports_ms),
+            "min": imports_ms[0],
+            "max": imports_ms[-1],
+        },
+        "startup_ms": {
+            "median": statistics.median(startup_ms),
+            "min": startup_ms[0],
+            "max": startup_ms[-1],
+        },
+        "ready_ms": {"median": statistics.median(ready_ms)},
+        "process_ms": {"median": statistics.median(process_ms)},
+        "modules": len(runs[0][0]["modules"]),
+        "forbidden": forbidden,
+        "budget_ms": args.budget_ms,
+        "hotspots": profile,
+    }
+
+    print(
+        f"import main:app: median {report['import_ms']['median']:.1f} ms, "
+        f"min {report['import_ms']['min']:.1f} ms, "
+        f"max {report['import_ms']['max']:.1f} ms "
+        f"(process {report['process_ms']['median']:.1f} ms, "
+        f"{report['modules']} modules)"
+    )
+    print(
+        f"startup on the seeded database: median "
+        f"{report['startup_ms']['median']:.1f} ms, "
+        f"min {report['startup_ms']['min']:.1f} ms, "
+        f"max {report['startup_ms']['max']:.1f} ms "
+        f"(ready after {report['ready_ms']['median']:.1f} ms)"
+    )
+    print("\npackages by self time:")
+    for entry in profile["packages"]:
+        print(f"  {entry['self_us'] / 1000:8.1f} ms  {entry['package']}")
+    print("\nmodules by cumulative time:")
+    for entry in profile["cumulative"]:
+        print(f"  {entry['cumulative_us'] / 1000:8.1f} ms  {entry['module']}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+    failures = []
+    if forbidden:
+        failures.append(f"imported at startup: {', '.join(sorted(forbidden))}")
+    if args.budget_ms is not None and report["ready_ms"]["median"] > args.budget_ms:
+        failures.append(
+            f"median time to a started application "
+            f"{report['ready_ms']['median']:.1f} ms "
+            f"is over the budget of {args.budget_ms:.1f} ms"
+        )
+    if args.budget_ms is not None and failures:
+        print("\nFAILED: " + "; ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
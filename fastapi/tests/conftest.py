@@ -0,0 +1,141 @@
+"""
+Test fixtures: the application runs on a SQLite file that is rebuilt for
+every test.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+APP_DIR = Path(__file__).resolve().parents[1] / "app"
+DATA_DIR = tempfile.mkdtemp(prefix="recipes-tests-")
+ADMIN_KEY = "test-admin-key"
+
+os.environ.update(
+    DATABASE_ENGINE="peewee.SqliteDatabase",
+    MYSQL_DATABASE=os.path.join(DATA_DIR, "primary.db"),
+    ASYNC_DATABASE_DRIVER="threadpool",
+    API_KEY=ADMIN_KEY,
+    RATE_LIMIT_RATE="100000",
+    RATE_LIMIT_BURST="100000",
+    PASSWORD_HASHING_WORKERS="1",
+    PASSWORD_SCRYPT_N="16",
+    EXPIRY_SINK="queue",
+    EXPIRY_INTERVAL_SECONDS="3600",
+    SLOW_QUERIES_THRESHOLD_MS="100000",
+)
+sys.path.insert(0, str(APP_DIR))
+
+# pylint: disable=wrong-import-position
+from peewee import Model
+
+import config.database as schema
+from tests import payloads
+
+MODELS = [
+    value
+    for value in vars(schema).values()
+    if isinstance(value, type)
+    and issubclass(value, Model)
+    and value.__module__ == schema.__name__
+]
+
+
+def rebuild_database():
+    """
+    Drops and creates every table, so the ids start from 1 again.
+    """
+    with schema.database.connection_context():
+        schema.database.drop_tables(MODELS)
+        schema.database.create_tables(MODELS)
+
+
+@pytest.fixture(name="app")
+def app_fixture():
+    """
+    The application, over an empty database and empty in-process caches.
+    """
+    # pylint: disable=import-outside-toplevel
+    import main
+    from helpers.cache import entity_cache
+    from helpers.compression import response_compressor
+    from helpers.etag import table_versions
+
+    rebuild_database()
+    entity_cache.clear()
+    with response_compressor.lock:
+        response_compressor.cache.clear()
+        response_compressor.cache_size = 0
+    table_versions.versions.clear()
+    table_versions.loaded_at = None
+    return main.app
+
+
+@pytest.fixture(name="client")
+def client_fixture(app):
+    """
+    A client of the started application.
+    """
+    # pylint: disable=import-outside-toplevel
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(name="admin")
+def admin_fixture():
+    """
+    The headers of the bootstrap admin key.
+    """
+    return {"x-api-key": ADMIN_KEY}
+
+
+@pytest.fixture(name="author")
+def author_fixture(client, admin):
+    """
+    A user whose role may create recipes, and the headers of its API key.
+    """
+    client.post("/api/user_roles/", json=payloads.user_role("Author"), headers=admin)
+    client.post(
+        "/api/permissions/", json=payloads.permission("Create Recipe"), headers=admin
+    )
+    granted = client.put("/api/user_roles/1/permissions/1", headers=admin)
+    assert granted.json()["permissions"] == [1]
+    assert (
+        client.post("/api/users/", json=payloads.user("ada"), headers=admin).status_code
+        == 200
+    )
+    return payloads.api_key(client, admin, "ada", user_id=1)
+
+
+@pytest.fixture(name="pantry")
+def pantry_fixture(app):
+    """
+    The unit and the ingredient category the ingredient payloads use.
+    """
+    # pylint: disable=no-value-for-parameter
+    with schema.database.connection_context():
+        schema.UnitModel.insert(name="g").execute()
+        schema.IngredientCategoryModel.insert(name="Pantry").execute()
+    return app
+
+
+@pytest.fixture(name="queries")
+def queries_fixture():
+    """
+    A list that records the SQL of every statement the peewee database runs.
+    """
+    statements = []
+    execute_sql = schema.database.execute_sql
+
+    def recording(sql, *args, **kwargs):
+        statements.append(sql)
+        return execute_sql(sql, *args, **kwargs)
+
+    schema.database.execute_sql = recording
+    yield statements
+    schema.database.execute_sql = execute_sql
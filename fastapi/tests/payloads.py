@@ -0,0 +1,91 @@
+"""
+Payloads of the entities the tests create through the API.
+"""
+
+
+def user_role(name: str):
+    """
+    Gets the payload of a user role.
+    """
+    return {"name": name, "description": f"The {name} role.", "is_active": True}
+
+
+def permission(name: str):
+    """
+    Gets the payload of a permission.
+    """
+    return {"name": name, "description": f"Can {name.lower()}."}
+
+
+def user(name: str, role_id: int = 1, is_active: bool = True):
+    """
+    Gets the payload of a user.
+    """
+    return {
+        "username": name,
+        "email": f"{name}@example.com",
+        "password": "password",
+        "account_type": "standard",
+        "profile_picture": "profile.jpg",
+        "role_id": role_id,
+        "is_active": is_active,
+    }
+
+
+def recipe(name: str, category_ids=(), ingredients=()):
+    """
+    Gets the payload of a recipe.
+    """
+    return {
+        "name": name,
+        "description": "A test recipe.",
+        "instructions": "Mix everything and cook it.",
+        "preparation_time": 10,
+        "difficulty": 1,
+        "category_ids": list(category_ids),
+        "ingredients": [
+            {"ingredient_id": ingredient_id, "quantity": quantity}
+            for ingredient_id, quantity in ingredients
+        ],
+    }
+
+
+def ingredient(name: str, calories: int, expiration_date: str = "2030-01-01"):
+    """
+    Gets the payload of an ingredient of unit 1 and category 1.
+    """
+    return {
+        "name": name,
+        "calories": calories,
+        "expiration_date": expiration_date,
+        "is_active": True,
+        "category_id": 1,
+        "unit_id": 1,
+    }
+
+
+def menu(name: str, menu_date: str, recipe_ids=(), user_id: int = 1):
+    """
+    Gets the payload of a menu.
+    """
+    return {
+        "name": name,
+        "menu_date": menu_date,
+        "meal_type": "Lunch",
+        "is_active": True,
+        "user_id": user_id,
+        "recipe_ids": list(recipe_ids),
+    }
+
+
+def api_key(client, admin: dict, name: str, user_id: int = None, scopes=()):
+    """
+    Creates an API key and gets the headers that use it.
+    """
+    response = client.post(
+        "/api/api_keys/",
+        json={"name": name, "scopes": list(scopes), "user_id": user_id},
+        headers=admin,
+    )
+    assert response.status_code == 200, response.text
+    return {"x-api-key": response.json()["key"]}
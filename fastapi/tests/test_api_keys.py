@@ -0,0 +1,60 @@
+"""
+Tests of the API key store.
+"""
+
+from config.database import ApiKeyModel, database
+from helpers import api_key_auth
+from helpers.api_key_auth import api_key_store, hash_api_key
+
+from tests import payloads
+
+
+def test_revoked_and_rotated_keys_stop_working(client, admin):
+    mobile = payloads.api_key(client, admin, "mobile")
+    assert client.get("/api/user_roles/", headers=mobile).status_code == 200
+
+    rotated = client.post("/api/api_keys/1/rotate", headers=admin).json()
+    assert client.get("/api/user_roles/", headers=mobile).status_code == 403
+    new_key = {"x-api-key": rotated["key"]}
+    assert client.get("/api/user_roles/", headers=new_key).status_code == 200
+
+    assert client.delete("/api/api_keys/1", headers=admin).status_code == 200
+    assert client.get("/api/user_roles/", headers=new_key).status_code == 403
+
+
+def test_a_revoked_key_can_not_be_rotated(client, admin):
+    payloads.api_key(client, admin, "mobile")
+    assert client.delete("/api/api_keys/1", headers=admin).status_code == 200
+
+    rotated = client.post("/api/api_keys/1/rotate", headers=admin)
+
+    assert rotated.status_code == 409
+    assert "key" not in rotated.json()
+    with database.connection_context():
+        assert ApiKeyModel.get_by_id(1).is_active is False
+
+
+def test_a_reload_that_overlaps_a_revoke_is_discarded(client, admin, monkeypatch):
+    mobile = payloads.api_key(client, admin, "mobile")
+    key_hash = hash_api_key(mobile["x-api-key"])
+    record = api_key_auth.api_key_record
+    revoked = []
+
+    def revoke_during_the_read(row):
+        if not revoked:
+            ApiKeyModel.update(is_active=False).execute()
+            api_key_store.remove(key_hash)
+            revoked.append(key_hash)
+        return record(row)
+
+    monkeypatch.setattr(api_key_auth, "api_key_record", revoke_during_the_read)
+    with database.connection_context():
+        assert api_key_store.load() is False
+    assert key_hash not in api_key_store.keys
+    assert api_key_store.refresh_due()
+
+    monkeypatch.setattr(api_key_auth, "api_key_record", record)
+    with database.connection_context():
+        assert api_key_store.load() is True
+    assert key_hash not in api_key_store.keys
+    assert client.get("/api/user_roles/", headers=mobile).status_code == 403
@@ -0,0 +1,86 @@
+"""
+Tests of the API key scopes and of the permission checks.
+"""
+
+from tests import payloads
+
+
+def test_a_user_key_creates_a_recipe_as_its_user(client, author):
+    response = client.post(
+        "/api/recipes/", json=payloads.recipe("Soup"), headers=author
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json()["user_id"] == 1
+
+
+def test_the_user_id_header_does_not_choose_the_user(client, admin, author):
+    headers = {**admin, "x-user-id": "1"}
+
+    response = client.post(
+        "/api/recipes/", json=payloads.recipe("Soup"), headers=headers
+    )
+
+    assert author
+    assert response.status_code == 403
+
+
+def test_unknown_users_are_forbidden(client, admin, author):
+    stranger = payloads.api_key(client, admin, "stranger", user_id=42)
+
+    response = client.post(
+        "/api/recipes/", json=payloads.recipe("Soup"), headers=stranger
+    )
+
+    assert author
+    assert response.status_code == 403
+
+
+def test_inactive_users_are_forbidden(client, admin, author):
+    updated = client.put(
+        "/api/users/{id}",
+        params={"user_id": 1},
+        json=payloads.user("ada", is_active=False),
+        headers=admin,
+    )
+    assert updated.status_code == 200
+
+    response = client.post(
+        "/api/recipes/", json=payloads.recipe("Soup"), headers=author
+    )
+
+    assert response.status_code == 403
+
+
+def test_a_role_without_the_permission_is_forbidden(client, admin, author):
+    revoked = client.delete("/api/user_roles/1/permissions/1", headers=admin)
+    assert revoked.json()["permissions"] == []
+
+    response = client.post(
+        "/api/recipes/", json=payloads.recipe("Soup"), headers=author
+    )
+
+    assert response.status_code == 403
+
+
+def test_only_admin_keys_manage_the_permissions_of_a_role(client, author):
+    for method in ("put", "delete"):
+        response = getattr(client, method)(
+            "/api/user_roles/1/permissions/1", headers=author
+        )
+        assert response.status_code == 403
+    assert (
+        client.get("/api/user_roles/1/permissions", headers=author).status_code == 403
+    )
+
+
+def test_admin_routes_need_the_admin_scope(client, admin):
+    reader = payloads.api_key(client, admin, "reader", scopes=["read"])
+
+    assert client.get("/api/user_roles/", headers=reader).status_code == 200
+    assert client.get("/api/api_keys/", headers=reader).status_code == 403
+    assert client.get("/metrics", headers=reader).status_code == 403
+    assert (
+        client.get("/api/user_roles/", headers={"x-api-key": "wrong"}).status_code
+        == 403
+    )
@@ -0,0 +1,78 @@
+"""
+Tests of the bulk create endpoints.
+"""
+
+import helpers.bulk
+from config.settings import BULK
+from tests import payloads
+
+
+def test_bulk_reports_every_row_in_payload_order(client, admin):
+    client.post("/api/users/", json=payloads.user("ada"), headers=admin)
+    users = [
+        payloads.user("bob"),
+        payloads.user("ada"),
+        {**payloads.user("cid"), "email": "bob@example.com"},
+        payloads.user("dan"),
+    ]
+
+    summary = client.post("/api/users/bulk", json=users, headers=admin).json()
+
+    assert summary["created"] == 2
+    assert summary["conflicts"] == 2
+    assert [result["status"] for result in summary["results"]] == [
+        "created",
+        "conflict",
+        "conflict",
+        "created",
+    ]
+    assert summary["results"][1]["detail"] == "The username already exists"
+    assert summary["results"][2]["detail"] == "Duplicated email in payload"
+    for result in (summary["results"][0], summary["results"][3]):
+        user = client.get(
+            "/api/users/{id}", params={"user_id": result["id"]}, headers=admin
+        ).json()
+        assert user["username"] == users[result["index"]]["username"]
+
+
+def test_bulk_inserts_one_statement_per_chunk(client, admin, queries, monkeypatch):
+    monkeypatch.setitem(BULK, "chunk_size", 4)
+    permissions = [payloads.permission(f"Permission {index}") for index in range(10)]
+    queries.clear()
+
+    summary = client.post(
+        "/api/permissions/bulk", json=permissions, headers=admin
+    ).json()
+
+    inserts = [sql for sql in queries if sql.startswith('INSERT INTO "permissions"')]
+    assert summary["created"] == 10
+    assert len(inserts) == 3
+    assert [result["id"] for result in summary["results"]] == list(range(1, 11))
+
+
+def test_bulk_retries_a_conflicting_chunk_row_by_row(client, admin, monkeypatch):
+    client.post("/api/permissions/", json=payloads.permission("Taken"), headers=admin)
+    monkeypatch.setattr(
+        helpers.bulk,
+        "find_existing",
+        lambda model, rows, unique_fields: {
+            field.name: set() for field in unique_fields
+        },
+    )
+    permissions = [payloads.permission(name) for name in ("First", "Taken", "Last")]
+
+    summary = client.post(
+        "/api/permissions/bulk", json=permissions, headers=admin
+    ).json()
+
+    assert [result["status"] for result in summary["results"]] == [
+        "created",
+        "conflict",
+        "created",
+    ]
+    assert summary["results"][1]["detail"] == "The row already exists"
+    names = [
+        permission["name"]
+        for permission in client.get("/api/permissions/", headers=admin).json()["items"]
+    ]
+    assert names == ["Taken", "First", "Last"]
@@ -0,0 +1,73 @@
+"""
+Tests of the entity cache.
+"""
+
+from tests import payloads
+
+
+def create_user(client, admin):
+    """
+    Creates a role and user 1 in it.
+    """
+    client.post("/api/user_roles/", json=payloads.user_role("Cook"), headers=admin)
+    client.post("/api/users/", json=payloads.user("ada"), headers=admin)
+
+
+def test_a_cached_user_has_no_password(client, admin):
+    # pylint: disable=import-outside-toplevel
+    from helpers.cache import entity_cache, entity_key
+
+    create_user(client, admin)
+    client.get("/api/users/1", params={"user_id": 1}, headers=admin)
+
+    cached = entity_cache.get(entity_key("users", 1))
+    assert cached["username"] == "ada"
+    assert "password" not in cached
+
+
+def test_a_write_during_a_read_keeps_the_row_out_of_the_cache(
+    client, admin, monkeypatch
+):
+    # pylint: disable=import-outside-toplevel
+    from config.async_database import async_database
+    from helpers.cache import entity_cache, entity_key
+
+    create_user(client, admin)
+    fetch_one = async_database.fetch_one
+
+    async def racing(query):
+        row = await fetch_one(query)
+        entity_cache.delete(entity_key("users", 1))
+        return row
+
+    monkeypatch.setattr(async_database, "fetch_one", racing)
+    client.get("/api/users/1", params={"user_id": 1}, headers=admin)
+    assert entity_cache.get(entity_key("users", 1)) is None
+
+    monkeypatch.undo()
+    client.get("/api/users/1", params={"user_id": 1}, headers=admin)
+    assert entity_cache.get(entity_key("users", 1)) is not None
+
+
+def test_old_invalidations_make_every_older_token_stale():
+    # pylint: disable=import-outside-toplevel
+    from helpers.cache import MemoryCache
+
+    cache = MemoryCache({"ttl": 60, "max_entries": 2, "max_bytes": 1024})
+    token = cache.token()
+    for key in ("a", "b", "c"):
+        cache.delete(key)
+
+    cache.set("a", 1, token)
+    cache.set("d", 1, token)
+    cache.set("e", 1, cache.token())
+
+    assert cache.get("a") is None
+    assert cache.get("d") is None
+    assert cache.get("e") == 1
+
+    token = cache.token()
+    cache.clear()
+    cache.set("e", 2, token)
+
+    assert cache.get("e") is None
@@ -0,0 +1,54 @@
+"""
+Tests of the compressed responses.
+"""
+
+from helpers.compression import response_compressor
+from tests import payloads
+
+
+def create_users(client, admin, count: int):
+    """
+    Creates enough users for the list to be compressed.
+    """
+    created = client.post(
+        "/api/users/bulk",
+        json=[payloads.user(f"user{index}") for index in range(count)],
+        headers=admin,
+    )
+    assert created.json()["created"] == count
+
+
+def test_users_list_is_compressed_once_per_version(client, admin):
+    create_users(client, admin, 20)
+    headers = {**admin, "Accept-Encoding": "gzip"}
+    hits = response_compressor.stats()["cache_hits"]
+
+    first = client.get("/api/users/", headers=headers)
+    second = client.get("/api/users/", headers=headers)
+
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.headers["etag"] == second.headers["etag"]
+    assert first.content == second.content
+    assert response_compressor.stats()["cache_hits"] == hits + 1
+
+    client.post("/api/users/", json=payloads.user("late"), headers=admin)
+    third = client.get("/api/users/", headers=headers)
+
+    assert third.headers["etag"] != first.headers["etag"]
+    assert response_compressor.stats()["cache_hits"] == hits + 1
+
+
+def test_uncompressed_responses_vary_on_accept_encoding(client, admin):
+    create_users(client, admin, 20)
+
+    identity = client.get(
+        "/api/users/", headers={**admin, "Accept-Encoding": "identity"}
+    )
+    small = client.get(
+        "/api/users/?limit=1", headers={**admin, "Accept-Encoding": "gzip"}
+    )
+
+    assert "content-encoding" not in identity.headers
+    assert identity.headers["vary"] == "Accept-Encoding"
+    assert "content-encoding" not in small.headers
+    assert small.headers["vary"] == "Accept-Encoding"
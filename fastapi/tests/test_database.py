@@ -0,0 +1,53 @@
+"""
+Tests of the per-request database connections.
+"""
+
+import contextvars
+
+from config.database import database, db_state, get_pool_stats
+from config.settings import SLOW_QUERIES
+from helpers.api_key_auth import api_key_store
+from helpers.slow_queries import slow_query_log
+from tests import payloads
+
+
+def test_contexts_do_not_share_a_connection_state():
+    first = contextvars.Context().run(database._state.current)
+    second = contextvars.Context().run(database._state.current)
+
+    assert first is not second
+    assert db_state.get() is None or db_state.get() not in (first, second)
+
+
+def test_requests_return_their_connection_to_the_pool(client, admin):
+    for _ in range(3):
+        assert client.get("/api/user_roles/", headers=admin).status_code == 200
+
+    assert get_pool_stats()["in_use"] == 0
+
+
+def test_metrics_return_the_connection_of_an_api_key_refresh(client, admin):
+    api_key_store.loaded_at = None
+
+    assert client.get("/metrics", headers=admin).status_code == 200
+    assert api_key_store.loaded_at is not None
+    assert get_pool_stats()["in_use"] == 0
+
+
+def test_slow_queries_redact_the_sensitive_parameters(client, admin):
+    slow_query_log.clear()
+    slow_query_log.threshold = 0
+    try:
+        created = client.post("/api/users/", json=payloads.user("bob"), headers=admin)
+        assert created.status_code == 200
+    finally:
+        slow_query_log.threshold = SLOW_QUERIES["threshold_ms"] / 1000
+    inserts = [
+        entry
+        for entry in slow_query_log.snapshot()["entries"]
+        if entry["sql"].startswith('INSERT INTO "users"')
+    ]
+
+    assert len(inserts) == 1
+    assert "bob" not in inserts[0]["params"]
+    assert {"type": "str", "length": 3} in inserts[0]["params"]
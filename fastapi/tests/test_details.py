@@ -0,0 +1,72 @@
+"""
+Tests of the number of queries of the detail reads.
+"""
+
+import pytest
+
+from tests import payloads
+from tests.conftest import schema
+
+
+@pytest.fixture(name="menu")
+def menu_fixture(client, admin, author, pantry):
+    """
+    A menu of three recipes, each with three categories and three
+    ingredients.
+    """
+    # pylint: disable=no-value-for-parameter
+    assert pantry
+    with schema.database.connection_context():
+        schema.CategoryModel.insert_many(
+            [{"name": name} for name in ("Dinner", "Lunch", "Vegan")]
+        ).execute()
+    for index in range(5):
+        client.post(
+            "/api/ingredients/",
+            json=payloads.ingredient(f"Ingredient {index}", 10),
+            headers=admin,
+        )
+    for index in range(3):
+        response = client.post(
+            "/api/recipes/",
+            json=payloads.recipe(
+                f"Recipe {index}",
+                category_ids=[1, 2, 3],
+                ingredients=[(index + 1, 1), (index + 2, 2), (5, 3)],
+            ),
+            headers=author,
+        )
+        assert response.status_code == 200, response.text
+    response = client.post(
+        "/api/menus/",
+        json=payloads.menu("Monday", "2030-01-07", [1, 2, 3]),
+        headers=admin,
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_a_recipe_detail_takes_three_queries(client, admin, menu, queries):
+    queries.clear()
+
+    response = client.get("/api/recipes/1/detail", headers=admin)
+
+    assert response.status_code == 200, response.text
+    recipe = response.json()
+    assert len(recipe["categories"]) == 3
+    assert len(recipe["ingredients"]) == 3
+    assert recipe["author"] == "ada"
+    assert len(queries) == 3, queries
+    assert menu
+
+
+def test_a_menu_detail_takes_three_queries(client, admin, menu, queries):
+    queries.clear()
+
+    response = client.get(f"/api/menus/{menu['id']}/detail", headers=admin)
+
+    assert response.status_code == 200, response.text
+    detail = response.json()
+    assert [len(recipe["ingredients"]) for recipe in detail["recipes"]] == [3, 3, 3]
+    assert detail["calories"] == 3 * (10 + 20 + 30)
+    assert len(queries) == 3, queries
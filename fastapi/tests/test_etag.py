@@ -0,0 +1,112 @@
+"""
+Tests of the ETags and conditional GETs.
+"""
+
+from tests import payloads
+
+
+def test_an_unchanged_list_is_not_modified(client, admin):
+    client.post("/api/user_roles/", json=payloads.user_role("Cook"), headers=admin)
+    first = client.get("/api/user_roles/", headers=admin)
+
+    again = client.get(
+        "/api/user_roles/",
+        headers={**admin, "If-None-Match": first.headers["etag"]},
+    )
+
+    assert first.status_code == 200
+    assert first.headers["etag"].startswith('W/"')
+    assert again.status_code == 304
+    assert again.headers["etag"] == first.headers["etag"]
+    assert again.content == b""
+
+
+def test_a_write_changes_the_etag(client, admin):
+    client.post("/api/user_roles/", json=payloads.user_role("Cook"), headers=admin)
+    etag = client.get("/api/user_roles/", headers=admin).headers["etag"]
+    client.post("/api/user_roles/", json=payloads.user_role("Chef"), headers=admin)
+
+    after = client.get("/api/user_roles/", headers={**admin, "If-None-Match": etag})
+
+    assert after.status_code == 200
+    assert after.headers["etag"] != etag
+    assert [role["name"] for role in after.json()["items"]] == ["Cook", "Chef"]
+
+
+def test_every_entity_has_its_own_etag(client, admin):
+    for name in ("Create Recipe", "Delete Recipe"):
+        client.post("/api/permissions/", json=payloads.permission(name), headers=admin)
+    first, second = (
+        client.get(
+            "/api/permissions/{id}",
+            params={"permission_id": permission_id},
+            headers=admin,
+        )
+        for permission_id in (1, 2)
+    )
+
+    assert first.headers["etag"] != second.headers["etag"]
+
+    client.put(
+        "/api/permissions/{id}",
+        params={"permission_id": 2},
+        json=payloads.permission("Remove Recipe"),
+        headers=admin,
+    )
+    updated = client.get(
+        "/api/permissions/{id}",
+        params={"permission_id": 2},
+        headers={**admin, "If-None-Match": second.headers["etag"]},
+    )
+
+    assert updated.status_code == 200
+    assert updated.json()["name"] == "Remove Recipe"
+
+
+def test_if_none_match_uses_the_weak_comparison(client, admin):
+    client.post("/api/permissions/", json=payloads.permission("Cook"), headers=admin)
+    etag = client.get("/api/permissions/", headers=admin).headers["etag"]
+
+    for if_none_match in (etag.removeprefix("W/"), f'"other", {etag}', "*"):
+        conditional = client.get(
+            "/api/permissions/", headers={**admin, "If-None-Match": if_none_match}
+        )
+        assert conditional.status_code == 304
+
+    assert (
+        client.get(
+            "/api/permissions/", headers={**admin, "If-None-Match": '"other"'}
+        ).status_code
+        == 200
+    )
+
+
+def test_every_page_has_its_own_etag(client, admin):
+    for name in ("Cook", "Chef"):
+        client.post("/api/user_roles/", json=payloads.user_role(name), headers=admin)
+    first = client.get("/api/user_roles/", params={"limit": 1}, headers=admin)
+    etag = first.headers["etag"]
+
+    second = client.get(
+        "/api/user_roles/",
+        params={"limit": 1, "cursor": first.json()["next_cursor"]},
+        headers={**admin, "If-None-Match": etag},
+    )
+    projected = client.get(
+        "/api/user_roles/",
+        params={"limit": 1, "fields": "name"},
+        headers={**admin, "If-None-Match": etag},
+    )
+
+    assert second.status_code == 200
+    assert second.json()["items"][0]["name"] == "Chef"
+    assert projected.status_code == 200
+    assert projected.json()["items"] == [{"id": 1, "name": "Cook"}]
+    assert (
+        client.get(
+            "/api/user_roles/",
+            params={"limit": 1},
+            headers={**admin, "If-None-Match": etag},
+        ).status_code
+        == 304
+    )
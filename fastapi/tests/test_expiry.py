@@ -0,0 +1,90 @@
+"""
+Tests of the expiring ingredient alerts.
+"""
+
+import queue
+from datetime import date, timedelta
+
+import pytest
+
+from tests import payloads
+from tests.conftest import schema
+
+
+@pytest.fixture(name="scheduler")
+def scheduler_fixture(client, admin, pantry):
+    """
+    The expiry scheduler of the application, over the inventory of a user
+    with milk, which expires in two days, and rice, which expires in a month.
+    """
+    # pylint: disable=import-outside-toplevel
+    from helpers.expiry import expiry_scheduler
+
+    assert pantry
+    today = date.today()
+    client.post("/api/user_roles/", json=payloads.user_role("Cook"), headers=admin)
+    client.post("/api/users/", json=payloads.user("ada"), headers=admin)
+    for name, days in (("Milk", 2), ("Rice", 30)):
+        expiration_date = (today + timedelta(days=days)).isoformat()
+        client.post(
+            "/api/ingredients/",
+            json=payloads.ingredient(name, 1, expiration_date),
+            headers=admin,
+        )
+    for ingredient_id in (1, 2):
+        response = client.put(
+            "/api/inventory/",
+            json={"user_id": 1, "ingredient_id": ingredient_id, "quantity": 1},
+            headers=admin,
+        )
+        assert response.status_code == 200, response.text
+    drain(expiry_scheduler)
+    return expiry_scheduler
+
+
+def drain(scheduler):
+    """
+    Takes every notification of the queue sink of a scheduler.
+    """
+    notifications = []
+    while True:
+        try:
+            notifications.append(scheduler.sink.queue.get_nowait())
+        except queue.Empty:
+            return notifications
+
+
+def test_an_alert_is_not_sent_again_after_a_restart(scheduler):
+    assert scheduler.tick() == 1
+    assert [
+        (notification["ingredient_id"], notification["days_left"])
+        for notification in drain(scheduler)
+    ] == [(1, 2)]
+
+    with schema.database.connection_context():
+        scheduler.load()
+
+    assert scheduler.tick() == 0
+    assert [item["ingredient_id"] for item in scheduler.upcoming(1, 7)] == [1]
+
+
+def test_another_process_does_not_send_an_alert_again(scheduler):
+    # pylint: disable=import-outside-toplevel
+    from config.settings import EXPIRY
+    from helpers.expiry import ExpiryScheduler, QueueSink
+
+    other = ExpiryScheduler(EXPIRY, sink=QueueSink(10))
+    with schema.database.connection_context():
+        other.load()
+
+    assert scheduler.tick() == 1
+    assert other.tick() == 0
+    assert drain(other) == []
+
+
+def test_expired_ingredients_are_dropped_without_an_alert(scheduler):
+    later = date.today() + timedelta(days=40)
+
+    assert scheduler.tick(later) == 0
+    assert scheduler.stats()["users"] == 0
+    assert scheduler.upcoming(1, 366) == []
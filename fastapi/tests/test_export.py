@@ -0,0 +1,84 @@
+"""
+Tests of the streaming exports.
+"""
+
+import csv
+import io
+import json
+
+import pytest
+
+from config.database import PermissionModel, database
+from config.settings import EXPORT
+from helpers.export import stream_rows
+from helpers.rate_limit import admission
+
+from tests import payloads
+
+
+@pytest.fixture(name="permissions")
+def permissions_fixture(client, admin, monkeypatch):
+    """
+    Five permissions, exported two at a time.
+    """
+    monkeypatch.setitem(EXPORT, "batch_size", 2)
+    for index in range(1, 6):
+        client.post(
+            "/api/permissions/",
+            json=payloads.permission(f"Permission {index}"),
+            headers=admin,
+        )
+    return admin
+
+
+def test_ndjson_exports_resume_after_since_id(client, permissions):
+    exported = client.get("/api/permissions/export", headers=permissions)
+    resumed = client.get(
+        "/api/permissions/export", params={"since_id": 3}, headers=permissions
+    )
+
+    assert exported.headers["content-type"] == "application/x-ndjson"
+    assert "permissions.ndjson" in exported.headers["content-disposition"]
+    rows = [json.loads(line) for line in exported.text.splitlines()]
+    assert [row["id"] for row in rows] == [1, 2, 3, 4, 5]
+    assert rows[0]["name"] == "Permission 1"
+    assert [json.loads(line)["id"] for line in resumed.text.splitlines()] == [4, 5]
+
+
+def test_csv_exports_have_one_header(client, permissions):
+    exported = client.get(
+        "/api/permissions/export", params={"format": "csv"}, headers=permissions
+    )
+
+    assert exported.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(exported.text)))
+    assert rows[0] == ["id", "name", "description"]
+    assert [row[0] for row in rows[1:]] == ["1", "2", "3", "4", "5"]
+
+
+def test_user_exports_leave_out_the_password(client, admin):
+    client.post("/api/user_roles/", json=payloads.user_role("Cook"), headers=admin)
+    client.post("/api/users/", json=payloads.user("ada"), headers=admin)
+
+    exported = client.get("/api/users/export", params={"format": "csv"}, headers=admin)
+
+    header, row = list(csv.reader(io.StringIO(exported.text)))
+    assert "password" not in header
+    assert row[header.index("username")] == "ada"
+
+
+def test_a_stream_opens_its_own_connection_and_closes_it(permissions):
+    assert permissions
+    assert database.is_closed()
+    in_flight = admission.in_flight
+
+    batches = stream_rows(PermissionModel.select().order_by(PermissionModel.id), 2)
+    columns, first = next(batches)
+
+    assert not database.is_closed()
+    assert admission.in_flight == in_flight + 1
+    assert columns == ["id", "name", "description"]
+    assert [row["id"] for row in first] == [1, 2]
+    assert [[row["id"] for row in rows] for _, rows in batches] == [[3, 4], [5]]
+    assert database.is_closed()
+    assert admission.in_flight == in_flight
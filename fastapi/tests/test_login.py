@@ -0,0 +1,90 @@
+"""
+Tests of the user login.
+"""
+
+import pytest
+
+from config.database import UserModel, database
+from helpers.password import hash_password, needs_rehash
+
+from tests import payloads
+
+
+@pytest.fixture(name="ada")
+def ada_fixture(client, admin):
+    """
+    User 1, ada, whose password is "password".
+    """
+    client.post("/api/user_roles/", json=payloads.user_role("Cook"), headers=admin)
+    client.post("/api/users/", json=payloads.user("ada"), headers=admin)
+    return admin
+
+
+def login(client, headers, password: str = "password", username: str = "ada"):
+    """
+    Logs a user in.
+    """
+    return client.post(
+        "/api/users/login",
+        json={"username": username, "password": password},
+        headers=headers,
+    )
+
+
+def stored_password():
+    """
+    Gets the stored password of user 1.
+    """
+    with database.connection_context():
+        return UserModel.get_by_id(1).password
+
+
+def store_password(password: str):
+    """
+    Replaces the stored password of user 1, as an older release did.
+    """
+    # pylint: disable=no-value-for-parameter
+    with database.connection_context():
+        UserModel.update(password=password).where(UserModel.id == 1).execute()
+
+
+def test_a_valid_login_returns_the_user(client, ada):
+    response = login(client, ada)
+
+    assert response.status_code == 200
+    assert response.json()["username"] == "ada"
+    assert "password" not in response.json()
+    assert not needs_rehash(stored_password())
+
+
+def test_invalid_credentials_are_unauthorized(client, ada):
+    assert login(client, ada, "wrong").status_code == 401
+    assert login(client, ada, username="grace").status_code == 401
+
+    client.put(
+        "/api/users/1",
+        params={"user_id": 1},
+        json=payloads.user("ada", is_active=False),
+        headers=ada,
+    )
+
+    assert login(client, ada).status_code == 401
+
+
+def test_a_plain_text_password_works_and_is_hashed(client, ada):
+    store_password("legacy")
+
+    assert login(client, ada, "wrong").status_code == 401
+    assert stored_password() == "legacy"
+    assert login(client, ada, "legacy").status_code == 200
+    assert stored_password().startswith("scrypt$")
+    assert login(client, ada, "legacy").status_code == 200
+
+
+def test_a_hash_with_other_parameters_is_hashed_again(client, ada):
+    store_password(hash_password("password", n=8, r=8, p=1))
+    assert needs_rehash(stored_password())
+
+    assert login(client, ada).status_code == 200
+    assert not needs_rehash(stored_password())
+    assert login(client, ada).status_code == 200
@@ -0,0 +1,98 @@
+"""
+Tests of the recipe matrix that ranks the recipes an inventory covers.
+"""
+
+import pytest
+
+from config.settings import MATCHER
+from helpers.matcher import RecipeMatrix
+
+
+def recipe(recipe_id: int, is_active: bool = True):
+    """
+    Gets the row of a public recipe.
+    """
+    return {"id": recipe_id, "is_active": is_active, "is_public": True}
+
+
+@pytest.fixture(name="matrix")
+def matrix_fixture():
+    """
+    A matrix of three recipes over ingredients 1 to 3.
+    """
+    matrix = RecipeMatrix()
+    matrix.set_recipe(recipe(1), {1: 100, 2: 50})
+    matrix.set_recipe(recipe(2), {1: 10})
+    matrix.set_recipe(recipe(3), {2: 10, 3: 10})
+    return matrix
+
+
+def test_coverage_is_the_mean_of_the_capped_ratios(matrix):
+    ranked, total = matrix.match({1: 50, 2: 100}, 10)
+
+    assert total == 3
+    assert ranked[1] == {
+        "recipe_id": 1,
+        "coverage": pytest.approx(0.75),
+        "missing": [{"ingredient_id": 1, "required": 100, "available": 50}],
+    }
+    assert ranked[2] == {
+        "recipe_id": 3,
+        "coverage": pytest.approx(0.5),
+        "missing": [{"ingredient_id": 3, "required": 10, "available": 0}],
+    }
+
+
+def test_ties_rank_by_fewest_missing_then_by_id(matrix):
+    matrix.set_recipe(recipe(4), {1: 10, 2: 10, 3: 10})
+    matrix.set_recipe(recipe(5), {3: 10})
+
+    ranked, total = matrix.match({1: 5, 2: 5, 3: 5}, 3)
+
+    assert total == 5
+    assert [item["recipe_id"] for item in ranked] == [2, 5, 3]
+    assert [item["coverage"] for item in ranked] == [0.5, 0.5, 0.5]
+
+
+def test_min_coverage_filters_and_counts(matrix):
+    ranked, total = matrix.match({1: 10}, 10, min_coverage=0.5)
+
+    assert total == 1
+    assert [item["recipe_id"] for item in ranked] == [2]
+
+
+def test_writes_are_scored_without_rebuilding_the_base(matrix):
+    matrix.match({}, 10)
+    base = matrix.base
+
+    matrix.set_recipe(recipe(1), {1: 10})
+    matrix.set_recipe(recipe(2, is_active=False), {1: 10})
+    matrix.set_recipe(recipe(4), {3: 20})
+    ranked, total = matrix.match({1: 10, 3: 10}, 10)
+
+    assert matrix.base is base
+    assert total == 3
+    assert [(item["recipe_id"], item["coverage"]) for item in ranked] == [
+        (1, 1.0),
+        (3, 0.5),
+        (4, 0.5),
+    ]
+
+
+def test_a_large_delta_is_rebuilt_in_the_background(matrix, monkeypatch):
+    monkeypatch.setitem(MATCHER, "rebuild_changes", 1)
+    matrix.match({}, 10)
+    base = matrix.base
+
+    matrix.set_recipe(recipe(1), {1: 10})
+    matrix.set_recipe(recipe(4), {1: 20})
+    matrix.current()
+    rebuilding = matrix.rebuilding
+    if rebuilding is not None:
+        rebuilding.join()
+
+    assert matrix.base is not base
+    assert not matrix.changes
+    ranked, total = matrix.match({1: 10}, 10)
+    assert total == 4
+    assert [item["recipe_id"] for item in ranked[:3]] == [1, 2, 4]
@@ -0,0 +1,53 @@
+"""
+Tests of the Prometheus metrics.
+"""
+
+from tests import payloads
+
+
+def samples(client, admin):
+    """
+    Gets the lines of the metrics that are not comments.
+    """
+    response = client.get("/metrics", headers=admin)
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("text/plain")
+    return [line for line in response.text.splitlines() if not line.startswith("#")]
+
+
+def test_requests_are_labelled_with_their_route_template(client, admin):
+    client.post("/api/user_roles/", json=payloads.user_role("Cook"), headers=admin)
+    client.post("/api/users/", json=payloads.user("ada"), headers=admin)
+    for user_id in (1, 2):
+        client.get(f"/api/users/{user_id}", params={"user_id": 1}, headers=admin)
+
+    lines = samples(client, admin)
+
+    assert any(
+        line.startswith(
+            'http_request_duration_seconds_count{method="GET",'
+            'route="/api/users/{id}",status="200"}'
+        )
+        for line in lines
+    )
+    assert not any('route="/api/users/1"' in line for line in lines)
+
+
+def test_queries_are_labelled_with_their_table_and_operation(client, admin):
+    client.post("/api/user_roles/", json=payloads.user_role("Cook"), headers=admin)
+
+    lines = samples(client, admin)
+
+    assert any(
+        line.startswith(
+            'db_query_duration_seconds_count{table="user_roles",operation="insert"}'
+        )
+        for line in lines
+    )
+
+
+def test_the_pool_gauges_are_exported(client, admin):
+    names = {line.split(" ")[0] for line in samples(client, admin)}
+
+    assert {"db_pool_max_connections", "db_pool_idle", "db_pool_in_use"} <= names
+    assert "http_requests_in_flight" in names
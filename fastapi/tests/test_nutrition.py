@@ -0,0 +1,119 @@
+"""
+Tests of the calorie rollups.
+"""
+
+import pytest
+from peewee import MySQLDatabase
+
+from tests import payloads
+from tests.conftest import ADMIN_KEY, schema
+
+
+@pytest.fixture(name="menu")
+def menu_fixture(client, admin, author, pantry):
+    """
+    A menu of two recipes: soup (2 x 10 + 1 x 5 = 25 calories) and salad
+    (3 x 5 = 15 calories).
+    """
+    assert pantry
+    for name, calories in (("Carrot", 10), ("Onion", 5)):
+        response = client.post(
+            "/api/ingredients/",
+            json=payloads.ingredient(name, calories),
+            headers=admin,
+        )
+        assert response.status_code == 200, response.text
+    for recipe in (
+        payloads.recipe("Soup", ingredients=[(1, 2), (2, 1)]),
+        payloads.recipe("Salad", ingredients=[(2, 3)]),
+    ):
+        response = client.post("/api/recipes/", json=recipe, headers=author)
+        assert response.status_code == 200, response.text
+    response = client.post(
+        "/api/menus/",
+        json=payloads.menu("Monday", "2030-01-07", [1, 2]),
+        headers=admin,
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def calories(client, path: str, **params):
+    """
+    Gets a calorie rollup with the admin key.
+    """
+    response = client.get(
+        f"/api/nutrition/{path}", params=params, headers={"x-api-key": ADMIN_KEY}
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def week(client):
+    """
+    Gets the calories of every day of the week of the menu.
+    """
+    days = calories(client, "users/1", start_date="2030-01-06", end_date="2030-01-12")[
+        "days"
+    ]
+    return {day["day"]: day["calories"] for day in days if day["calories"]}
+
+
+def test_writes_maintain_the_rollups(client, admin, menu):
+    assert calories(client, "recipes/1")["calories"] == 25
+    assert calories(client, "menus/1")["calories"] == 40
+    assert week(client) == {"2030-01-07": 40}
+
+    client.put(
+        "/api/ingredients/{id}",
+        params={"ingredient_id": 2},
+        json=payloads.ingredient("Onion", 7),
+        headers=admin,
+    )
+
+    assert calories(client, "recipes/1")["calories"] == 27
+    assert calories(client, "recipes/2")["calories"] == 21
+    assert calories(client, "menus/1")["calories"] == 48
+    assert week(client) == {"2030-01-07": 48}
+    check = client.get("/api/database/nutrition", headers=admin).json()
+    assert all(not rollup["differences"] for rollup in check.values())
+    assert menu
+
+
+def test_moving_a_menu_moves_its_day(client, admin, menu):
+    client.put(
+        "/api/menus/{id}",
+        params={"menu_id": menu["id"]},
+        json=payloads.menu("Monday", "2030-01-08", [2]),
+        headers=admin,
+    )
+
+    assert calories(client, "menus/1")["calories"] == 15
+    assert week(client) == {"2030-01-08": 15}
+
+
+def test_the_rollups_survive_a_restart(app, client, menu):
+    # pylint: disable=import-outside-toplevel
+    from fastapi.testclient import TestClient
+
+    client.__exit__(None, None, None)
+    with TestClient(app) as restarted:
+        assert calories(restarted, "menus/1")["calories"] == 40
+        assert week(restarted) == {"2030-01-07": 40}
+    assert menu
+
+
+def test_unknown_recipes_are_not_found(client, admin):
+    response = client.get("/api/nutrition/recipes/1", headers=admin)
+
+    assert response.status_code == 404
+
+
+def test_the_rollups_sum_with_locking_reads_on_mysql(monkeypatch):
+    assert "FOR UPDATE" not in schema.locking(schema.MenuModel.select()).sql()[0]
+
+    mysql = MySQLDatabase(None)
+    monkeypatch.setattr(schema, "database", mysql)
+    with mysql.bind_ctx([schema.MenuModel]):
+        query = schema.locking(schema.MenuModel.select())
+        assert query.sql()[0].endswith("FOR UPDATE")
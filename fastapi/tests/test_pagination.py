@@ -0,0 +1,79 @@
+"""
+Tests of the keyset pagination of the list endpoints.
+"""
+
+from config.settings import PAGINATION
+from tests import payloads
+
+
+def create_permissions(client, admin, count: int):
+    """
+    Creates the permissions Permission 0 to Permission count - 1.
+    """
+    permissions = [payloads.permission(f"Permission {index}") for index in range(count)]
+    created = client.post("/api/permissions/bulk", json=permissions, headers=admin)
+    assert created.json()["created"] == count
+
+
+def test_pages_follow_the_cursor_to_the_end(client, admin):
+    create_permissions(client, admin, 7)
+    ids = []
+    cursors = []
+    cursor = None
+    while True:
+        params = {"limit": 3} if cursor is None else {"limit": 3, "cursor": cursor}
+        page = client.get("/api/permissions/", params=params, headers=admin).json()
+        ids += [permission["id"] for permission in page["items"]]
+        cursor = page["next_cursor"]
+        cursors.append(cursor)
+        if cursor is None:
+            break
+
+    assert ids == list(range(1, 8))
+    assert cursors == [3, 6, None]
+
+
+def test_a_full_last_page_has_no_next_cursor(client, admin):
+    create_permissions(client, admin, 4)
+
+    first = client.get("/api/permissions/", params={"limit": 2}, headers=admin).json()
+    last = client.get(
+        "/api/permissions/", params={"limit": 2, "cursor": 2}, headers=admin
+    ).json()
+
+    assert first["next_cursor"] == 2
+    assert [permission["id"] for permission in last["items"]] == [3, 4]
+    assert last["next_cursor"] is None
+
+
+def test_the_limit_is_bounded(client, admin):
+    create_permissions(client, admin, 3)
+
+    default = client.get("/api/permissions/", headers=admin).json()
+    too_large = client.get(
+        "/api/permissions/",
+        params={"limit": PAGINATION["max_limit"] + 1},
+        headers=admin,
+    )
+    too_small = client.get("/api/permissions/", params={"limit": 0}, headers=admin)
+
+    assert len(default["items"]) == 3
+    assert default["next_cursor"] is None
+    assert too_large.status_code == 422
+    assert too_small.status_code == 422
+
+
+def test_pages_keep_the_projection(client, admin):
+    create_permissions(client, admin, 3)
+
+    page = client.get(
+        "/api/permissions/",
+        params={"limit": 2, "fields": "id,name"},
+        headers=admin,
+    ).json()
+
+    assert page["items"] == [
+        {"id": 1, "name": "Permission 0"},
+        {"id": 2, "name": "Permission 1"},
+    ]
+    assert page["next_cursor"] == 2
@@ -0,0 +1,46 @@
+"""
+Tests of the rate limiting and of the admission control.
+"""
+
+from config.database import UserRoleModel
+from helpers.export import stream_rows
+from helpers.rate_limit import RateLimiter, admission
+
+from tests import payloads
+
+
+def test_a_weight_over_the_burst_is_capped_to_the_burst():
+    limiter = RateLimiter(rate=1, burst=5, idle_seconds=600)
+
+    assert limiter.acquire("key", weight=50) == 0
+    assert 0 < limiter.acquire("key", weight=50) <= 5
+
+
+def test_requests_over_the_threshold_are_shed(client, admin, monkeypatch):
+    monkeypatch.setattr(admission, "max_in_flight", 0)
+    rejected = admission.rejected
+
+    response = client.get("/api/user_roles/", headers=admin)
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert admission.rejected == rejected + 1
+
+
+def test_an_export_is_counted_until_its_stream_ends(client, admin):
+    for name in ("Admin", "Cook"):
+        client.post("/api/user_roles/", json=payloads.user_role(name), headers=admin)
+    in_flight = admission.in_flight
+
+    batches = stream_rows(UserRoleModel.select().order_by(UserRoleModel.id), 1)
+    columns, rows = next(batches)
+    assert columns == ["id", "name"]
+    assert rows == [{"id": 1, "name": "Admin"}]
+    assert admission.in_flight == in_flight + 1
+
+    batches.close()
+    assert admission.in_flight == in_flight
+
+    response = client.get("/api/user_roles/export", headers=admin)
+    assert len(response.text.splitlines()) == 2
+    assert admission.in_flight == in_flight
@@ -0,0 +1,158 @@
+"""
+Tests of the read replicas, on copies of the SQLite database.
+"""
+
+import asyncio
+import sqlite3
+from contextlib import closing
+from types import SimpleNamespace
+
+import pytest
+
+import config.async_database as async_database_module
+from config.async_database import (
+    Replica,
+    ReplicaRouter,
+    create_backend,
+    replica_config,
+    replication_lag,
+)
+from config.database import IngredientModel
+from config.replicas import begin_request, end_request, replica_read, stickiness
+from config.settings import ASYNC_DATABASE, DATABASE, REPLICAS
+from helpers.api_key_auth import client_key, hash_api_key
+from tests.conftest import schema
+from tests import payloads
+
+
+@pytest.fixture(name="router")
+def router_fixture(pantry, tmp_path, monkeypatch):
+    """
+    A router over the primary and two replicas, r1 and r2, whose copy of the
+    ingredient is named after them.
+    """
+    # pylint: disable=no-value-for-parameter,unused-argument
+    with schema.database.connection_context():
+        IngredientModel.insert(**payloads.ingredient("flour", 1)).execute()
+    names = []
+    for name in ("r1", "r2"):
+        path = str(tmp_path / f"{name}.db")
+        with closing(sqlite3.connect(DATABASE["name"])) as source, closing(
+            sqlite3.connect(path)
+        ) as copy:
+            source.backup(copy)
+            copy.execute("UPDATE ingredients SET name = ?", (name,))
+            copy.commit()
+        names.append(path)
+    monkeypatch.setitem(REPLICAS, "databases", tuple(names))
+    stickiness.clients.clear()
+    router = ReplicaRouter(
+        create_backend(ASYNC_DATABASE, DATABASE, replica=True),
+        [
+            Replica(name, create_backend(ASYNC_DATABASE, replica_config(name), True))
+            for name in names
+        ],
+        {**REPLICAS, "max_lag_seconds": 10},
+    )
+    asyncio.run(router.check())
+    yield router
+    asyncio.run(router.close())
+
+
+@replica_read
+async def read_ingredient(router):
+    """
+    Reads the name of the ingredient, which tells the database that served
+    it.
+    """
+    row = await router.fetch_one(IngredientModel.select(IngredientModel.name))
+    return row["name"]
+
+
+def serve(router, api_key: str = "reader", method: str = "GET"):
+    """
+    Runs a request of a client that reads the ingredient.
+    """
+    request = SimpleNamespace(
+        method=method,
+        headers={"x-api-key": api_key},
+        client=SimpleNamespace(host="testclient"),
+    )
+
+    async def handle():
+        route = begin_request(request.method, client_key(request))
+        try:
+            return await read_ingredient(router)
+        finally:
+            end_request(route)
+
+    return asyncio.run(handle())
+
+
+def test_reads_rotate_across_the_healthy_replicas(router):
+    assert [serve(router) for _ in range(4)] == ["r1", "r2", "r1", "r2"]
+    assert [replica.reads for replica in router.replicas] == [2, 2]
+
+
+def test_a_lagging_replica_leaves_the_rotation(router, monkeypatch):
+    lags = {router.replicas[0].database: 0.0, router.replicas[1].database: 60.0}
+
+    async def lag(database, primary):  # pylint: disable=unused-argument
+        return lags[database]
+
+    monkeypatch.setattr(async_database_module, "replication_lag", lag)
+    asyncio.run(router.check())
+
+    assert [serve(router) for _ in range(3)] == ["r1", "r1", "r1"]
+
+    lags[router.replicas[1].database] = 1.0
+    asyncio.run(router.check())
+
+    assert {serve(router) for _ in range(2)} == {"r1", "r2"}
+
+
+def test_a_server_without_replica_status_is_unhealthy(monkeypatch):
+    statuses = []
+
+    class Server:
+        """
+        A MySQL server that answers SHOW REPLICA STATUS.
+        """
+
+        async def fetch_sql(self, sql):  # pylint: disable=unused-argument
+            return statuses
+
+    monkeypatch.setitem(DATABASE, "engine", "peewee.MySQLDatabase")
+
+    assert asyncio.run(replication_lag(Server(), None)) is None
+
+    statuses.append({"Seconds_Behind_Source": 3})
+
+    assert asyncio.run(replication_lag(Server(), None)) == 3.0
+
+
+def test_a_failing_replica_falls_back_to_the_primary(router):
+    with closing(sqlite3.connect(REPLICAS["databases"][0])) as replica:
+        replica.execute("DROP TABLE ingredients")
+
+    assert serve(router) == "flour"
+    assert [replica.healthy for replica in router.replicas] == [False, True]
+    assert [serve(router) for _ in range(2)] == ["r2", "r2"]
+
+    asyncio.run(router.check())
+
+    assert router.replicas[0].healthy is False
+    assert "ingredients" in router.replicas[0].error
+
+    for replica in router.replicas:
+        replica.healthy = False
+
+    assert serve(router) == "flour"
+
+
+def test_a_client_reads_the_primary_after_a_write(router):
+    assert serve(router, "writer", "POST") == "flour"
+    assert serve(router, "writer") == "flour"
+    assert serve(router, "reader") == "r1"
+    assert stickiness.sticky(hash_api_key("writer"))
+    assert "writer" not in stickiness.clients
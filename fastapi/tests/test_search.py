@@ -0,0 +1,115 @@
+"""
+Tests of the recipe full-text search.
+"""
+
+import pytest
+
+from tests import payloads
+from tests.conftest import schema
+
+
+@pytest.fixture(name="cookbook")
+def cookbook_fixture(client, admin, author, pantry):
+    """
+    Two recipe categories and three ingredients the recipes may use.
+    """
+    # pylint: disable=no-value-for-parameter
+    assert pantry
+    with schema.database.connection_context():
+        schema.CategoryModel.insert_many(
+            [{"name": name} for name in ("Dinner", "Dessert")]
+        ).execute()
+    for name in ("Tomato", "Sugar", "Cream"):
+        client.post(
+            "/api/ingredients/", json=payloads.ingredient(name, 10), headers=admin
+        )
+    return author
+
+
+def post_recipe(client, headers, name, category_ids=(), ingredients=()):
+    """
+    Creates a recipe and gets its id.
+    """
+    response = client.post(
+        "/api/recipes/",
+        json=payloads.recipe(name, category_ids, ingredients),
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def search(client, headers, **params):
+    """
+    Searches the recipes and gets the ids of the results and the total.
+    """
+    response = client.get("/api/recipes/search", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    page = response.json()
+    return [recipe["id"] for recipe in page["items"]], page["total"]
+
+
+def test_recipes_rank_by_bm25(client, cookbook):
+    soup = post_recipe(client, cookbook, "Tomato Soup")
+    tart = post_recipe(client, cookbook, "Tomato Tomato Tart")
+    post_recipe(client, cookbook, "Bread")
+
+    assert search(client, cookbook, q="tomato") == ([tart, soup], 2)
+    assert search(client, cookbook, q="soup tomato")[0][0] == soup
+
+
+def test_search_folds_case_and_accents(client, cookbook):
+    brulee = post_recipe(client, cookbook, "Crème Brûlée")
+
+    assert search(client, cookbook, q="CREME brulee") == ([brulee], 1)
+
+
+def test_filters_intersect_categories_and_ingredients(client, cookbook):
+    soup = post_recipe(client, cookbook, "Soup", [1], [(1, 1)])
+    sweet = post_recipe(client, cookbook, "Sweet Soup", [1, 2], [(1, 1), (2, 1)])
+    mousse = post_recipe(client, cookbook, "Mousse", [2], [(2, 1), (3, 1)])
+
+    assert search(client, cookbook, category_id=[1], ingredient_id=[1]) == (
+        [soup, sweet],
+        2,
+    )
+    assert search(client, cookbook, q="soup", ingredient_id=[2]) == ([sweet], 1)
+    assert search(client, cookbook, ingredient_id=[3]) == ([mousse], 1)
+    assert search(client, cookbook, category_id=[2], ingredient_id=[3, 1]) == ([], 0)
+
+
+def test_an_update_replaces_the_indexed_recipe(client, cookbook):
+    recipe_id = post_recipe(client, cookbook, "Tomato Soup", [1], [(1, 1)])
+
+    response = client.put(
+        "/api/recipes/{id}",
+        params={"recipe_id": recipe_id},
+        json=payloads.recipe("Cream Pie", [2], [(3, 1)]),
+        headers=cookbook,
+    )
+
+    assert response.status_code == 200, response.text
+    assert search(client, cookbook, q="tomato") == ([], 0)
+    assert search(client, cookbook, category_id=[1]) == ([], 0)
+    assert search(client, cookbook, q="pie", category_id=[2], ingredient_id=[3]) == (
+        [recipe_id],
+        1,
+    )
+
+
+def test_repeated_categories_and_ingredients_can_be_updated(client, cookbook):
+    recipe_id = post_recipe(client, cookbook, "Soup", [1, 1], [(1, 1), (1, 2)])
+
+    response = client.put(
+        "/api/recipes/{id}",
+        params={"recipe_id": recipe_id},
+        json=payloads.recipe("Soup", [1, 1, 2], [(2, 1), (2, 1)]),
+        headers=cookbook,
+    )
+
+    assert response.status_code == 200, response.text
+    assert search(client, cookbook, category_id=[1, 2], ingredient_id=[2]) == (
+        [recipe_id],
+        1,
+    )
+    assert search(client, cookbook, ingredient_id=[1]) == ([], 0)
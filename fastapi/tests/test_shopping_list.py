@@ -0,0 +1,91 @@
+"""
+Tests of the shopping lists.
+"""
+
+import pytest
+
+from tests import payloads
+
+
+@pytest.fixture(name="menus")
+def menus_fixture(client, admin, author, pantry):
+    """
+    The menus of user 1: soup (2 carrots and 1 onion) and salad (3 onions and
+    1 salt) on Monday, soup again on Tuesday, and salad on an inactive menu
+    and on a menu of the next month.
+    """
+    assert pantry
+    for name in ("Carrot", "Onion", "Salt"):
+        client.post(
+            "/api/ingredients/", json=payloads.ingredient(name, 10), headers=admin
+        )
+    for recipe in (
+        payloads.recipe("Soup", ingredients=[(1, 2), (2, 1)]),
+        payloads.recipe("Salad", ingredients=[(2, 3), (3, 1)]),
+    ):
+        response = client.post("/api/recipes/", json=recipe, headers=author)
+        assert response.status_code == 200, response.text
+    for menu in (
+        payloads.menu("Monday", "2030-01-07", [1, 2]),
+        payloads.menu("Tuesday", "2030-01-08", [1]),
+        {**payloads.menu("Wednesday", "2030-01-09", [2]), "is_active": False},
+        payloads.menu("Next month", "2030-02-07", [2]),
+    ):
+        response = client.post("/api/menus/", json=menu, headers=admin)
+        assert response.status_code == 200, response.text
+    return admin
+
+
+def shopping_list(client, headers, start_date="2030-01-06", end_date="2030-01-12"):
+    """
+    Creates the shopping list of user 1.
+    """
+    return client.post(
+        "/api/shopping_lists/",
+        json={"user_id": 1, "start_date": start_date, "end_date": end_date},
+        headers=headers,
+    )
+
+
+def stock(client, headers, ingredient_id: int, quantity: int):
+    """
+    Puts an ingredient in the inventory of user 1.
+    """
+    response = client.put(
+        "/api/inventory/",
+        json={"user_id": 1, "ingredient_id": ingredient_id, "quantity": quantity},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+
+
+def test_the_active_menus_of_the_range_are_added_up(client, menus):
+    response = shopping_list(client, menus)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["user_id"] == 1
+    assert response.json()["items"] == [
+        {"ingredient_id": 1, "quantity": 4, "bought": False},
+        {"ingredient_id": 2, "quantity": 5, "bought": False},
+        {"ingredient_id": 3, "quantity": 1, "bought": False},
+    ]
+
+
+def test_the_inventory_is_subtracted(client, menus):
+    stock(client, menus, 1, 1)
+    stock(client, menus, 3, 5)
+
+    response = shopping_list(client, menus)
+
+    assert response.json()["items"] == [
+        {"ingredient_id": 1, "quantity": 3, "bought": False},
+        {"ingredient_id": 2, "quantity": 5, "bought": False},
+    ]
+    saved = client.get(
+        "/api/shopping_lists/1", params={"shopping_list_id": 1}, headers=menus
+    )
+    assert saved.json()["items"] == response.json()["items"]
+
+
+def test_a_range_that_ends_before_it_starts_is_rejected(client, menus):
+    assert shopping_list(client, menus, "2030-01-12", "2030-01-06").status_code == 400
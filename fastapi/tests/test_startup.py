@@ -0,0 +1,57 @@
+"""
+Tests of the cold start of the application.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+from tests.conftest import APP_DIR
+
+sys.path.insert(0, str(APP_DIR.parent / "benchmarks"))
+
+# pylint: disable=wrong-import-position
+import load
+from startup import FORBIDDEN
+
+# Loose enough for a shared CI runner; the startup on the seed takes about
+# 0.2 s locally.
+STARTUP_BUDGET_SECONDS = 3.0
+
+
+def test_the_import_skips_the_migration_and_matrix_modules():
+    child = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import json, sys, main; print(json.dumps(sorted(sys.modules)))",
+        ],
+        cwd=APP_DIR,
+        env=os.environ,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = json.loads(child.stdout.strip().splitlines()[-1])
+
+    assert [module for module in modules if module.split(".")[0] in FORBIDDEN] == []
+
+
+def test_the_application_starts_on_a_seeded_database_within_budget(app, admin):
+    # pylint: disable=import-outside-toplevel
+    from fastapi.testclient import TestClient
+
+    load.seed(load.SIZES)
+    client = TestClient(app)
+
+    start = time.perf_counter()
+    with client:
+        elapsed = time.perf_counter() - start
+        response = client.get(
+            "/api/recipes/search", params={"q": "recipe1999"}, headers=admin
+        )
+
+    assert elapsed < STARTUP_BUDGET_SECONDS
+    assert [recipe["name"] for recipe in response.json()["items"]][:1] == ["recipe1999"]
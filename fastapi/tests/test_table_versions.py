@@ -0,0 +1,83 @@
+"""
+Tests of the table versions, which carry the writes of one worker to the
+state of the others.
+"""
+
+from tests import payloads
+from tests.conftest import schema
+
+
+def write_elsewhere(table, *queries):
+    """
+    Runs queries and bumps the version of their table, as another worker
+    does, and makes the next request reload the versions.
+    """
+    # pylint: disable=import-outside-toplevel,no-value-for-parameter
+    from helpers.etag import table_versions
+
+    model = schema.TableVersionModel
+    with schema.database.connection_context(), schema.database.atomic():
+        for query in queries:
+            query.execute()
+        model.insert(name=table, version=1).on_conflict(
+            conflict_target=[model.name], update={model.version: model.version + 1}
+        ).execute()
+    table_versions.loaded_at = None
+
+
+def test_a_permission_revoked_elsewhere_is_enforced(client, author, pantry):
+    assert pantry
+    allowed = client.post("/api/recipes/", json=payloads.recipe("Soup"), headers=author)
+    assert allowed.status_code == 200
+
+    write_elsewhere(
+        "role_permissions",
+        schema.RolePermissionModel.delete(),  # pylint: disable=no-value-for-parameter
+    )
+
+    denied = client.post("/api/recipes/", json=payloads.recipe("Stew"), headers=author)
+    assert denied.status_code == 403
+
+
+def test_a_recipe_created_elsewhere_is_searchable(client, author):
+    row = payloads.recipe("Tomato Soup")
+    del row["category_ids"], row["ingredients"]
+
+    write_elsewhere("recipes", schema.RecipeModel.insert(**row, user_id=1))
+
+    found = client.get("/api/recipes/search", params={"q": "tomato"}, headers=author)
+    assert [recipe["name"] for recipe in found.json()["items"]] == ["Tomato Soup"]
+
+
+def test_a_user_renamed_elsewhere_changes_the_etag(client, admin):
+    client.post("/api/user_roles/", json=payloads.user_role("Cook"), headers=admin)
+    client.post("/api/users/", json=payloads.user("ada"), headers=admin)
+    params = {"user_id": 1}
+    first = client.get("/api/users/1", params=params, headers=admin)
+    assert first.json()["username"] == "ada"
+
+    write_elsewhere(
+        "users",
+        schema.UserModel.update(username="grace").where(schema.UserModel.id == 1),
+    )
+
+    after = client.get(
+        "/api/users/1",
+        params=params,
+        headers={**admin, "If-None-Match": first.headers["etag"]},
+    )
+    assert after.status_code == 200
+    assert after.headers["etag"] != first.headers["etag"]
+    assert after.json()["username"] == "grace"
+
+
+def test_the_own_writes_reload_nothing(client, admin):
+    # pylint: disable=import-outside-toplevel
+    from helpers.etag import table_versions
+
+    client.post("/api/user_roles/", json=payloads.user_role("Cook"), headers=admin)
+    etag = client.get("/api/user_roles/", headers=admin).headers["etag"]
+
+    with schema.database.connection_context():
+        assert not table_versions.load()
+    assert client.get("/api/user_roles/", headers=admin).headers["etag"] == etag